@@ -8,7 +8,9 @@ Manager de banco de dados usando apenas arquivos locais
 
 import os
 import json
+import sqlite3
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
@@ -17,12 +19,20 @@ logger = logging.getLogger(__name__)
 
 class LocalDatabaseManager:
     """Manager de banco de dados local usando apenas arquivos JSON"""
+
+    # Versão do esquema do catálogo SQLite (mudança de versão reconstrói o catálogo)
+    CATALOG_VERSION = 1
     
     def __init__(self):
         """Inicializa o manager local"""
         self.base_path = Path("analyses_data")
         self.base_path.mkdir(exist_ok=True)
+        # Catálogo SQLite fora de analyses_data: a limpeza por idade varre aquela árvore
+        self.index_path = Path(os.getenv('ANALYSES_INDEX_DIR') or self.base_path.parent / 'analyses_index')
+        self.index_path.mkdir(parents=True, exist_ok=True)
         self.setup_directories()
+        self.catalog_lock = threading.Lock()
+        self.catalog = self._open_catalog()
         logger.info("✅ Local Database Manager inicializado")
     
     def setup_directories(self):
@@ -35,6 +45,110 @@ class LocalDatabaseManager:
         for directory in directories:
             (self.base_path / directory).mkdir(exist_ok=True)
     
+    def _open_catalog(self) -> Optional[sqlite3.Connection]:
+        """Abre o catálogo SQLite das análises; reconstrói a partir dos JSON se estiver ausente"""
+        catalog_path = self.index_path / 'analyses_catalog.sqlite3'
+        try:
+            existed = catalog_path.exists()
+            conn = sqlite3.connect(str(catalog_path), timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.CATALOG_VERSION:
+                conn.execute("DROP TABLE IF EXISTS analyses")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL DEFAULT '',
+                    updated_at TEXT NOT NULL DEFAULT '',
+                    segmento TEXT,
+                    produto TEXT,
+                    summary TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_segmento ON analyses(segmento, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_produto ON analyses(produto, created_at)")
+            conn.execute(f"PRAGMA user_version = {self.CATALOG_VERSION}")
+            conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Catálogo de análises indisponível, listagem lerá os arquivos: {e}")
+            return None
+
+        if not existed or version != self.CATALOG_VERSION:
+            self._rebuild_catalog(conn)
+        return conn
+
+    def rebuild_catalog(self) -> int:
+        """Reconstrói o catálogo a partir de analyses/*.json"""
+        if self.catalog is None:
+            return 0
+        return self._rebuild_catalog(self.catalog)
+
+    def _rebuild_catalog(self, conn: sqlite3.Connection) -> int:
+        rows = []
+        for file_path in (self.base_path / 'analyses').glob('*.json'):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    rows.append(self._catalog_row(file_path.stem, json.load(f)))
+            except Exception as e:
+                logger.warning(f"Erro ao ler {file_path}: {e}")
+
+        with self.catalog_lock:
+            conn.execute("DELETE FROM analyses")
+            conn.executemany(
+                "INSERT OR REPLACE INTO analyses (id, created_at, updated_at, segmento, produto, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+        logger.info(f"🗂️ Catálogo de análises reconstruído: {len(rows)} análises")
+        return len(rows)
+
+    def _catalog_row(self, analysis_id: str, data: Dict[str, Any]) -> tuple:
+        """Campos do catálogo: metadata, segmento/produto (no topo ou nos dados do projeto) e resumo"""
+        metadata = data.get('metadata') or {}
+
+        def field(name: str) -> Optional[str]:
+            for source in (data, data.get('projeto_dados'), data.get('analise_mercado')):
+                if isinstance(source, dict) and source.get(name):
+                    return str(source[name])
+            return None
+
+        return (
+            analysis_id,
+            metadata.get('created_at', ''),
+            metadata.get('updated_at', ''),
+            field('segmento'),
+            field('produto'),
+            json.dumps(data.get('summary', 'Sem resumo'), ensure_ascii=False)
+        )
+
+    def _catalog_upsert(self, analysis_id: str, data: Dict[str, Any]):
+        if self.catalog is None:
+            return
+        try:
+            with self.catalog_lock:
+                self.catalog.execute(
+                    "INSERT OR REPLACE INTO analyses (id, created_at, updated_at, segmento, produto, summary) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._catalog_row(analysis_id, data)
+                )
+                self.catalog.commit()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar catálogo para {analysis_id}: {e}")
+
+    def _catalog_delete(self, analysis_id: str):
+        if self.catalog is None:
+            return
+        try:
+            with self.catalog_lock:
+                self.catalog.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+                self.catalog.commit()
+        except Exception as e:
+            logger.error(f"Erro ao remover {analysis_id} do catálogo: {e}")
+
     def test_connection(self) -> bool:
         """Testa se o sistema de arquivos está funcionando"""
         try:
@@ -61,6 +175,7 @@ class LocalDatabaseManager:
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             
+            self._catalog_upsert(analysis_id, data)
             logger.info(f"✅ Análise salva: {analysis_id}")
             return True
             
@@ -114,42 +229,99 @@ class LocalDatabaseManager:
             logger.error(f"Erro ao carregar progresso {session_id}: {e}")
             return None
     
-    def list_analyses(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Lista análises"""
+    def list_analyses(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        segmento: Optional[str] = None,
+        produto: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Lista análises (mais recentes primeiro) pelo catálogo, com filtros e paginação"""
+        if self.catalog is None:
+            return self._scan_analyses(segmento, produto)[offset:offset + limit]
+
         try:
-            analyses_dir = self.base_path / 'analyses'
-            analyses = []
-            
-            for file_path in analyses_dir.glob('*.json'):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        analyses.append({
-                            'id': file_path.stem,
-                            'metadata': data.get('metadata', {}),
-                            'summary': data.get('summary', 'Sem resumo')
-                        })
-                except Exception as e:
-                    logger.warning(f"Erro ao ler {file_path}: {e}")
-                    continue
-            
-            # Ordena por data de criação (mais recente primeiro)
-            analyses.sort(
-                key=lambda x: x.get('metadata', {}).get('created_at', ''),
-                reverse=True
-            )
-            
-            return analyses[:limit]
-            
+            where, params = self._catalog_filters(segmento, produto)
+            with self.catalog_lock:
+                rows = self.catalog.execute(
+                    f"SELECT * FROM analyses{where} ORDER BY created_at DESC, id LIMIT ? OFFSET ?",
+                    params + [limit, offset]
+                ).fetchall()
+
+            return [{
+                'id': row['id'],
+                'metadata': {
+                    'id': row['id'],
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at']
+                },
+                'summary': json.loads(row['summary']) if row['summary'] else 'Sem resumo',
+                'segmento': row['segmento'],
+                'produto': row['produto'],
+                'created_at': row['created_at']
+            } for row in rows]
+
         except Exception as e:
             logger.error(f"Erro ao listar análises: {e}")
             return []
+
+    def count_analyses(self, segmento: Optional[str] = None, produto: Optional[str] = None) -> int:
+        """Total de análises para os filtros (para paginação)"""
+        if self.catalog is None:
+            return len(self._scan_analyses(segmento, produto))
+
+        try:
+            where, params = self._catalog_filters(segmento, produto)
+            with self.catalog_lock:
+                return self.catalog.execute(f"SELECT COUNT(*) FROM analyses{where}", params).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erro ao contar análises: {e}")
+            return 0
+
+    def _catalog_filters(self, segmento: Optional[str], produto: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if segmento:
+            clauses.append("segmento = ?")
+            params.append(segmento)
+        if produto:
+            clauses.append("produto = ?")
+            params.append(produto)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _scan_analyses(self, segmento: Optional[str] = None, produto: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Listagem lendo todos os arquivos; usada só quando o catálogo não abre"""
+        analyses = []
+        for file_path in (self.base_path / 'analyses').glob('*.json'):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Erro ao ler {file_path}: {e}")
+                continue
+
+            _, created_at, _, row_segmento, row_produto, _ = self._catalog_row(file_path.stem, data)
+            if (segmento and row_segmento != segmento) or (produto and row_produto != produto):
+                continue
+            analyses.append({
+                'id': file_path.stem,
+                'metadata': data.get('metadata', {}),
+                'summary': data.get('summary', 'Sem resumo'),
+                'segmento': row_segmento,
+                'produto': row_produto,
+                'created_at': created_at
+            })
+
+        # Ordena por data de criação (mais recente primeiro)
+        analyses.sort(key=lambda x: x['created_at'], reverse=True)
+        return analyses
     
     def delete_analysis(self, analysis_id: str) -> bool:
         """Deleta análise"""
         try:
             file_path = self.base_path / 'analyses' / f"{analysis_id}.json"
             
+            self._catalog_delete(analysis_id)
+
             if file_path.exists():
                 file_path.unlink()
                 logger.info(f"✅ Análise deletada: {analysis_id}")
@@ -15,6 +15,9 @@ from services.auto_save_manager import auto_save_manager, salvar_etapa, salvar_e
 from services.super_orchestrator import super_orchestrator
 from services.comprehensive_report_generator import comprehensive_report_generator
 from services.tavily_mcp_client import tavily_mcp_client
+from services.analysis_job_queue import analysis_job_queue, JobQueueFullError, JobAlreadyRunningError
+from services.stream_hub import stream_hub
+from routes.progress import get_progress_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,99 @@ orchestrator = super_orchestrator
 # Armazena sessões ativas
 active_sessions = {}
 
+def _run_analysis_job(session_id, analysis_data, progress_callback, **kwargs):
+    """Executa o pipeline completo dentro de um worker da fila de jobs"""
+
+    if session_id in active_sessions:
+        active_sessions[session_id]['status'] = 'running'
+
+    # Etapas salvas por este job (e pelas threads que ele cria) ficam na pasta desta sessão
+    with auto_save_manager.usar_sessao(session_id):
+        resultado = super_orchestrator.execute_synchronized_analysis(
+            data=analysis_data,
+            session_id=session_id,
+            progress_callback=progress_callback,
+            **kwargs
+        )
+
+        # Gera relatório final limpo
+        try:
+            clean_report = comprehensive_report_generator.generate_clean_report(resultado, session_id)
+            resultado['relatorio_final_limpo'] = clean_report
+            logger.info("✅ Relatório final limpo gerado")
+        except Exception as e:
+            logger.error(f"❌ Erro ao gerar relatório limpo: {e}")
+
+    return resultado
+
+def _submit_analysis_job(session_id, analysis_data, progress_callback, error_stage, **kwargs):
+    """Enfileira a análise e mantém active_sessions sincronizado com o job"""
+
+    def on_complete(resultado):
+        active_sessions[session_id]['status'] = 'completed'
+        active_sessions[session_id]['completed_at'] = datetime.now().isoformat()
+        auto_save_manager.finalizar_sessao(session_id)
+        for channel in (session_id, stream_hub.token_channel(session_id)):
+            stream_hub.publish(channel, 'analysis_complete', {'session_id': session_id})
+            stream_hub.close(channel)
+
+    def on_error(e):
+        active_sessions[session_id]['status'] = 'error'
+        active_sessions[session_id]['error'] = str(e)
+        active_sessions[session_id]['error_at'] = datetime.now().isoformat()
+        with auto_save_manager.usar_sessao(session_id):
+            salvar_erro(error_stage, e, {"session_id": session_id})
+        auto_save_manager.finalizar_sessao(session_id)
+        for channel in (session_id, stream_hub.token_channel(session_id)):
+            stream_hub.publish(channel, 'analysis_error', {'session_id': session_id, 'error': str(e)})
+            stream_hub.close(channel)
+
+    return analysis_job_queue.submit(
+        session_id,
+        _run_analysis_job,
+        session_id,
+        analysis_data,
+        progress_callback,
+        on_complete=on_complete,
+        on_error=on_error,
+        **kwargs
+    )
+
+def _queue_full_response(session_id, error):
+    """Resposta padrão quando a fila de análises está cheia"""
+    if session_id in active_sessions:
+        active_sessions[session_id]['status'] = 'rejected'
+        active_sessions[session_id]['error'] = str(error)
+    # Nenhum job vai finalizar a sessão: grava as etapas já salvas por esta requisição
+    auto_save_manager.finalizar_sessao(session_id)
+    return jsonify({
+        'success': False,
+        'session_id': session_id,
+        'error': str(error),
+        'message': 'Servidor ocupado. Tente novamente em alguns minutos.',
+        'queue': analysis_job_queue.get_stats()
+    }), 429
+
+def _job_running_response(session_id, error):
+    """Resposta quando já existe um job ativo para a sessão: aponta para o status do job existente"""
+    job = analysis_job_queue.get_job(error.job_id) or {}
+    if session_id in active_sessions and job.get('status'):
+        active_sessions[session_id]['status'] = job['status']
+    return jsonify({
+        'success': False,
+        'session_id': session_id,
+        'job_id': error.job_id,
+        'status': job.get('status'),
+        'queue_position': job.get('queue_position', 0),
+        'error': str(error),
+        'message': 'Esta sessão já tem uma análise em andamento. Acompanhe pelo endpoint de status.',
+        'endpoints': {
+            'status': f'/api/sessions/{session_id}/status',
+            'progress': f'/api/progress/{session_id}',
+            'stream': f'/api/stream/{session_id}'
+        }
+    }), 409
+
 @analysis_bp.route('/')
 def index():
     """Interface principal"""
@@ -66,7 +162,7 @@ def analyze():
 
         # Registra sessão como ativa
         active_sessions[session_id] = {
-            'status': 'running',
+            'status': 'queued',
             'data': data,
             'started_at': datetime.now().isoformat(),
             'paused_at': None
@@ -75,15 +171,15 @@ def analyze():
         # Função para enviar atualizações de progresso
         def send_progress_update(session_id, step, message):
             logger.info(f"Progress {session_id}: Step {step} - {message}")
+            tracker = get_progress_tracker(session_id)
+            if tracker:
+                tracker.update_progress(step, message)
             salvar_etapa("progresso", {
                 "step": step,
                 "message": message,
                 "timestamp": datetime.now().isoformat()
             }, categoria="logs")
 
-        # Executa análise COMPLETA com todos os serviços
-        logger.info("🚀 Executando análise COMPLETA com todos os serviços...")
-
         analysis_data = {
             'segmento': segmento_negocio,
             'produto': produto_servico,
@@ -93,38 +189,44 @@ def analyze():
             'query': query
         }
 
-        resultado = super_orchestrator.execute_synchronized_analysis(
-            data=analysis_data,
-            session_id=session_id,
-            progress_callback=lambda step, msg: send_progress_update(session_id, step, msg)
-        )
-
-        # Atualiza status da sessão
-        active_sessions[session_id]['status'] = 'completed'
-        active_sessions[session_id]['completed_at'] = datetime.now().isoformat()
+        # Enfileira análise COMPLETA com todos os serviços
+        logger.info("📥 Enfileirando análise COMPLETA com todos os serviços...")
 
-        # Gera relatório final limpo
         try:
-            clean_report = comprehensive_report_generator.generate_clean_report(resultado, session_id)
-            resultado['relatorio_final_limpo'] = clean_report
-            logger.info("✅ Relatório final limpo gerado")
-        except Exception as e:
-            logger.error(f"❌ Erro ao gerar relatório limpo: {e}")
-
-        # Resposta final
+            job = _submit_analysis_job(
+                session_id,
+                analysis_data,
+                lambda step, msg: send_progress_update(session_id, step, msg),
+                "erro_analise"
+            )
+        except JobAlreadyRunningError as e:
+            logger.warning(f"⚠️ Análise {session_id} já em andamento: {e}")
+            return _job_running_response(session_id, e)
+        except JobQueueFullError as e:
+            logger.warning(f"⚠️ Análise {session_id} rejeitada: {e}")
+            return _queue_full_response(session_id, e)
+
+        # Resposta imediata com o identificador do job
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'message': 'Análise COMPLETA concluída com sucesso!',
-            'processing_time': resultado.get('metadata', {}).get('processing_time_formatted', 'N/A'),
-            'data': resultado,
-            'engine': 'ARQV30 Enhanced v3.0 - ULTRA CLEAN',
-            'clean_report_available': 'relatorio_final_limpo' in resultado
-        })
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'queue_position': job.get('queue_position', 0),
+            'message': 'Análise enfileirada. Acompanhe pelo endpoint de status.',
+            'endpoints': {
+                'status': f'/api/sessions/{session_id}/status',
+                'progress': f'/api/progress/{session_id}',
+                'stream': f'/api/stream/{session_id}',
+                'progress_stream': f'/api/progress/stream/{session_id}',
+                'result': f'/api/sessions/{session_id}/result'
+            },
+            'engine': 'ARQV30 Enhanced v3.0 - ULTRA CLEAN'
+        }), 202
 
     except Exception as e:
         logger.error(f"❌ Erro na análise: {str(e)}")
-        if 'session_id' in locals() and session_id:
+        if 'session_id' in locals() and session_id and session_id in active_sessions:
             active_sessions[session_id]['status'] = 'error'
             active_sessions[session_id]['error'] = str(e)
             active_sessions[session_id]['error_at'] = datetime.now().isoformat()
@@ -261,7 +363,7 @@ def continue_session(session_id):
     """Continua uma sessão salva"""
     try:
         # Recupera dados da sessão
-        session_info = auto_save_manager.obter_info_sessao(session_id)
+        session_info = auto_save_manager.obter_info_sessao(session_id, com_dados=True)
 
         if not session_info:
             return jsonify({'error': 'Sessão não encontrada'}), 404
@@ -276,17 +378,25 @@ def continue_session(session_id):
         if not original_data:
             return jsonify({'error': 'Dados originais não encontrados'}), 400
 
-        # Registra como sessão ativa
-        active_sessions[session_id] = {
-            'status': 'running',
+        session_entry = {
+            'status': 'queued',
             'data': original_data,
             'continued_at': datetime.now().isoformat(),
             'original_session': True
         }
 
+        # Registra como sessão ativa só se ausente: se já houver um job desta sessão (409),
+        # a entrada atual continua sendo a dele
+        registered = session_id not in active_sessions
+        if registered:
+            active_sessions[session_id] = session_entry
+
         # Continua a análise
         def progress_callback(step, message):
             logger.info(f"Continue Progress {session_id}: Step {step} - {message}")
+            tracker = get_progress_tracker(session_id)
+            if tracker:
+                tracker.update_progress(step, message)
             salvar_etapa("progresso_continuacao", {
                 "step": step,
                 "message": message,
@@ -305,36 +415,48 @@ def continue_session(session_id):
             'query': original_data.get('query', f"mercado de {original_data.get('produto') or original_data.get('segmento')} no brasil desde 2022")
         }
 
-        resultado = super_orchestrator.execute_synchronized_analysis(
-            data=analysis_data,
-            session_id=session_id,
-            progress_callback=progress_callback,
-            continue_from_saved=True # Indicate that we are continuing a saved session
-        )
-
-        active_sessions[session_id]['status'] = 'completed'
-        active_sessions[session_id]['completed_at'] = datetime.now().isoformat()
-
-        # Gera relatório final limpo
         try:
-            clean_report = comprehensive_report_generator.generate_clean_report(resultado, session_id)
-            resultado['relatorio_final_limpo'] = clean_report
-            logger.info("✅ Relatório final limpo gerado")
-        except Exception as e:
-            logger.error(f"❌ Erro ao gerar relatório limpo: {e}")
+            job = _submit_analysis_job(
+                session_id,
+                analysis_data,
+                progress_callback,
+                "erro_continuacao_sessao",
+                continue_from_saved=True # Indicate that we are continuing a saved session
+            )
+        except JobAlreadyRunningError as e:
+            logger.warning(f"⚠️ Continuação da sessão {session_id} já em andamento: {e}")
+            return _job_running_response(session_id, e)
+        except JobQueueFullError as e:
+            logger.warning(f"⚠️ Continuação da sessão {session_id} rejeitada: {e}")
+            return _queue_full_response(session_id, e)
+
+        if not registered:
+            # Entrada de uma execução anterior já encerrada: passa a valer a do job aceito
+            # (preservando 'running' se o worker já o iniciou)
+            previous_status = active_sessions.get(session_id, {}).get('status')
+            session_entry['status'] = 'running' if previous_status == 'running' else 'queued'
+            active_sessions[session_id] = session_entry
 
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'message': 'Análise continuada e concluída com sucesso!',
-            'data': resultado,
-            'engine': 'ARQV30 Enhanced v3.0 - ULTRA CLEAN',
-            'clean_report_available': 'relatorio_final_limpo' in resultado
-        })
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'queue_position': job.get('queue_position', 0),
+            'message': 'Continuação da análise enfileirada.',
+            'endpoints': {
+                'status': f'/api/sessions/{session_id}/status',
+                'progress': f'/api/progress/{session_id}',
+                'stream': f'/api/stream/{session_id}',
+                'progress_stream': f'/api/progress/stream/{session_id}',
+                'result': f'/api/sessions/{session_id}/result'
+            },
+            'engine': 'ARQV30 Enhanced v3.0 - ULTRA CLEAN'
+        }), 202
 
     except Exception as e:
         logger.error(f"❌ Erro geral ao continuar sessão: {str(e)}")
-        if 'session_id' in locals() and session_id:
+        if 'session_id' in locals() and session_id and session_id in active_sessions:
             active_sessions[session_id]['status'] = 'error'
             active_sessions[session_id]['error'] = str(e)
             active_sessions[session_id]['error_at'] = datetime.now().isoformat()
@@ -378,9 +500,10 @@ def get_session_status(session_id):
     """Obtém status de uma sessão"""
     try:
         session = active_sessions.get(session_id)
+        job = analysis_job_queue.get_job(session_id)
         session_info = auto_save_manager.obter_info_sessao(session_id)
 
-        if not session and not session_info:
+        if not session and not job and not session_info:
             return jsonify({'error': 'Sessão não encontrada'}), 404
 
         status_data = {
@@ -388,7 +511,8 @@ def get_session_status(session_id):
             'status': session.get('status', 'saved') if session else 'saved', # Default to 'saved' if not active
             'active': session is not None,
             'saved': session_info is not None,
-            'etapas_salvas': len(session_info.get('etapas', {})) if session_info else 0
+            'etapas_salvas': len(session_info.get('etapas', {})) if session_info else 0,
+            'job': job
         }
 
         if session:
@@ -410,6 +534,60 @@ def get_session_status(session_id):
         logger.error(f"❌ Erro ao obter status da sessão: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@analysis_bp.route('/sessions/<session_id>/result', methods=['GET'])
+@analysis_bp.route('/api/sessions/<session_id>/result', methods=['GET'])
+def get_session_result(session_id):
+    """Obtém o resultado de uma análise executada pela fila de jobs"""
+    try:
+        job = analysis_job_queue.get_job(session_id, include_result=True)
+
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
+
+        if job['status'] in ('queued', 'running'):
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'status': job['status'],
+                'queue_position': job.get('queue_position', 0),
+                'message': 'Análise ainda em andamento'
+            }), 202
+
+        if job['status'] == 'error':
+            return jsonify({
+                'success': False,
+                'session_id': session_id,
+                'status': 'error',
+                'error': job['error'],
+                'message': 'Erro na análise. Dados intermediários foram salvos.'
+            }), 500
+
+        resultado = job['result'] or {}
+
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'status': 'completed',
+            'message': 'Análise COMPLETA concluída com sucesso!',
+            'processing_time': resultado.get('metadata', {}).get('processing_time_formatted', 'N/A'),
+            'data': resultado,
+            'engine': 'ARQV30 Enhanced v3.0 - ULTRA CLEAN',
+            'clean_report_available': 'relatorio_final_limpo' in resultado
+        })
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter resultado da sessão: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/jobs/stats', methods=['GET'])
+def get_job_queue_stats():
+    """Estatísticas da fila de análises deste processo"""
+    return jsonify({
+        'success': True,
+        'queue': analysis_job_queue.get_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @analysis_bp.route('/api/sessions', methods=['GET'])
 def api_list_sessions():
     """API endpoint para listar sessões"""
@@ -420,11 +598,23 @@ def api_get_progress(session_id):
     """API endpoint para obter progresso"""
     try:
         session = active_sessions.get(session_id)
+        job = analysis_job_queue.get_job(session_id)
         session_info = auto_save_manager.obter_info_sessao(session_id)
 
-        if not session and not session_info:
+        if not session and not job and not session_info:
             return jsonify({'error': 'Sessão não encontrada'}), 404
 
+        if job and job['status'] == 'queued':
+            return jsonify({
+                'success': True,
+                'completed': False,
+                'percentage': 0,
+                'current_step': f"Na fila (posição {job.get('queue_position', 0)})",
+                'total_steps': 13,
+                'estimated_time': 'N/A',
+                'job_status': 'queued'
+            })
+
         if session and session['status'] == 'error':
             return jsonify({
                 'success': False,
@@ -8,8 +8,9 @@ Endpoints para gerenciamento de arquivos locais das análises
 import os
 import logging
 from datetime import datetime
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
 from services.local_file_manager import local_file_manager
+from services.zip_stream import ZipStream
 from database import db_manager
 
 logger = logging.getLogger(__name__)
@@ -46,21 +47,10 @@ def get_analysis_files(analysis_id):
         # Busca arquivos no Supabase
         supabase_files = db_manager.get_analysis_files(analysis_id)
         
-        # Busca diretório local
+        # Busca diretório e arquivos locais pelo manifesto
         local_directory = local_file_manager.get_analysis_directory(analysis_id)
         
-        local_files = []
-        if local_directory:
-            for file in os.listdir(local_directory):
-                if analysis_id[:8] in file:
-                    file_path = os.path.join(local_directory, file)
-                    local_files.append({
-                        'name': file,
-                        'path': file_path,
-                        'size': os.path.getsize(file_path),
-                        'type': file.split('_')[-1].split('.')[0] if '_' in file else 'unknown',
-                        'modified': datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-                    })
+        local_files = local_file_manager.get_analysis_files(analysis_id)
         
         return jsonify({
             'success': True,
@@ -80,10 +70,18 @@ def get_analysis_files(analysis_id):
 
 @files_bp.route('/download_file', methods=['GET'])
 def download_file():
-    """Download de arquivo local"""
+    """Download de arquivo local (por ?path= ou por ?analysis_id=&name=)"""
     
     try:
         file_path = request.args.get('path')
+        analysis_id = request.args.get('analysis_id')
+        
+        if analysis_id and request.args.get('name'):
+            file_path = local_file_manager.get_analysis_file_path(analysis_id, request.args['name'])
+            if not file_path:
+                return jsonify({
+                    'error': 'Arquivo não encontrado'
+                }), 404
         
         if not file_path:
             return jsonify({
@@ -196,39 +194,55 @@ def get_file_content():
 
 @files_bp.route('/export_analysis/<analysis_id>', methods=['GET'])
 def export_analysis(analysis_id):
-    """Exporta análise completa como ZIP"""
+    """Exporta análise completa como ZIP (gerado em streaming, com suporte a Range para retomada)"""
     
     try:
-        import zipfile
-        import tempfile
-        
-        # Busca diretório da análise
-        analysis_dir = local_file_manager.get_analysis_directory(analysis_id)
+        # Arquivos da análise pelo manifesto
+        analysis_files = local_file_manager.get_analysis_files(analysis_id)
         
-        if not analysis_dir:
+        if not analysis_files:
             return jsonify({
                 'error': 'Análise não encontrada'
             }), 404
         
-        # Cria arquivo ZIP temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-            zip_path = tmp_file.name
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Adiciona todos os arquivos da análise
-            for root, dirs, files in os.walk(local_file_manager.base_dir):
-                for file in files:
-                    if analysis_id[:8] in file:
-                        file_path = os.path.join(root, file)
-                        # Nome no ZIP será relativo ao diretório base
-                        arcname = os.path.relpath(file_path, local_file_manager.base_dir)
-                        zipf.write(file_path, arcname)
-        
-        return send_file(
-            zip_path,
-            as_attachment=True,
-            download_name=f"analise_{analysis_id[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-            mimetype='application/zip'
+        # Nome no ZIP será relativo ao diretório base
+        zip_stream = ZipStream([
+            (os.path.relpath(file['path'], local_file_manager.base_dir), file['path'])
+            for file in analysis_files
+        ])
+        
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': zip_stream.etag,
+            'Content-Disposition': f'attachment; filename="analise_{analysis_id[:8]}.zip"'
+        }
+        
+        # Range só vale se o conteúdo não mudou desde o primeiro download (If-Range)
+        if request.range and request.headers.get('If-Range', zip_stream.etag) == zip_stream.etag:
+            total_size = zip_stream.total_size()
+            byte_range = request.range.range_for_length(total_size)
+            if byte_range is None:
+                headers['Content-Range'] = f'bytes */{total_size}'
+                return Response(status=416, headers=headers)
+            
+            start, stop = byte_range
+            headers['Content-Range'] = f'bytes {start}-{stop - 1}/{total_size}'
+            headers['Content-Length'] = str(stop - start)
+            return Response(
+                stream_with_context(zip_stream.iter_range(start, stop)),
+                status=206,
+                mimetype='application/zip',
+                headers=headers
+            )
+        
+        known_size = zip_stream.known_size()
+        if known_size is not None:
+            headers['Content-Length'] = str(known_size)
+        
+        return Response(
+            stream_with_context(zip_stream.iter_bytes()),
+            mimetype='application/zip',
+            headers=headers
         )
         
     except Exception as e:
@@ -240,51 +254,24 @@ def export_analysis(analysis_id):
 
 @files_bp.route('/storage_stats', methods=['GET'])
 def get_storage_stats():
-    """Obtém estatísticas de armazenamento"""
+    """Obtém estatísticas de armazenamento (contadores incrementais; ?reconcile=true força uma varredura)"""
     
     try:
-        # Estatísticas do diretório local
-        total_size = 0
-        total_files = 0
-        
-        for root, dirs, files in os.walk(local_file_manager.base_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    total_size += os.path.getsize(file_path)
-                    total_files += 1
-                except:
-                    continue
-        
-        # Estatísticas por tipo
-        type_stats = {}
-        for subdir in ['avatars', 'drivers_mentais', 'provas_visuais', 'anti_objecao', 
-                      'pre_pitch', 'predicoes_futuro', 'posicionamento', 'concorrencia',
-                      'palavras_chave', 'metricas', 'funil_vendas', 'plano_acao', 
-                      'insights', 'pesquisa_web', 'completas', 'metadata']:
-            
-            subdir_path = os.path.join(local_file_manager.base_dir, subdir)
-            if os.path.exists(subdir_path):
-                subdir_files = len([f for f in os.listdir(subdir_path) if os.path.isfile(os.path.join(subdir_path, f))])
-                subdir_size = sum(os.path.getsize(os.path.join(subdir_path, f)) 
-                                for f in os.listdir(subdir_path) 
-                                if os.path.isfile(os.path.join(subdir_path, f)))
-                
-                type_stats[subdir] = {
-                    'files': subdir_files,
-                    'size_bytes': subdir_size,
-                    'size_mb': round(subdir_size / (1024 * 1024), 2)
-                }
+        if request.args.get('reconcile', 'false').lower() == 'true':
+            stats = local_file_manager.reconcile_storage_stats()
+        else:
+            stats = local_file_manager.get_storage_stats()
         
         return jsonify({
             'success': True,
             'storage_stats': {
-                'base_directory': local_file_manager.base_dir,
-                'total_files': total_files,
-                'total_size_bytes': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
-                'total_size_gb': round(total_size / (1024 * 1024 * 1024), 3),
-                'type_breakdown': type_stats
+                'base_directory': stats['base_directory'],
+                'total_files': stats['total_files'],
+                'total_size_bytes': stats['total_size_bytes'],
+                'total_size_mb': stats['total_size_mb'],
+                'total_size_gb': round(stats['total_size_bytes'] / (1024 * 1024 * 1024), 3),
+                'type_breakdown': stats['sections'],
+                'last_reconciled': stats['last_reconciled']
             },
             'supabase_connected': db_manager.supabase.is_connected(),
             'timestamp': datetime.now().isoformat()
@@ -331,7 +318,7 @@ def cleanup_old_files():
                         
                         # Remove arquivo se não for dry run
                         if not dry_run:
-                            os.remove(file_path)
+                            local_file_manager.remove_file(file_path)
                             logger.info(f"🗑️ Arquivo removido: {file}")
                             
                 except Exception as e:
@@ -385,19 +372,9 @@ def backup_to_supabase():
                     continue
                 
                 # Carrega análise completa do arquivo JSON
-                json_file = None
-                for root, dirs, files in os.walk(local_file_manager.base_dir):
-                    for file in files:
-                        if analysis_id[:8] in file and file.endswith('_completa.json'):
-                            json_file = os.path.join(root, file)
-                            break
-                    if json_file:
-                        break
+                analysis_data = local_file_manager.load_analysis_section(analysis_id, 'completas')
                 
-                if json_file:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        analysis_data = json.load(f)
-                    
+                if analysis_data:
                     # Salva no Supabase
                     result = db_manager.supabase.create_analysis(analysis_data)
                     if result:
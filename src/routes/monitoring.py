@@ -16,8 +16,15 @@ monitoring_bp = Blueprint('monitoring', __name__)
 
 @monitoring_bp.route('/api/extractor_stats', methods=['GET'])
 def get_extractor_stats():
-    """Retorna estatísticas dos extratores"""
+    """Retorna estatísticas dos extratores (?domain= para o histórico de um domínio)"""
     try:
+        domain = request.args.get('domain')
+        if domain:
+            return jsonify({
+                'success': True,
+                'domain_history': robust_content_extractor.get_domain_history(domain)
+            })
+
         stats = robust_content_extractor.get_extractor_stats()
         return jsonify({
             'success': True,
@@ -31,6 +38,64 @@ def get_extractor_stats():
         }), 500
 
 
+@monitoring_bp.route('/api/ai_stats', methods=['GET'])
+def get_ai_stats():
+    """Retorna estatísticas do AI Manager (provedores, roteamento, cache, deduplicação e hedging)"""
+    try:
+        from services.ai_manager import ai_manager
+        return jsonify({
+            'success': True,
+            'providers': ai_manager.get_provider_status(),
+            'routing': ai_manager.get_routing_decision(),
+            'cache': ai_manager.get_cache_stats(),
+            'single_flight': ai_manager.get_single_flight_stats(),
+            'hedging': ai_manager.get_hedge_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter estatísticas de IA: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@monitoring_bp.route('/api/search_cache_stats', methods=['GET'])
+def get_search_cache_stats():
+    """Retorna estatísticas do cache de busca compartilhado (hits/misses por provedor)"""
+    try:
+        from services.search_cache import search_cache
+        return jsonify({
+            'success': True,
+            'cache': search_cache.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter estatísticas do cache de busca: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@monitoring_bp.route('/api/rate_limit_stats', methods=['GET'])
+def get_rate_limit_stats():
+    """Retorna requisições e espera acumulada por host/API no rate limiter compartilhado"""
+    try:
+        from services.rate_limiter import rate_limiter
+        return jsonify({
+            'success': True,
+            'rate_limiter': rate_limiter.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter estatísticas do rate limiter: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @monitoring_bp.route('/api/test_extraction', methods=['GET'])
 def test_extraction():
     """Testa extração para uma URL específica"""
@@ -10,8 +10,7 @@ import logging
 import time
 import json
 from datetime import datetime
-from flask import Blueprint, request, jsonify, session
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context
 import threading
 from queue import Queue
 import uuid
@@ -23,6 +22,9 @@ except ImportError:
     logger.error("Falha ao importar auto_save_manager. Verifique a configuração dos serviços.")
     auto_save_manager = None
 
+from services.stream_hub import stream_hub, format_sse
+from services.analysis_job_queue import analysis_job_queue
+
 logger = logging.getLogger(__name__)
 
 # Cria blueprint
@@ -31,7 +33,10 @@ progress_bp = Blueprint('progress', __name__)
 # Sistema de progresso global CORRIGIDO
 progress_sessions = {}
 progress_queues = {}
-progress_lock = threading.Lock()
+progress_lock = threading.RLock()  # complete() chama update_progress() com o lock adquirido
+
+# Eventos enviados por padrão no stream de progresso
+PROGRESS_STREAM_EVENTS = {'progress', 'analysis_complete', 'analysis_error', 'stream_not_found'}
 
 class ProgressTracker:
     """Rastreador de progresso em tempo real COMPLETAMENTE FUNCIONAL"""
@@ -141,7 +146,10 @@ class ProgressTracker:
 
                 logger.info(f"📊 Progress {self.session_id}: Step {self.current_step}/{self.total_steps} - {message}")
 
-                return progress_data
+            # Publica fora do lock: assinantes SSE (inclusive de outros processos) recebem imediatamente
+            stream_hub.publish(self.session_id, 'progress', progress_data)
+
+            return progress_data
 
         except Exception as e:
             logger.error(f"Erro ao atualizar progresso: {e}")
@@ -241,6 +249,7 @@ def start_tracking():
             'endpoints': {
                 'progress': f'/api/progress/{session_id}',
                 'polling': f'/api/progress/poll/{session_id}',
+                'stream': f'/api/progress/stream/{session_id}',
                 'logs': f'/api/progress/logs/{session_id}'
             }
         })
@@ -258,6 +267,16 @@ def get_progress_main(session_id):
     """Obtém progresso atual - ROTA PRINCIPAL"""
     try:
         if session_id not in progress_sessions:
+            # Tracker pode estar em outro worker: usa o último evento publicado no hub
+            last_event = stream_hub.get_last_event(session_id, 'progress')
+            if last_event:
+                return jsonify({
+                    'success': True,
+                    'progress': last_event['data'],
+                    'session_found': True,
+                    'last_event_id': last_event['id']
+                })
+
             logger.warning(f"⚠️ Sessão não encontrada: {session_id}")
             return jsonify({
                 'success': False,
@@ -305,6 +324,19 @@ def poll_updates(session_id):
     """Polling para atualizações de progresso"""
     try:
         if session_id not in progress_queues:
+            # Tracker em outro worker: lê do buffer do hub a partir de last_event_id
+            last_event_id = request.args.get('last_event_id', 0, type=int)
+            events = [e for e in stream_hub.get_events(session_id, last_event_id) if e['event'] == 'progress']
+            if events:
+                return jsonify({
+                    'success': True,
+                    'updates': [e['data'] for e in events[:50]],
+                    'has_updates': True,
+                    'update_count': len(events[:50]),
+                    'last_event_id': events[:50][-1]['id'],
+                    'session_id': session_id
+                })
+
             return jsonify({
                 'success': False,
                 'error': 'Sessão não encontrada para polling',
@@ -344,6 +376,42 @@ def poll_updates_alt(session_id):
     """Rota alternativa para polling"""
     return poll_updates(session_id)
 
+@progress_bp.route('/progress/stream/<session_id>', methods=['GET'])
+def stream_progress(session_id):
+    """Push de progresso via Server-Sent Events (substitui o polling)"""
+
+    raw_last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '0')
+    try:
+        last_event_id = int(raw_last_id)
+    except (TypeError, ValueError):
+        last_event_id = 0
+
+    types = request.args.get('events')
+    event_types = set(types.split(',')) if types else PROGRESS_STREAM_EVENTS
+
+    def generate():
+        yield "retry: 3000\n\n"
+
+        # Envia o estado atual para o cliente não esperar o próximo passo
+        if last_event_id == 0 and session_id in progress_sessions:
+            yield format_sse({'id': 0, 'event': 'snapshot', 'data': progress_sessions[session_id].get_current_status()})
+
+        for event in stream_hub.subscribe(
+            session_id,
+            last_event_id,
+            max_duration=stream_hub.max_duration,
+            is_active=lambda: analysis_job_queue.is_active(session_id)
+        ):
+            if event is None or event['event'] in event_types:
+                yield format_sse(event)
+
+    logger.info(f"📡 Cliente conectado ao stream de progresso {session_id} (a partir do evento {last_event_id})")
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'Connection': 'keep-alive'}
+    )
+
 @progress_bp.route('/update', methods=['POST'])
 def update_progress_endpoint():
     """Atualiza progresso (usado internamente)"""
@@ -665,8 +733,13 @@ def get_progress(session_id: str):
 
         # Busca arquivos de progresso da sessão
         try:
-            progress_files = auto_save_manager._list_session_files(session_id, categoria="logs")
-            progress_data = []
+            # Sessões em contêiner: registros de progresso direto do índice
+            progress_data = [{
+                'timestamp': registro['nome'].split('_')[-1],
+                'content': registro['txt']
+            } for registro in auto_save_manager.ler_registros(session_id, categoria="logs", prefixo="progresso")]
+
+            progress_files = [] if progress_data else auto_save_manager._list_session_files(session_id, categoria="logs")
 
             for file_path in progress_files:
                 if 'progresso' in file_path:
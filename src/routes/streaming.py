@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Streaming Routes
+Server-Sent Events com as partes geradas pelos agentes de IA
+"""
+
+import logging
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from services.ai_manager import ai_manager
+from services.stream_hub import stream_hub, format_sse
+from services.analysis_job_queue import analysis_job_queue
+
+logger = logging.getLogger(__name__)
+
+streaming_bp = Blueprint('streaming', __name__)
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',  # Desativa buffering no nginx
+    'Connection': 'keep-alive'
+}
+
+def _last_event_id() -> int:
+    """Lê Last-Event-ID do cabeçalho (reconexão do EventSource) ou da query string"""
+    raw = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '0')
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return 0
+
+@streaming_bp.route('/stream/<session_id>', methods=['GET'])
+def stream_session(session_id):
+    """Transmite as seções geradas pelos agentes de uma sessão (SSE, canal de tokens da sessão)"""
+
+    last_event_id = _last_event_id()
+
+    def generate():
+        yield "retry: 3000\n\n"
+        for event in stream_hub.subscribe(
+            stream_hub.token_channel(session_id),
+            last_event_id,
+            max_duration=stream_hub.max_duration,
+            is_active=lambda: analysis_job_queue.is_active(session_id)
+        ):
+            yield format_sse(event)
+
+    logger.info(f"📡 Cliente conectado ao stream da sessão {session_id} (a partir do evento {last_event_id})")
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+@streaming_bp.route('/stream/generate', methods=['POST'])
+def stream_generate():
+    """Gera conteúdo para um prompt e transmite as partes diretamente (SSE)"""
+
+    data = request.get_json() or {}
+    prompt = data.get('prompt')
+    if not prompt:
+        return jsonify({'success': False, 'error': 'Prompt obrigatório'}), 400
+
+    max_tokens = int(data.get('max_tokens', 8192))
+    provider = data.get('provider')
+
+    def generate():
+        event_id = 0
+        try:
+            for chunk in ai_manager.generate_stream(prompt, max_tokens, provider):
+                event_id += 1
+                yield format_sse({'id': event_id, 'event': 'token', 'data': {'text': chunk}})
+            yield format_sse({'id': event_id + 1, 'event': 'done', 'data': {'chunks': event_id}})
+        except Exception as e:
+            logger.error(f"❌ Erro no streaming: {e}")
+            yield format_sse({'id': event_id + 1, 'event': 'error', 'data': {'error': str(e)}})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+@streaming_bp.route('/stream/stats', methods=['GET'])
+def stream_stats():
+    """Estatísticas do hub de streaming"""
+    return jsonify({
+        'success': True,
+        'stats': stream_hub.get_stats()
+    })
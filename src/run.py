@@ -79,6 +79,7 @@ def create_app():
     from routes.analysis import analysis_bp
     from routes.enhanced_analysis import enhanced_analysis_bp
     from routes.progress import progress_bp
+    from routes.streaming import streaming_bp
     from routes.user import user_bp
     from routes.files import files_bp
     from routes.pdf_generator import pdf_bp
@@ -88,6 +89,7 @@ def create_app():
     app.register_blueprint(analysis_bp, url_prefix='/api')
     app.register_blueprint(enhanced_analysis_bp, url_prefix='/api')
     app.register_blueprint(progress_bp, url_prefix='/api')
+    app.register_blueprint(streaming_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
     app.register_blueprint(files_bp, url_prefix='/api')
     app.register_blueprint(pdf_bp, url_prefix='/api')
@@ -9,9 +9,18 @@ import os
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any
+import threading
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Any, Iterator
 import requests
 
+from services.response_cache import create_response_cache
+from services.single_flight import SingleFlight
+from services.provider_health import ProviderHealth
+from services.stream_hub import stream_hub
+from services.context_executor import ContextThreadPoolExecutor
+
 # Imports condicionais para os clientes de IA
 try:
     import google.generativeai as genai
@@ -33,6 +42,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+class StreamInterruptedError(Exception):
+    """Falha do provedor depois que parte da resposta já foi entregue no streaming"""
+
+    def __init__(self, provider: str, error: Exception):
+        super().__init__(f"Streaming com {provider} interrompido: {error}")
+        self.provider = provider
+
 class AIManager:
     """Gerenciador de IAs com sistema de fallback automático"""
 
@@ -82,6 +98,31 @@ class AIManager:
             }
         }
         self.primary_provider = None
+        circuit_cooldown = float(os.getenv('AI_CIRCUIT_COOLDOWN', '60'))
+        self.health = {
+            name: ProviderHealth(
+                name,
+                prior_latency=5.0 * provider['priority'],  # Sem histórico, preserva a ordem de prioridade
+                failure_threshold=provider['max_errors'],
+                cooldown=circuit_cooldown
+            )
+            for name, provider in self.providers.items()
+        }
+        self.last_routing_decision = {}
+
+        # Hedging: segunda requisição quando o primário passa do percentil de latência
+        self.hedging_enabled = os.getenv('AI_HEDGING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.hedge_percentile = float(os.getenv('AI_HEDGE_PERCENTILE', '0.95'))
+        self.hedge_max_per_minute = int(os.getenv('AI_HEDGE_MAX_PER_MINUTE', '10'))
+        self.hedge_executor = ContextThreadPoolExecutor(
+            max_workers=int(os.getenv('AI_HEDGE_WORKERS', '8')),
+            thread_name_prefix='ai_hedge'
+        )
+        self.hedge_timestamps = deque()
+        self.hedge_lock = threading.Lock()
+        self.hedge_stats = {'hedged_calls': 0, 'hedges_fired': 0, 'hedge_wins': 0, 'budget_denied': 0}
+        self.response_cache = create_response_cache('llm', default_ttl=86400)
+        self.single_flight = SingleFlight('AI Manager', wait_timeout=float(os.getenv('AI_SINGLE_FLIGHT_WAIT', '900')))
         self.initialize_providers()
         available_count = len([p for p in self.providers.values() if p['available']])
         logger.info(f"🤖 AI Manager inicializado com {available_count} provedores disponíveis.")
@@ -158,128 +199,343 @@ class AIManager:
             self.primary_provider = None
 
     def get_best_provider(self) -> Optional[str]:
-        """Retorna o melhor provedor disponível com base na prioridade e contagem de erros."""
-        current_time = time.time()
-
-        # Primeiro, tenta reabilitar provedores que podem ter se recuperado
-        for name, provider in self.providers.items():
-            if (not provider['available'] and
-                provider.get('last_success') and
-                current_time - provider['last_success'] > 300):  # 5 minutos
-                logger.info(f"🔄 Tentando reabilitar provedor {name} após cooldown")
-                provider['error_count'] = 0
-                provider['consecutive_failures'] = 0
-                if name == 'gemini' and HAS_GEMINI:
-                    provider['available'] = True
-                elif name == 'groq' and HAS_GROQ_CLIENT:
-                    provider['available'] = True
-                elif name == 'openai' and HAS_OPENAI:
-                    provider['available'] = True
-                elif name == 'huggingface':
-                    provider['available'] = True
-
-        available_providers = [
-            (name, provider) for name, provider in self.providers.items()
-            if provider['available'] and provider['consecutive_failures'] < provider.get('max_errors', 2)
+        """Retorna o provedor com menor custo esperado segundo as estatísticas ao vivo."""
+        ranked = self._rank_providers()
+        return ranked[0] if ranked else None
+
+    def _rank_providers(self, exclude: List[str] = None, record: bool = True) -> List[str]:
+        """Ordena provedores configurados por latência p50/p95 e taxa de sucesso, respeitando o circuit breaker.
+
+        Não altera o estado dos circuitos: com todos abertos, retorna só o que reabre primeiro
+        e a chamada real reserva a sonda com allow_request(force_probe=True).
+        """
+        exclude = exclude or []
+        candidates = [
+            name for name, provider in self.providers.items()
+            if provider['available'] and name not in exclude
         ]
 
-        if not available_providers:
-            logger.warning("🔄 Nenhum provedor saudável disponível. Resetando contadores.")
-            for provider in self.providers.values():
-                provider['error_count'] = 0
-                provider['consecutive_failures'] = 0
-            available_providers = [(name, p) for name, p in self.providers.items() if p['available']]
-
-        if available_providers:
-            # Ordena por prioridade e falhas consecutivas
-            available_providers.sort(key=lambda x: (x[1]['priority'], x[1]['consecutive_failures']))
-            return available_providers[0][0]
-
-        return None
+        scores = {name: self.health[name].routing_score() for name in candidates}
+        routable = [name for name in candidates if self.health[name].is_routable()]
+        ranked = sorted(routable, key=lambda name: (scores[name], self.providers[name]['priority']))
+
+        if not ranked and candidates:
+            # Todos os circuitos abertos: sonda o que reabre primeiro em vez de falhar
+            soonest = min(candidates, key=lambda name: self.health[name].seconds_until_retry())
+            ranked = [soonest]
+
+        if record:
+            self.last_routing_decision = {
+                'timestamp': time.time(),
+                'selected': ranked[0] if ranked else None,
+                'order': ranked,
+                'excluded': exclude,
+                'blocked': [name for name in candidates if name not in ranked],
+                'scores': {name: round(score, 3) for name, score in scores.items()}
+            }
 
-    def generate_analysis(self, prompt: str, max_tokens: int = 8192, provider: Optional[str] = None) -> Optional[str]:
-        """Gera análise usando um provedor específico ou o melhor disponível com fallback."""
+        return ranked
+
+    def _needs_forced_probe(self, ranked: List[str]) -> bool:
+        """Ranking com todos os circuitos abertos: a chamada deve antecipar a sonda do primeiro"""
+        if len(ranked) == 1 and not self.health[ranked[0]].is_routable():
+            logger.warning(f"🔄 Todos os circuitos abertos. Forçando sonda em {ranked[0]}")
+            return True
+        return False
+
+    def generate_analysis(
+        self,
+        prompt: str,
+        max_tokens: int = 8192,
+        provider: Optional[str] = None,
+        hedge: Optional[bool] = None
+    ) -> Optional[str]:
+        """Gera análise usando um provedor específico ou o melhor disponível com fallback.
+
+        hedge=True (ou AI_HEDGING_ENABLED) dispara uma segunda requisição ao próximo
+        provedor quando o primário passa do percentil configurado da sua latência.
+        """
+
+        # Resposta idêntica já gerada recentemente
+        cached = self._get_cached_response(prompt, max_tokens, [provider] if provider else None)
+        if cached is not None:
+            return cached
+
+        # Chamadas concorrentes com o mesmo prompt compartilham uma única requisição
+        fingerprint = self._prompt_fingerprint('generate_analysis', prompt, max_tokens, provider=provider)
+        return self.single_flight.do(
+            fingerprint,
+            lambda: self._generate_analysis_upstream(prompt, max_tokens, provider, hedge)
+        )
 
-        start_time = time.time()
+    def _generate_analysis_upstream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        provider: Optional[str] = None,
+        hedge: Optional[bool] = None,
+        exclude: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """Executa a geração no provedor (sem cache), com fallback."""
 
         # Se um provedor específico for solicitado
         if provider:
-            if self.providers.get(provider) and self.providers[provider]['available']:
+            if self.providers.get(provider) and self.providers[provider]['available'] and self.health[provider].allow_request():
                 logger.info(f"🤖 Usando provedor solicitado: {provider.upper()}")
                 try:
-                    result = self._call_provider(provider, prompt, max_tokens)
-                    if result:
-                        self._record_success(provider)
-                        return result
-                    else:
-                        raise Exception("Resposta vazia")
+                    return self._call_provider(provider, prompt, max_tokens)
                 except Exception as e:
                     logger.error(f"❌ Provedor solicitado {provider.upper()} falhou: {e}")
-                    self._record_failure(provider, str(e))
                     return None # Não tenta fallback se um provedor específico foi pedido e falhou
             else:
                 logger.error(f"❌ Provedor solicitado '{provider}' não está disponível.")
                 return None
 
-        # Lógica de fallback padrão
-        provider_name = self.get_best_provider()
-        if not provider_name:
+        # Roteamento adaptativo com fallback pela ordem de custo esperado
+        ranked = self._rank_providers(exclude)
+        if not ranked:
             raise Exception("❌ NENHUM PROVEDOR DE IA DISPONÍVEL: Configure pelo menos uma API de IA (Gemini, Groq, OpenAI ou HuggingFace)")
 
-        try:
-            result = self._call_provider(provider_name, prompt, max_tokens)
+        force_probe = self._needs_forced_probe(ranked)
+        hedge = self.hedging_enabled if hedge is None else hedge
+        if hedge and len(ranked) > 1:
+            result, ranked = self._generate_hedged(prompt, max_tokens, ranked)
             if result:
-                self._record_success(provider_name)
                 return result
-            else:
-                raise Exception("Resposta vazia do provedor")
-        except Exception as e:
-            logger.error(f"❌ Erro no provedor {provider_name}: {e}")
-            self._record_failure(provider_name, str(e))
-            return self._try_fallback(prompt, max_tokens, exclude=[provider_name])
-
-    def _try_fallback(self, prompt: str, max_tokens: int, exclude: List[str]) -> Optional[str]:
-        """Tenta usar o próximo provedor disponível como fallback."""
-        logger.info(f"🔄 Acionando fallback, excluindo: {', '.join(exclude)}")
-
-        # Ordena provedores por prioridade, excluindo os que já falharam
-        available_providers = [
-            (name, provider) for name, provider in self.providers.items()
-            if (provider['available'] and
-                name not in exclude and
-                provider['consecutive_failures'] < provider.get('max_errors', 2))
-        ]
 
-        if not available_providers:
-            logger.critical("❌ Todos os provedores de fallback falharam.")
-            return None
+        tried = []
+        for provider_name in ranked:
+            if not self.health[provider_name].allow_request(force_probe=force_probe):
+                continue
 
-        # Ordena por prioridade
-        available_providers.sort(key=lambda x: (x[1]['priority'], x[1]['consecutive_failures']))
-        next_provider = available_providers[0][0]
+            if tried:
+                logger.info(f"🔄 Tentando fallback para: {provider_name.upper()} (falharam: {', '.join(tried)})")
 
-        logger.info(f"🔄 Tentando fallback para: {next_provider.upper()}")
+            try:
+                return self._call_provider(provider_name, prompt, max_tokens)
+            except Exception as e:
+                logger.error(f"❌ Erro no provedor {provider_name}: {e}")
+                tried.append(provider_name)
+
+        logger.critical("❌ Todos os provedores de fallback falharam.")
+        return None
+
+    def _generate_hedged(self, prompt: str, max_tokens: int, ranked: List[str]) -> tuple:
+        """Executa o primário e, se passar do percentil de latência, dispara o próximo provedor.
+
+        Retorna (resultado, provedores restantes para fallback sequencial).
+        """
+        primary = ranked[0]
+        if not self.health[primary].allow_request():
+            return None, ranked[1:]
+
+        with self.hedge_lock:
+            self.hedge_stats['hedged_calls'] += 1
+
+        hedge_delay = self.health[primary].latency_quantile(self.hedge_percentile)
+        futures = {self.hedge_executor.submit(self._call_provider, primary, prompt, max_tokens): primary}
+        remaining = ranked[1:]
+
+        done, _ = wait(list(futures), timeout=hedge_delay)
+        if not done:
+            secondary = next((name for name in remaining if self.health[name].is_routable()), None)
+            # O circuit breaker vem antes: o orçamento só é gasto em um hedge que realmente dispara
+            if secondary and self.health[secondary].allow_request() and self._acquire_hedge_budget(secondary):
+                logger.info(f"🪁 {primary.upper()} passou de {hedge_delay:.1f}s (p{self.hedge_percentile * 100:.0f}); disparando hedge para {secondary.upper()}")
+                futures[self.hedge_executor.submit(self._call_provider, secondary, prompt, max_tokens)] = secondary
+                remaining = [name for name in remaining if name != secondary]
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Erro no provedor {futures[future]}: {e}")
+                    continue
 
+                winner = futures[future]
+                if winner != primary:
+                    with self.hedge_lock:
+                        self.hedge_stats['hedge_wins'] += 1
+                if pending:
+                    # A requisição perdedora segue em background; o resultado é ignorado
+                    logger.info(f"🏁 {winner.upper()} respondeu primeiro; descartando requisição concorrente")
+                return result, []
+
+        return None, remaining
+
+    def _acquire_hedge_budget(self, provider_name: str) -> bool:
+        """Consome uma unidade do orçamento de hedges por minuto; sem orçamento, devolve a sonda reservada do provedor"""
+        now = time.time()
+        with self.hedge_lock:
+            while self.hedge_timestamps and now - self.hedge_timestamps[0] > 60:
+                self.hedge_timestamps.popleft()
+
+            if len(self.hedge_timestamps) >= self.hedge_max_per_minute:
+                self.hedge_stats['budget_denied'] += 1
+                logger.warning(f"⚠️ Orçamento de hedge esgotado ({self.hedge_max_per_minute}/min)")
+                self.health[provider_name].release_probe()
+                return False
+
+            self.hedge_timestamps.append(now)
+            self.hedge_stats['hedges_fired'] += 1
+            return True
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Estatísticas de hedging"""
+        with self.hedge_lock:
+            stats = dict(self.hedge_stats)
+            recent = sum(1 for ts in self.hedge_timestamps if time.time() - ts <= 60)
+        stats.update({
+            'enabled': self.hedging_enabled,
+            'percentile': self.hedge_percentile,
+            'max_per_minute': self.hedge_max_per_minute,
+            'used_last_minute': recent
+        })
+        return stats
+
+    def generate_stream(self, prompt: str, max_tokens: int = 8192, provider: Optional[str] = None) -> Iterator[str]:
+        """Gera conteúdo em partes (streaming) conforme chegam do provedor.
+
+        Gemini, Groq e OpenAI transmitem tokens; os demais provedores entregam
+        a resposta completa em uma única parte. Se um provedor falhar antes da
+        primeira parte, tenta o próximo do ranking; esgotado o ranking, levanta exceção.
+        """
+
+        cached = self._get_cached_response(prompt, max_tokens, [provider] if provider else None)
+        if cached is not None:
+            yield cached
+            return
+
+        if provider:
+            ranked = [provider] if self.providers.get(provider) and self.providers[provider]['available'] else []
+        else:
+            ranked = self._rank_providers()
+
+        if not ranked:
+            raise Exception("❌ NENHUM PROVEDOR DE IA DISPONÍVEL para streaming")
+
+        force_probe = self._needs_forced_probe(ranked)
+        errors = []
+        for provider_name in ranked:
+            if not self.health[provider_name].allow_request(force_probe=force_probe):
+                errors.append(f"{provider_name}: circuito aberto")
+                continue
+
+            call_start = time.time()
+            chunks = []
+            try:
+                for chunk in self._dispatch_stream(provider_name, prompt, max_tokens):
+                    if chunk:
+                        if not chunks:
+                            logger.info(f"⚡ {provider_name.upper()}: primeira parte em {time.time() - call_start:.2f}s")
+                        chunks.append(chunk)
+                        yield chunk
+
+                content = ''.join(chunks)
+                if not content:
+                    raise Exception(f"Resposta vazia do provedor {provider_name}")
+
+            except GeneratorExit:
+                # Consumidor abandonou o stream
+                self.health[provider_name].release_probe()
+                raise
+            except Exception as e:
+                self._record_failure(provider_name, str(e), time.time() - call_start)
+                if chunks:
+                    # Parte da resposta já foi entregue; não é possível trocar de provedor no meio do stream
+                    raise StreamInterruptedError(provider_name, e) from e
+                logger.error(f"❌ Streaming com {provider_name} falhou: {e}")
+                errors.append(f"{provider_name}: {e}")
+                continue
+
+            latency = time.time() - call_start
+            self._record_success(provider_name, latency, content)
+            self._store_cached_response(provider_name, prompt, max_tokens, content, latency)
+            return
+
+        logger.critical("❌ Todos os provedores falharam no streaming.")
+        raise Exception(f"❌ Todos os provedores falharam no streaming ({'; '.join(errors)})")
+
+    def generate_analysis_streamed(
+        self,
+        prompt: str,
+        max_tokens: int = 8192,
+        session_id: Optional[str] = None,
+        section: str = 'analysis',
+        provider: Optional[str] = None
+    ) -> Optional[str]:
+        """Como generate_analysis, mas publica cada parte no stream da sessão e retorna o texto completo.
+
+        Usa a mesma chave de single-flight de generate_analysis: uma chamada idêntica em andamento
+        é aguardada e a resposta compartilhada é publicada em uma única parte.
+        """
+
+        if not session_id:
+            return self.generate_analysis(prompt, max_tokens, provider)
+
+        channel = stream_hub.token_channel(session_id)
+        stream_hub.publish(channel, 'section_start', {'section': section})
+        streamed = []
+
+        def stream_upstream():
+            streamed.append(True)
+            return self._stream_to_session(prompt, max_tokens, channel, section, provider)
+
+        fingerprint = self._prompt_fingerprint('generate_analysis', prompt, max_tokens, provider=provider)
         try:
-            result = self._call_provider(next_provider, prompt, max_tokens)
-            if result:
-                self._record_success(next_provider)
-                return result
-            else:
-                raise Exception("Resposta vazia do fallback")
+            content = self.single_flight.do(fingerprint, stream_upstream)
         except Exception as e:
-            logger.error(f"❌ Fallback para {next_provider} também falhou: {e}")
-            self._record_failure(next_provider, str(e))
-            return self._try_fallback(prompt, max_tokens, exclude + [next_provider])
+            logger.error(f"❌ Erro no streaming da seção {section}: {e}")
+            stream_hub.publish(channel, 'section_error', {'section': section, 'error': str(e)})
+            return None
+
+        if content and not streamed:
+            stream_hub.publish(channel, 'token', {'section': section, 'text': content})
+
+        stream_hub.publish(channel, 'section_end', {'section': section, 'chars': len(content or '')})
+        return content or None
+
+    def _stream_to_session(
+        self,
+        prompt: str,
+        max_tokens: int,
+        channel: str,
+        section: str,
+        provider: Optional[str] = None
+    ) -> Optional[str]:
+        """Publica as partes no canal de tokens da sessão; se o provedor cair no meio, refaz o prompt sem streaming no próximo do ranking"""
+        chunks = []
+        try:
+            for chunk in self.generate_stream(prompt, max_tokens, provider):
+                chunks.append(chunk)
+                stream_hub.publish(channel, 'token', {'section': section, 'text': chunk})
+            return ''.join(chunks)
+        except StreamInterruptedError as e:
+            logger.error(f"❌ Streaming da seção {section} interrompido: {e}")
+            stream_hub.publish(channel, 'section_error', {
+                'section': section, 'error': str(e), 'retrying': not provider
+            })
+            if provider:
+                return None
+            failed_provider = e.provider
+
+        # A resposta parcial é descartada: o texto completo substitui as partes já publicadas
+        content = self._generate_analysis_upstream(prompt, max_tokens, exclude=[failed_provider])
+        if content:
+            stream_hub.publish(channel, 'token', {'section': section, 'text': content, 'replace': True})
+        return content
 
     def generate_parallel_analysis(self, prompts: List[Dict[str, Any]], max_tokens: int = 8192) -> Dict[str, Any]:
         """Gera múltiplas análises em paralelo usando diferentes provedores"""
 
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import as_completed
 
         results = {}
 
-        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+        with ContextThreadPoolExecutor(max_workers=len(prompts)) as executor:
             future_to_prompt = {}
 
             for prompt_data in prompts:
@@ -314,27 +570,40 @@ class AIManager:
 
         return results
 
-    def _record_success(self, provider_name: str):
+    def _record_success(self, provider_name: str, latency: float = 0.0, content: Optional[str] = None):
         """Registra sucesso do provedor"""
         if provider_name in self.providers:
             self.providers[provider_name]['consecutive_failures'] = 0
             self.providers[provider_name]['last_success'] = time.time()
-            logger.info(f"✅ Sucesso registrado para {provider_name}")
+            self.health[provider_name].record_success(latency, content)
+            logger.info(f"✅ Sucesso registrado para {provider_name} ({latency:.1f}s)")
 
-    def _record_failure(self, provider_name: str, error_msg: str):
+    def _record_failure(self, provider_name: str, error_msg: str, latency: Optional[float] = None):
         """Registra falha do provedor"""
         if provider_name in self.providers:
             self.providers[provider_name]['error_count'] += 1
             self.providers[provider_name]['consecutive_failures'] += 1
-
-            # Desabilita temporariamente se muitas falhas consecutivas
-            if self.providers[provider_name]['consecutive_failures'] >= self.providers[provider_name]['max_errors']:
-                logger.warning(f"⚠️ Desabilitando {provider_name} temporariamente após {self.providers[provider_name]['consecutive_failures']} falhas consecutivas")
-                self.providers[provider_name]['available'] = False
+            self.health[provider_name].record_failure(latency)
 
             logger.error(f"❌ Falha registrada para {provider_name}: {error_msg}")
 
     def _call_provider(self, provider_name: str, prompt: str, max_tokens: int) -> Optional[str]:
+        """Chama o provedor especificado, registra latência/resultado e armazena a resposta no cache."""
+        call_start = time.time()
+        try:
+            result = self._dispatch_provider(provider_name, prompt, max_tokens)
+            if not result:
+                raise Exception(f"Resposta vazia do provedor {provider_name}")
+        except Exception as e:
+            self._record_failure(provider_name, str(e), time.time() - call_start)
+            raise
+
+        latency = time.time() - call_start
+        self._record_success(provider_name, latency, result)
+        self._store_cached_response(provider_name, prompt, max_tokens, result, latency)
+        return result
+
+    def _dispatch_provider(self, provider_name: str, prompt: str, max_tokens: int) -> Optional[str]:
         """Chama a função de geração do provedor especificado."""
         if provider_name == 'gemini':
             return self._generate_with_gemini(prompt, max_tokens)
@@ -346,9 +615,18 @@ class AIManager:
             return self._generate_with_huggingface(prompt, max_tokens)
         return None
 
-    def _generate_with_gemini(self, prompt: str, max_tokens: int) -> Optional[str]:
-        """Gera conteúdo usando Gemini."""
-        client = self.providers['gemini']['client']
+    def _dispatch_stream(self, provider_name: str, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Chama a variante de streaming do provedor (ou a resposta completa em uma parte)."""
+        if provider_name == 'gemini':
+            return self._stream_with_gemini(prompt, max_tokens)
+        elif provider_name == 'groq':
+            return self._stream_with_groq(prompt, max_tokens)
+        elif provider_name == 'openai':
+            return self._stream_with_openai(prompt, max_tokens)
+        return iter([self._dispatch_provider(provider_name, prompt, max_tokens) or ''])
+
+    def _gemini_settings(self, max_tokens: int) -> tuple:
+        """Configuração de geração e segurança do Gemini."""
         config = {
             "temperature": 0.8,  # Criatividade controlada
             "max_output_tokens": min(max_tokens, 8192),
@@ -359,12 +637,64 @@ class AIManager:
             {"category": c, "threshold": "BLOCK_NONE"}
             for c in ["HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT"]
         ]
+        return config, safety
+
+    def _generate_with_gemini(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Gera conteúdo usando Gemini."""
+        client = self.providers['gemini']['client']
+        config, safety = self._gemini_settings(max_tokens)
         response = client.generate_content(prompt, generation_config=config, safety_settings=safety)
         if response.text:
             logger.info(f"✅ Gemini 2.5 Pro gerou {len(response.text)} caracteres")
             return response.text
         raise Exception("Resposta vazia do Gemini 2.5 Pro")
 
+    def _stream_with_gemini(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Transmite conteúdo do Gemini."""
+        client = self.providers['gemini']['client']
+        config, safety = self._gemini_settings(max_tokens)
+        for chunk in client.generate_content(prompt, generation_config=config, safety_settings=safety, stream=True):
+            text = getattr(chunk, 'text', None)
+            if text:
+                yield text
+
+    def _stream_with_groq(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Transmite conteúdo do Groq."""
+        client = self.providers['groq']['client']
+        sdk_client = getattr(client, 'client', None)
+        if sdk_client is None:
+            from groq import Groq
+            sdk_client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+        stream = sdk_client.chat.completions.create(
+            model="llama3-70b-8192",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=min(max_tokens, 8192),
+            temperature=0.7,
+            stream=True
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
+
+    def _stream_with_openai(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Transmite conteúdo do OpenAI."""
+        client = self.providers['openai']['client']
+        stream = client.chat.completions.create(
+            model=self.providers['openai']['model'],
+            messages=[
+                {"role": "system", "content": "Você é um especialista em análise de mercado ultra-detalhada."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=min(max_tokens, 4096),
+            temperature=0.7,
+            stream=True
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
+
     def _generate_with_groq(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Gera conteúdo usando Groq."""
         client = self.providers['groq']['client']
@@ -435,90 +765,165 @@ class AIManager:
                 continue
         raise Exception("Todos os modelos HuggingFace falharam")
 
+    def _cache_key(self, provider_name: str, prompt: str, max_tokens: int, extra: Dict[str, Any] = None) -> str:
+        """Chave do cache: provedor, modelo, prompt normalizado e max_tokens"""
+        provider = self.providers.get(provider_name, {})
+        model = provider.get('model') or ','.join(provider.get('models', []))
+        return self.response_cache.make_key(
+            provider_name,
+            model,
+            self.response_cache.normalize_text(prompt),
+            max_tokens,
+            extra or {}
+        )
+
+    def _get_cached_response(
+        self,
+        prompt: str,
+        max_tokens: int,
+        providers: Optional[List[str]] = None,
+        extra: Dict[str, Any] = None
+    ) -> Optional[str]:
+        """Procura resposta em cache nos provedores indicados ou em todos os disponíveis"""
+        if not self.response_cache.enabled:
+            return None
+
+        if providers is None:
+            providers = [
+                name for name, _ in sorted(
+                    ((n, p) for n, p in self.providers.items() if p.get('client')),
+                    key=lambda x: x[1]['priority']
+                )
+            ]
+
+        hit = self.response_cache.get_any([
+            (name, self._cache_key(name, prompt, max_tokens, extra)) for name in providers
+        ])
+        if hit is None:
+            return None
+
+        provider_name, content = hit
+        logger.info(f"♻️ Resposta em cache ({provider_name}) reutilizada: {len(content)} caracteres")
+        return content
+
+    def _store_cached_response(
+        self,
+        provider_name: str,
+        prompt: str,
+        max_tokens: int,
+        content: Any,
+        latency: float,
+        extra: Dict[str, Any] = None
+    ):
+        """Armazena resposta válida no cache"""
+        if isinstance(content, str) and content.strip():
+            self.response_cache.set(
+                self._cache_key(provider_name, prompt, max_tokens, extra),
+                content,
+                group=provider_name,
+                latency=latency
+            )
+
+    def _prompt_fingerprint(self, method: str, prompt: str, max_tokens: int, **params) -> str:
+        """Identifica chamadas equivalentes para deduplicação em andamento"""
+        return self.response_cache.make_key(
+            method,
+            self.response_cache.normalize_text(prompt),
+            max_tokens,
+            params
+        )
+
+    def get_routing_decision(self) -> Dict[str, Any]:
+        """Última decisão de roteamento (ordem, bloqueados por circuit breaker e scores)"""
+        return self.last_routing_decision
+
+    def get_single_flight_stats(self) -> Dict[str, Any]:
+        """Retorna quantas chamadas foram executadas e quantas foram coalescidas"""
+        return self.single_flight.get_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache de respostas"""
+        return self.response_cache.get_stats()
+
+    def clear_cache(self):
+        """Limpa cache de respostas de IA"""
+        self.response_cache.clear()
+
     def reset_provider_errors(self, provider_name: str = None):
         """Reset contadores de erro dos provedores"""
         if provider_name:
             if provider_name in self.providers:
                 self.providers[provider_name]['error_count'] = 0
                 self.providers[provider_name]['consecutive_failures'] = 0
-                self.providers[provider_name]['available'] = True
+                self.providers[provider_name]['available'] = bool(self.providers[provider_name].get('client'))
+                self.health[provider_name].reset()
                 logger.info(f"🔄 Reset erros do provedor: {provider_name}")
         else:
-            for provider in self.providers.values():
+            for name, provider in self.providers.items():
                 provider['error_count'] = 0
                 provider['consecutive_failures'] = 0
+                self.health[name].reset()
                 if provider.get('client'):  # Só reabilita se tem cliente configurado
                     provider['available'] = True
             logger.info("🔄 Reset erros de todos os provedores")
 
-    def _try_fallback(self, prompt: str, max_tokens: int, exclude: List[str]) -> Optional[str]:
-        """Tenta usar o próximo provedor disponível como fallback."""
-        logger.info(f"🔄 Acionando fallback, excluindo: {', '.join(exclude)}")
-
-        # Ordena provedores por prioridade, excluindo os que já falharam
-        available_providers = [
-            (name, provider) for name, provider in self.providers.items()
-            if (provider['available'] and
-                name not in exclude and
-                provider['consecutive_failures'] < provider.get('max_errors', 2))
-        ]
-
-        if not available_providers:
-            logger.critical("❌ Todos os provedores de fallback falharam.")
-            return None
-
-        # Ordena por prioridade
-        available_providers.sort(key=lambda x: (x[1]['priority'], x[1]['consecutive_failures']))
-        next_provider = available_providers[0][0]
-
-        logger.info(f"🔄 Tentando fallback para: {next_provider.upper()}")
-
-        try:
-            result = self._call_provider(next_provider, prompt, max_tokens)
-            if result:
-                self._record_success(next_provider)
-                return result
-            else:
-                raise Exception("Resposta vazia do fallback")
-        except Exception as e:
-            logger.error(f"❌ Fallback para {next_provider} também falhou: {e}")
-            self._record_failure(next_provider, str(e))
-            return self._try_fallback(prompt, max_tokens, exclude + [next_provider])
-
-    def get_provider_status(self) -> Dict[str, str]:
-        """Retorna status de todos os provedores"""
+    def get_provider_status(self) -> Dict[str, Any]:
+        """Retorna status de todos os provedores, incluindo as entradas do roteamento adaptativo"""
         status = {}
+        routing_order = self._rank_providers(record=False)
 
         for provider_name, provider_info in self.providers.items():
             try:
                 # Testa se o provider está funcionando
-                if provider_info.get('client'):
-                    status[provider_name] = "available"
-                else:
-                    status[provider_name] = "unavailable"
+                status[provider_name] = {
+                    'available': bool(provider_info.get('client')),
+                    'status': "available" if provider_info.get('client') else "unavailable",
+                    'enabled': provider_info['available'],
+                    'priority': provider_info['priority'],
+                    'error_count': provider_info['error_count'],
+                    'consecutive_failures': provider_info['consecutive_failures'],
+                    'routing': {
+                        **self.health[provider_name].snapshot(),
+                        'rank': routing_order.index(provider_name) + 1 if provider_name in routing_order else None,
+                        'selected': provider_name == (routing_order[0] if routing_order else None)
+                    },
+                    'cache': self.response_cache.get_group_stats(provider_name)
+                }
             except Exception as e:
-                status[provider_name] = f"error: {str(e)}"
+                status[provider_name] = {'available': False, 'status': f"error: {str(e)}"}
 
         return status
 
     def generate_content(self, prompt: str, max_tokens: int = 2000, **kwargs) -> str:
         """Gera conteúdo usando o provedor primário ou fallback"""
+        try:
+            cache_extra = {'method': 'generate_content', **kwargs}
+            cached = self._get_cached_response(prompt, max_tokens, extra=cache_extra)
+            if cached is not None:
+                return cached
+
+            fingerprint = self._prompt_fingerprint('generate_content', prompt, max_tokens, **kwargs)
+            return self.single_flight.do(
+                fingerprint,
+                lambda: self._generate_content_upstream(prompt, max_tokens, cache_extra, **kwargs)
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Erro crítico no generate_content: {e}")
+            return f"Erro na geração de conteúdo: {str(e)}"
+
+    def _generate_content_upstream(self, prompt: str, max_tokens: int, cache_extra: Dict[str, Any], **kwargs) -> str:
+        """Executa generate_content nos clientes (sem cache), com fallback."""
         try:
             # Tenta com o provedor primário
             if self.primary_provider and self.primary_provider in self.providers:
                 provider_info = self.providers[self.primary_provider]
                 client = provider_info.get('client')
 
-                if client and hasattr(client, 'generate_content'):
-                    return client.generate_content(prompt, max_tokens=max_tokens, **kwargs)
-                elif client and hasattr(client, 'chat'):
-                    # Para clientes que usam chat interface
-                    response = client.chat(
-                        messages=[{"role": "user", "content": prompt}],
-                        max_tokens=max_tokens,
-                        **kwargs
-                    )
-                    return response.get('content', response.get('message', str(response)))
+                content = self._generate_content_with_client(client, prompt, max_tokens, **kwargs)
+                if content is not None:
+                    self._store_cached_response(self.primary_provider, prompt, max_tokens, content[0], content[1], cache_extra)
+                    return content[0]
 
             # Fallback para outros provedores
             for provider_name, provider_info in self.providers.items():
@@ -527,15 +932,10 @@ class AIManager:
 
                 try:
                     client = provider_info.get('client')
-                    if client and hasattr(client, 'generate_content'):
-                        return client.generate_content(prompt, max_tokens=max_tokens, **kwargs)
-                    elif client and hasattr(client, 'chat'):
-                        response = client.chat(
-                            messages=[{"role": "user", "content": prompt}],
-                            max_tokens=max_tokens,
-                            **kwargs
-                        )
-                        return response.get('content', response.get('message', str(response)))
+                    content = self._generate_content_with_client(client, prompt, max_tokens, **kwargs)
+                    if content is not None:
+                        self._store_cached_response(provider_name, prompt, max_tokens, content[0], content[1], cache_extra)
+                        return content[0]
                 except Exception as e:
                     logger.warning(f"❌ Fallback para {provider_name} falhou: {e}")
                     continue
@@ -547,6 +947,25 @@ class AIManager:
             logger.error(f"❌ Erro crítico no generate_content: {e}")
             return f"Erro na geração de conteúdo: {str(e)}"
 
+    def _generate_content_with_client(self, client: Any, prompt: str, max_tokens: int, **kwargs) -> Optional[tuple]:
+        """Chama a interface generate_content/chat do cliente; retorna (conteúdo, latência)"""
+        call_start = time.time()
+
+        if client and hasattr(client, 'generate_content'):
+            content = client.generate_content(prompt, max_tokens=max_tokens, **kwargs)
+        elif client and hasattr(client, 'chat'):
+            # Para clientes que usam chat interface
+            response = client.chat(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                **kwargs
+            )
+            content = response.get('content', response.get('message', str(response)))
+        else:
+            return None
+
+        return content, time.time() - call_start
+
 
 # Instância global
 ai_manager = AIManager()
\ No newline at end of file
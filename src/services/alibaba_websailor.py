@@ -11,13 +11,17 @@ import time
 import requests
 import json
 import random
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from urllib.parse import quote_plus, urljoin, urlparse
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from services.auto_save_manager import salvar_etapa, salvar_erro
+import asyncio
+from services.auto_save_manager import auto_save_manager, salvar_etapa, salvar_erro
+from services.search_cache import cached_search
+from services.async_crawl_engine import async_crawl_engine
+from services.rate_limiter import rate_limiter
+from services.url_resolver import url_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +73,10 @@ class AlibabaWebSailorAgent:
 
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        rate_limiter.mount(self.session)
+
+        # Motor assíncrono: extrações concorrentes com cortesia por host em vez de pausas globais
+        self.async_enabled = async_crawl_engine.enabled
 
         # Estatísticas de navegação
         self.navigation_stats = {
@@ -93,6 +101,21 @@ class AlibabaWebSailorAgent:
     ) -> Dict[str, Any]:
         """Navegação e pesquisa profunda com múltiplos níveis"""
 
+        if session_id:
+            with auto_save_manager.usar_sessao(session_id):
+                return self._navigate_and_research_deep(query, context, max_pages, depth_levels, session_id)
+        return self._navigate_and_research_deep(query, context, max_pages, depth_levels, session_id)
+
+    def _navigate_and_research_deep(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        max_pages: int = 25,
+        depth_levels: int = 3,
+        session_id: str = None
+    ) -> Dict[str, Any]:
+        """Navegação e pesquisa profunda com múltiplos níveis"""
+
         try:
             logger.info(f"🚀 INICIANDO NAVEGAÇÃO PROFUNDA para: {query}")
             start_time = time.time()
@@ -105,125 +128,316 @@ class AlibabaWebSailorAgent:
                 "depth_levels": depth_levels
             }, categoria="pesquisa_web")
 
-            all_content = []
-            search_engines_used = []
+            # Navegação: motor assíncrono (aiohttp) com concorrência limitada ou modo sequencial legado
+            if self.async_enabled:
+                all_content, search_engines_used = self._run_async(
+                    self._crawl_async(query, context, max_pages, depth_levels)
+                )
+            else:
+                all_content, search_engines_used = self._crawl_sync(query, context, max_pages, depth_levels)
+
+            # PROCESSAMENTO E ANÁLISE FINAL
+            processed_research = self._process_and_analyze_content(all_content, query, context)
+
+            # Atualiza estatísticas
+            self._update_navigation_stats(all_content)
+
+            end_time = time.time()
+
+            # Salva resultado final da navegação
+            salvar_etapa("websailor_resultado", processed_research, categoria="pesquisa_web")
+
+            logger.info(f"✅ NAVEGAÇÃO PROFUNDA CONCLUÍDA em {end_time - start_time:.2f} segundos")
+            logger.info(f"📊 {len(all_content)} páginas analisadas com {len(search_engines_used)} engines")
+
+            return processed_research
+
+        except Exception as e:
+            logger.error(f"❌ ERRO CRÍTICO na navegação WebSailor: {str(e)}")
+            salvar_erro("websailor_critico", e, contexto={"query": query})
+            return self._generate_emergency_research(query, context)
+
+    def _search_engines(self) -> List[Tuple[str, Any]]:
+        """Engines de busca em ordem de prioridade"""
+        return [
+            ("Google Custom Search", self._google_search_deep),
+            ("Serper API", self._serper_search_deep),
+            ("Bing Scraping", self._bing_search_deep),
+            ("DuckDuckGo Scraping", self._duckduckgo_search_deep),
+            ("Yahoo Scraping", self._yahoo_search_deep)
+        ]
+
+    def _run_async(self, coro):
+        return async_crawl_engine.run(coro)
+
+    async def _crawl_async(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        max_pages: int,
+        depth_levels: int
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Navegação assíncrona: engines e páginas de cada nível extraídas em paralelo"""
+
+        all_content = []
+        search_engines_used = []
+        page_html = {}  # HTML já baixado, reaproveitado na busca de links internos
+
+        async with async_crawl_engine.session(self.headers) as crawler:
+
+            async def extract_all(results):
+                return await asyncio.gather(*(
+                    self._extract_intelligent_content_async(
+                        crawler, result['url'], result.get('title', ''), result.get('snippet', ''), context, page_html
+                    )
+                    for result in results
+                ))
 
             # NÍVEL 1: BUSCA MASSIVA MULTI-ENGINE
-            logger.info("🔍 NÍVEL 1: Busca massiva com múltiplos engines")
-
-            # Engines de busca em ordem de prioridade
-            search_engines = [
-                ("Google Custom Search", self._google_search_deep),
-                ("Serper API", self._serper_search_deep),
-                ("Bing Scraping", self._bing_search_deep),
-                ("DuckDuckGo Scraping", self._duckduckgo_search_deep),
-                ("Yahoo Scraping", self._yahoo_search_deep)
-            ]
-
-            for engine_name, search_func in search_engines:
+            logger.info("🔍 NÍVEL 1: Busca massiva com múltiplos engines (concorrente)")
+
+            search_engines = self._search_engines()
+
+            async def run_engine(engine_name, search_func):
                 try:
                     logger.info(f"🔍 Executando {engine_name}...")
-                    results = search_func(query, max_pages // len(search_engines))
-
+                    results = await async_crawl_engine.run_blocking(
+                        search_func, query, max_pages // len(search_engines)
+                    ) or []
                     if results:
-                        search_engines_used.append(engine_name)
                         logger.info(f"✅ {engine_name}: {len(results)} resultados")
+                    # Extrações começam assim que o engine responde, sem esperar os demais
+                    return results, await extract_all(results)
+                except Exception as e:
+                    logger.error(f"❌ Erro em {engine_name}: {str(e)}")
+                    return [], []
 
-                        # Extrai conteúdo de cada resultado
-                        for result in results:
-                            content_data = self._extract_intelligent_content(
-                                result['url'], result.get('title', ''), result.get('snippet', ''), context
-                            )
-
-                            if content_data and content_data['success']:
-                                all_content.append({
-                                    **content_data,
-                                    'search_engine': engine_name,
-                                    'search_result': result
-                                })
-
-                                # Salva cada extração bem-sucedida
-                                salvar_etapa(f"websailor_extracao_{len(all_content)}", {
-                                    "url": result['url'],
-                                    "engine": engine_name,
-                                    "content_length": len(content_data['content']),
-                                    "quality_score": content_data['quality_score']
-                                }, categoria="pesquisa_web")
+            engine_outputs = await asyncio.gather(*(run_engine(name, func) for name, func in search_engines))
 
-                            time.sleep(0.5)  # Rate limiting
+            # Mesma ordem do modo sequencial: engine por engine, resultado por resultado
+            for (engine_name, _), (results, extracted) in zip(search_engines, engine_outputs):
+                if results:
+                    search_engines_used.append(engine_name)
 
-                    time.sleep(1)  # Delay entre engines
+                for result, content_data in zip(results, extracted):
+                    if content_data and content_data['success']:
+                        all_content.append({
+                            **content_data,
+                            'search_engine': engine_name,
+                            'search_result': result
+                        })
 
-                except Exception as e:
-                    logger.error(f"❌ Erro em {engine_name}: {str(e)}")
-                    continue
+                        # Salva cada extração bem-sucedida
+                        salvar_etapa(f"websailor_extracao_{len(all_content)}", {
+                            "url": result['url'],
+                            "engine": engine_name,
+                            "content_length": len(content_data['content']),
+                            "quality_score": content_data['quality_score']
+                        }, categoria="pesquisa_web")
 
             # NÍVEL 2: BUSCA EM PROFUNDIDADE (Links internos)
             if depth_levels > 1 and all_content:
-                logger.info("🔍 NÍVEL 2: Busca em profundidade - Links internos")
+                logger.info("🔍 NÍVEL 2: Busca em profundidade - Links internos (concorrente)")
 
                 # Seleciona top páginas para explorar links internos
                 top_pages = sorted(all_content, key=lambda x: x['quality_score'], reverse=True)[:5]
 
-                for page in top_pages:
-                    internal_links = self._extract_internal_links(page['url'], page['content'])
-
-                    for link in internal_links[:3]:  # Top 3 links por página
-                        internal_content = self._extract_intelligent_content(link, "", "", context)
-
-                        if internal_content and internal_content['success']:
-                            internal_content['search_engine'] = f"{page['search_engine']} (Internal)"
-                            internal_content['parent_url'] = page['url']
-                            all_content.append(internal_content)
-
-                            time.sleep(0.3)
+                link_lists = await asyncio.gather(*(
+                    self._internal_links_async(crawler, page['url'], page_html) for page in top_pages
+                ))
+                pairs = [(page, link) for page, links in zip(top_pages, link_lists) for link in links[:3]]
+                internal_results = await asyncio.gather(*(
+                    self._extract_intelligent_content_async(crawler, link, "", "", context, page_html)
+                    for _, link in pairs
+                ))
+
+                for (page, _), internal_content in zip(pairs, internal_results):
+                    if internal_content and internal_content['success']:
+                        internal_content['search_engine'] = f"{page['search_engine']} (Internal)"
+                        internal_content['parent_url'] = page['url']
+                        all_content.append(internal_content)
 
             # NÍVEL 3: QUERIES RELACIONADAS INTELIGENTES
             if depth_levels > 2:
-                logger.info("🔍 NÍVEL 3: Queries relacionadas inteligentes")
+                logger.info("🔍 NÍVEL 3: Queries relacionadas inteligentes (concorrente)")
 
-                related_queries = self._generate_intelligent_related_queries(query, context, all_content)
+                related_queries = self._generate_intelligent_related_queries(query, context, all_content)[:3]
 
-                for related_query in related_queries[:3]:
+                async def run_related(related_query):
                     try:
-                        related_results = self._google_search_deep(related_query, 5)
+                        related_results = await async_crawl_engine.run_blocking(
+                            self._google_search_deep, related_query, 5
+                        ) or []
+                        return related_results, await extract_all(related_results)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Erro em query relacionada '{related_query}': {str(e)}")
+                        return [], []
+
+                related_outputs = await asyncio.gather(*(run_related(rq) for rq in related_queries))
+
+                for related_query, (_, extracted) in zip(related_queries, related_outputs):
+                    for related_content in extracted:
+                        if related_content and related_content['success']:
+                            related_content['search_engine'] = "Google (Related Query)"
+                            related_content['related_query'] = related_query
+                            all_content.append(related_content)
+
+        logger.info(
+            f"🕸️ Navegação assíncrona: {crawler.stats['requests']} requisições, "
+            f"{crawler.stats['errors']} falhas, {crawler.stats['politeness_wait']:.1f}s de espera por cortesia"
+        )
+        return all_content, search_engines_used
+
+    async def _extract_intelligent_content_async(
+        self,
+        crawler,
+        url: str,
+        title: str,
+        snippet: str,
+        context: Dict[str, Any],
+        page_html: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """Versão assíncrona de _extract_intelligent_content"""
 
-                        for result in related_results:
-                            related_content = self._extract_intelligent_content(
-                                result['url'], result.get('title', ''), result.get('snippet', ''), context
-                            )
+        if not self._should_extract(url, title, snippet):
+            return None
 
-                            if related_content and related_content['success']:
-                                related_content['search_engine'] = "Google (Related Query)"
-                                related_content['related_query'] = related_query
-                                all_content.append(related_content)
+        try:
+            content = await self._fetch_content_async(crawler, url, page_html)
+            return self._build_content_result(url, title, content, context)
 
-                                time.sleep(0.4)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Erro em query relacionada '{related_query}': {str(e)}")
-                        continue
+        except Exception as e:
+            logger.error(f"❌ Erro ao extrair conteúdo de {url}: {str(e)}")
+            self.navigation_stats['failed_extractions'] += 1
+            return None
 
-            # PROCESSAMENTO E ANÁLISE FINAL
-            processed_research = self._process_and_analyze_content(all_content, query, context)
+    async def _fetch_content_async(self, crawler, url: str, page_html: Dict[str, str]) -> Optional[str]:
+        """Jina Reader primeiro; se falhar, baixa o HTML uma vez e aplica as demais estratégias"""
 
-            # Atualiza estatísticas
-            self._update_navigation_stats(all_content)
+        status, content = await crawler.fetch_text(f"{self.jina_reader_url}{url}", timeout=60)
+        if status == 200 and content and len(content) > 300:
+            if len(content) > 15000:
+                content = content[:15000] + "... [conteúdo truncado para otimização]"
+            logger.info(f"✅ Jina Reader: {len(content)} caracteres de {url}")
+            return content
 
-            end_time = time.time()
+        status, html = await crawler.fetch_text(url, timeout=20)
+        if status != 200 or not html:
+            return None
 
-            # Salva resultado final da navegação
-            salvar_etapa("websailor_resultado", processed_research, categoria="pesquisa_web")
+        page_html[url] = html
+        return await async_crawl_engine.run_blocking(self._extract_from_html, url, html)
 
-            logger.info(f"✅ NAVEGAÇÃO PROFUNDA CONCLUÍDA em {end_time - start_time:.2f} segundos")
-            logger.info(f"📊 {len(all_content)} páginas analisadas com {len(search_engines_used)} engines")
+    async def _internal_links_async(self, crawler, base_url: str, page_html: Dict[str, str]) -> List[str]:
+        """Links internos usando o HTML já baixado quando disponível"""
 
-            return processed_research
+        html = page_html.get(base_url)
+        if html is None:
+            status, html = await crawler.fetch_text(base_url, timeout=10)
+            if status != 200 or not html:
+                return []
 
-        except Exception as e:
-            logger.error(f"❌ ERRO CRÍTICO na navegação WebSailor: {str(e)}")
-            salvar_erro("websailor_critico", e, contexto={"query": query})
-            return self._generate_emergency_research(query, context)
+        try:
+            return await async_crawl_engine.run_blocking(self._parse_internal_links, base_url, html)
+        except Exception:
+            return []
+
+    def _crawl_sync(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        max_pages: int,
+        depth_levels: int
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Navegação sequencial (sem aiohttp): níveis 1-3 com pausas fixas entre requisições"""
+
+        all_content = []
+        search_engines_used = []
+
+        # NÍVEL 1: BUSCA MASSIVA MULTI-ENGINE
+        logger.info("🔍 NÍVEL 1: Busca massiva com múltiplos engines")
+
+        # Engines de busca em ordem de prioridade
+        search_engines = self._search_engines()
+
+        for engine_name, search_func in search_engines:
+            try:
+                logger.info(f"🔍 Executando {engine_name}...")
+                results = search_func(query, max_pages // len(search_engines))
+
+                if results:
+                    search_engines_used.append(engine_name)
+                    logger.info(f"✅ {engine_name}: {len(results)} resultados")
+
+                    # Extrai conteúdo de cada resultado
+                    for result in results:
+                        content_data = self._extract_intelligent_content(
+                            result['url'], result.get('title', ''), result.get('snippet', ''), context
+                        )
+
+                        if content_data and content_data['success']:
+                            all_content.append({
+                                **content_data,
+                                'search_engine': engine_name,
+                                'search_result': result
+                            })
+
+                            # Salva cada extração bem-sucedida
+                            salvar_etapa(f"websailor_extracao_{len(all_content)}", {
+                                "url": result['url'],
+                                "engine": engine_name,
+                                "content_length": len(content_data['content']),
+                                "quality_score": content_data['quality_score']
+                            }, categoria="pesquisa_web")
+
+            except Exception as e:
+                logger.error(f"❌ Erro em {engine_name}: {str(e)}")
+                continue
+
+        # NÍVEL 2: BUSCA EM PROFUNDIDADE (Links internos)
+        if depth_levels > 1 and all_content:
+            logger.info("🔍 NÍVEL 2: Busca em profundidade - Links internos")
+
+            # Seleciona top páginas para explorar links internos
+            top_pages = sorted(all_content, key=lambda x: x['quality_score'], reverse=True)[:5]
+
+            for page in top_pages:
+                internal_links = self._extract_internal_links(page['url'], page['content'])
+
+                for link in internal_links[:3]:  # Top 3 links por página
+                    internal_content = self._extract_intelligent_content(link, "", "", context)
+
+                    if internal_content and internal_content['success']:
+                        internal_content['search_engine'] = f"{page['search_engine']} (Internal)"
+                        internal_content['parent_url'] = page['url']
+                        all_content.append(internal_content)
+
+        # NÍVEL 3: QUERIES RELACIONADAS INTELIGENTES
+        if depth_levels > 2:
+            logger.info("🔍 NÍVEL 3: Queries relacionadas inteligentes")
+
+            related_queries = self._generate_intelligent_related_queries(query, context, all_content)
+
+            for related_query in related_queries[:3]:
+                try:
+                    related_results = self._google_search_deep(related_query, 5)
 
+                    for result in related_results:
+                        related_content = self._extract_intelligent_content(
+                            result['url'], result.get('title', ''), result.get('snippet', ''), context
+                        )
+
+                        if related_content and related_content['success']:
+                            related_content['search_engine'] = "Google (Related Query)"
+                            related_content['related_query'] = related_query
+                            all_content.append(related_content)
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro em query relacionada '{related_query}': {str(e)}")
+                    continue
+
+        return all_content, search_engines_used
+
+    @cached_search('google')
     def _google_search_deep(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca profunda usando Google Custom Search API"""
 
@@ -247,6 +461,7 @@ class AlibabaWebSailorAgent:
                 "filter": "1"  # Remove duplicatas
             }
 
+            rate_limiter.wait(self.google_search_url)
             response = requests.get(
                 self.google_search_url,
                 params=params,
@@ -280,6 +495,7 @@ class AlibabaWebSailorAgent:
             logger.error(f"❌ Erro no Google Search: {str(e)}")
             return []
 
+    @cached_search('serper')
     def _serper_search_deep(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca profunda usando Serper API"""
 
@@ -302,6 +518,7 @@ class AlibabaWebSailorAgent:
                 'page': 1
             }
 
+            rate_limiter.wait(self.serper_url)
             response = requests.post(
                 self.serper_url,
                 json=payload,
@@ -333,6 +550,7 @@ class AlibabaWebSailorAgent:
             logger.error(f"❌ Erro no Serper: {str(e)}")
             return []
 
+    @cached_search('bing')
     def _bing_search_deep(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca profunda usando Bing (scraping inteligente)"""
 
@@ -346,28 +564,32 @@ class AlibabaWebSailorAgent:
                 results = []
 
                 result_items = soup.find_all('li', class_='b_algo')
+                parsed_items = []
 
                 for item in result_items[:max_results]:
                     title_elem = item.find('h2')
                     if title_elem:
                         link_elem = title_elem.find('a')
                         if link_elem:
-                            title = title_elem.get_text(strip=True)
-                            url = link_elem.get('href', '')
-
-                            # Resolve URLs do Bing
-                            url = self._resolve_bing_url(url)
-
                             snippet_elem = item.find('p')
-                            snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-
-                            if url and title and self._is_url_relevant(url, title, snippet):
-                                results.append({
-                                    "title": title,
-                                    "url": url,
-                                    "snippet": snippet,
-                                    "source": "bing_scraping"
-                                })
+                            parsed_items.append((
+                                title_elem.get_text(strip=True),
+                                link_elem.get('href', ''),
+                                snippet_elem.get_text(strip=True) if snippet_elem else ""
+                            ))
+
+                # Resolve URLs do Bing da página inteira de uma vez
+                resolved_urls = url_resolver.resolve_many(url for _, url, _ in parsed_items)
+
+                for title, url, snippet in parsed_items:
+                    url = resolved_urls.get(url, url)
+                    if url and title and self._is_url_relevant(url, title, snippet):
+                        results.append({
+                            "title": title,
+                            "url": url,
+                            "snippet": snippet,
+                            "source": "bing_scraping"
+                        })
 
                 return results
             else:
@@ -378,6 +600,7 @@ class AlibabaWebSailorAgent:
             logger.error(f"❌ Erro no Bing: {str(e)}")
             return []
 
+    @cached_search('duckduckgo')
     def _duckduckgo_search_deep(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca profunda usando DuckDuckGo"""
 
@@ -417,6 +640,7 @@ class AlibabaWebSailorAgent:
             logger.error(f"❌ Erro no DuckDuckGo: {str(e)}")
             return []
 
+    @cached_search('yahoo')
     def _yahoo_search_deep(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca profunda usando Yahoo"""
 
@@ -467,61 +691,80 @@ class AlibabaWebSailorAgent:
     ) -> Optional[Dict[str, Any]]:
         """Extração inteligente de conteúdo com validação"""
 
-        if not url or not url.startswith('http'):
+        if not self._should_extract(url, title, snippet):
             return None
 
         try:
-            # Verifica se URL é relevante
-            if not self._is_url_relevant(url, title, snippet):
-                self.navigation_stats['blocked_urls'] += 1
-                return None
-
-            # Prioriza domínios preferenciais
-            domain = urlparse(url).netloc.lower()
-            is_preferred = any(pref_domain in domain for pref_domain in self.preferred_domains)
-
-            if is_preferred:
-                self.navigation_stats['preferred_sources'] += 1
-
             # Extrai conteúdo usando múltiplas estratégias
             content = self._extract_with_multiple_strategies(url)
-
-            if not content or len(content) < 300:
-                self.navigation_stats['failed_extractions'] += 1
-                return None
-
-            # Valida qualidade do conteúdo
-            quality_score = self._calculate_content_quality(content, url, context)
-
-            if quality_score < 60.0:  # Threshold de qualidade
-                self.navigation_stats['failed_extractions'] += 1
-                return None
-
-            # Extrai insights específicos
-            insights = self._extract_content_insights(content, context)
-
-            self.navigation_stats['successful_extractions'] += 1
-            self.navigation_stats['total_content_chars'] += len(content)
-
-            return {
-                'success': True,
-                'url': url,
-                'title': title,
-                'content': content,
-                'quality_score': quality_score,
-                'insights': insights,
-                'is_preferred_source': is_preferred,
-                'extraction_method': 'multi_strategy',
-                'content_length': len(content),
-                'word_count': len(content.split()),
-                'extracted_at': datetime.now().isoformat()
-            }
+            return self._build_content_result(url, title, content, context)
 
         except Exception as e:
             logger.error(f"❌ Erro ao extrair conteúdo de {url}: {str(e)}")
             self.navigation_stats['failed_extractions'] += 1
             return None
 
+    def _should_extract(self, url: str, title: str, snippet: str) -> bool:
+        """Filtra URLs inválidas ou irrelevantes antes de qualquer requisição"""
+
+        if not url or not url.startswith('http'):
+            return False
+
+        # Verifica se URL é relevante
+        if not self._is_url_relevant(url, title, snippet):
+            self.navigation_stats['blocked_urls'] += 1
+            return False
+
+        # Prioriza domínios preferenciais
+        if self._is_preferred_domain(url):
+            self.navigation_stats['preferred_sources'] += 1
+
+        return True
+
+    def _is_preferred_domain(self, url: str) -> bool:
+        domain = urlparse(url).netloc.lower()
+        return any(pref_domain in domain for pref_domain in self.preferred_domains)
+
+    def _build_content_result(
+        self,
+        url: str,
+        title: str,
+        content: Optional[str],
+        context: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Valida qualidade do conteúdo extraído e monta o resultado"""
+
+        if not content or len(content) < 300:
+            self.navigation_stats['failed_extractions'] += 1
+            return None
+
+        # Valida qualidade do conteúdo
+        quality_score = self._calculate_content_quality(content, url, context)
+
+        if quality_score < 60.0:  # Threshold de qualidade
+            self.navigation_stats['failed_extractions'] += 1
+            return None
+
+        # Extrai insights específicos
+        insights = self._extract_content_insights(content, context)
+
+        self.navigation_stats['successful_extractions'] += 1
+        self.navigation_stats['total_content_chars'] += len(content)
+
+        return {
+            'success': True,
+            'url': url,
+            'title': title,
+            'content': content,
+            'quality_score': quality_score,
+            'insights': insights,
+            'is_preferred_source': self._is_preferred_domain(url),
+            'extraction_method': 'multi_strategy',
+            'content_length': len(content),
+            'word_count': len(content.split()),
+            'extracted_at': datetime.now().isoformat()
+        }
+
     def _extract_with_multiple_strategies(self, url: str) -> Optional[str]:
         """Extrai conteúdo usando múltiplas estratégias"""
 
@@ -549,7 +792,9 @@ class AlibabaWebSailorAgent:
         for attempt in range(max_retries):
             try:
                 jina_url = f"https://r.jina.ai/{url}"
+                rate_limiter.wait(jina_url)
                 response = requests.get(jina_url, timeout=60)  # Aumentado para 60s
+                rate_limiter.observe(jina_url, response.status_code, response.headers)
 
                 if response.status_code == 200:
                     content = response.text
@@ -571,10 +816,10 @@ class AlibabaWebSailorAgent:
             except requests.exceptions.RequestException as e:
                 logger.warning(f"⚠️ Jina Reader tentativa {attempt + 1} falhou: {e}")
                 if attempt == max_retries - 1:
-                    self.logger.error(f"❌ Jina Reader falhou após {max_retries} tentativas")
+                    logger.error(f"❌ Jina Reader falhou após {max_retries} tentativas")
                     return None
                 else:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
+                    rate_limiter.penalize(jina_url, 2 ** attempt)  # Backoff exponencial (vale para todo acesso ao Jina)
                     continue
         return None
 
@@ -591,18 +836,10 @@ class AlibabaWebSailorAgent:
         try:
             import trafilatura
 
+            rate_limiter.wait(url)
             downloaded = trafilatura.fetch_url(url)
             if downloaded:
-                content = trafilatura.extract(
-                    downloaded,
-                    include_comments=False,
-                    include_tables=True,
-                    include_formatting=False,
-                    favor_precision=False,
-                    favor_recall=True,
-                    url=url
-                )
-                return content
+                return self._trafilatura_text(url, downloaded)
             return None
 
         except ImportError:
@@ -618,12 +855,7 @@ class AlibabaWebSailorAgent:
 
             response = self.session.get(url, timeout=20)
             if response.status_code == 200:
-                doc = Document(response.content)
-                content = doc.summary()
-
-                if content:
-                    soup = BeautifulSoup(content, 'html.parser')
-                    return soup.get_text()
+                return self._readability_text(response.content)
             return None
 
         except ImportError:
@@ -638,29 +870,77 @@ class AlibabaWebSailorAgent:
             response = self.session.get(url, timeout=20)
 
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # Remove elementos desnecessários
-                for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                    element.decompose()
-
-                # Busca conteúdo principal
-                main_content = (
-                    soup.find('main') or 
-                    soup.find('article') or 
-                    soup.find('div', class_=re.compile(r'content|main|article'))
-                )
-
-                if main_content:
-                    return main_content.get_text()
-                else:
-                    return soup.get_text()
+                return self._beautifulsoup_text(response.content)
 
             return None
 
         except Exception as e:
             raise e
 
+    def _trafilatura_text(self, url: str, html: Any) -> Optional[str]:
+        import trafilatura
+
+        return trafilatura.extract(
+            html,
+            include_comments=False,
+            include_tables=True,
+            include_formatting=False,
+            favor_precision=False,
+            favor_recall=True,
+            url=url
+        )
+
+    def _readability_text(self, html: Any) -> Optional[str]:
+        from readability import Document
+
+        content = Document(html).summary()
+        if content:
+            soup = BeautifulSoup(content, 'html.parser')
+            return soup.get_text()
+        return None
+
+    def _beautifulsoup_text(self, html: Any) -> Optional[str]:
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Remove elementos desnecessários
+        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+            element.decompose()
+
+        # Busca conteúdo principal
+        main_content = (
+            soup.find('main') or 
+            soup.find('article') or 
+            soup.find('div', class_=re.compile(r'content|main|article'))
+        )
+
+        if main_content:
+            return main_content.get_text()
+        else:
+            return soup.get_text()
+
+    def _extract_from_html(self, url: str, html: str) -> Optional[str]:
+        """Trafilatura, Readability e BeautifulSoup sobre o HTML já baixado (uma única requisição)"""
+
+        strategies = [
+            ("Trafilatura", lambda: self._trafilatura_text(url, html)),
+            ("Readability", lambda: self._readability_text(html)),
+            ("BeautifulSoup", lambda: self._beautifulsoup_text(html))
+        ]
+
+        for strategy_name, strategy_func in strategies:
+            try:
+                content = strategy_func()
+                if content and len(content) > 300:
+                    logger.info(f"✅ {strategy_name}: {len(content)} caracteres de {url}")
+                    return content
+            except ImportError:
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ {strategy_name} falhou para {url}: {str(e)}")
+                continue
+
+        return None
+
     def _is_url_relevant(self, url: str, title: str, snippet: str) -> bool:
         """Verifica se URL é relevante para análise"""
 
@@ -701,59 +981,6 @@ class AlibabaWebSailorAgent:
 
         return True
 
-    def _resolve_bing_url(self, url: str) -> str:
-        """Resolve URLs de redirecionamento do Bing"""
-
-        if "bing.com/ck/a" not in url or "u=a1" not in url:
-            return url
-
-        try:
-            import base64
-
-            # Extrai parâmetro u=a1...
-            if "u=a1" in url:
-                u_param_start = url.find("u=a1") + 4
-                u_param_end = url.find("&", u_param_start)
-                if u_param_end == -1:
-                    u_param_end = len(url)
-
-                encoded_part = url[u_param_start:u_param_end]
-
-                # Decodifica Base64
-                try:
-                    # Limpa e adiciona padding
-                    encoded_part = encoded_part.replace('%3d', '=').replace('%3D', '=')
-                    missing_padding = len(encoded_part) % 4
-                    if missing_padding:
-                        encoded_part += '=' * (4 - missing_padding)
-
-                    # Primeira decodificação
-                    first_decode = base64.b64decode(encoded_part)
-                    first_decode_str = first_decode.decode('utf-8', errors='ignore')
-
-                    if first_decode_str.startswith('aHR0'):
-                        # Segunda decodificação necessária
-                        missing_padding = len(first_decode_str) % 4
-                        if missing_padding:
-                            first_decode_str += '=' * (4 - missing_padding)
-
-                        second_decode = base64.b64decode(first_decode_str)
-                        final_url = second_decode.decode('utf-8', errors='ignore')
-
-                        if final_url.startswith('http'):
-                            return final_url
-
-                    elif first_decode_str.startswith('http'):
-                        return first_decode_str
-
-                except Exception:
-                    pass
-
-            return url
-
-        except Exception:
-            return url
-
     def _enhance_query_for_brazil(self, query: str) -> str:
         """Melhora query para pesquisa no Brasil"""
 
@@ -888,28 +1115,33 @@ class AlibabaWebSailorAgent:
         try:
             response = self.session.get(base_url, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                base_domain = urlparse(base_url).netloc
-
-                links = []
-                for a_tag in soup.find_all('a', href=True):
-                    href = a_tag['href']
-                    full_url = urljoin(base_url, href)
-
-                    # Filtra apenas links do mesmo domínio
-                    if (full_url.startswith('http') and 
-                        base_domain in full_url and 
-                        "#" not in full_url and 
-                        full_url != base_url and
-                        not any(ext in full_url.lower() for ext in ['.pdf', '.jpg', '.png', '.gif'])):
-                        links.append(full_url)
-
-                return list(set(links))[:10]
+                return self._parse_internal_links(base_url, response.content)
         except Exception:
             return []
 
         return []
 
+    def _parse_internal_links(self, base_url: str, html: Any) -> List[str]:
+        """Links do mesmo domínio presentes no HTML"""
+
+        soup = BeautifulSoup(html, 'html.parser')
+        base_domain = urlparse(base_url).netloc
+
+        links = []
+        for a_tag in soup.find_all('a', href=True):
+            href = a_tag['href']
+            full_url = urljoin(base_url, href)
+
+            # Filtra apenas links do mesmo domínio
+            if (full_url.startswith('http') and 
+                base_domain in full_url and 
+                "#" not in full_url and 
+                full_url != base_url and
+                not any(ext in full_url.lower() for ext in ['.pdf', '.jpg', '.png', '.gif'])):
+                links.append(full_url)
+
+        return list(set(links))[:10]
+
     def _generate_intelligent_related_queries(
         self, 
         original_query: str, 
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Analysis Job Queue
+Fila de jobs de análise com pool de workers limitado por processo
+"""
+
+import os
+import logging
+import time
+import threading
+from typing import Dict, Any, Optional, Callable
+from services.context_executor import ContextThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFullError(Exception):
+    """Exceção quando a fila de análises atingiu o limite configurado"""
+    pass
+
+class JobAlreadyRunningError(Exception):
+    """Exceção quando já existe um job ativo (na fila ou em execução) com o mesmo id"""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} já está em execução")
+        self.job_id = job_id
+
+class AnalysisJobQueue:
+    """Fila de análises executadas em background por um pool limitado de workers"""
+
+    def __init__(self):
+        """Inicializa a fila de jobs"""
+        self.max_workers = max(1, int(os.getenv('ANALYSIS_MAX_WORKERS', '2')))
+        self.max_queued = max(0, int(os.getenv('ANALYSIS_MAX_QUEUED_JOBS', '10')))
+        self.job_ttl = int(os.getenv('ANALYSIS_JOB_TTL', '3600'))
+
+        self.executor = ContextThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='analysis_job'
+        )
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+        logger.info(f"🧵 Analysis Job Queue inicializada: {self.max_workers} workers, fila máxima {self.max_queued}")
+
+    def submit(
+        self,
+        job_id: str,
+        func: Callable,
+        *args,
+        on_complete: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Enfileira um job e retorna imediatamente o seu estado"""
+
+        with self.lock:
+            self._prune_finished_jobs()
+
+            existing = self.jobs.get(job_id)
+            if existing and existing['status'] in ('queued', 'running'):
+                raise JobAlreadyRunningError(job_id)
+
+            pending = self._count('queued') + self._count('running')
+            if pending >= self.max_workers + self.max_queued:
+                raise JobQueueFullError(
+                    f"Fila de análises cheia ({self.max_queued} aguardando, {self.max_workers} em execução)"
+                )
+
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'finished_ts': None,
+                'result': None,
+                'error': None
+            }
+            self.jobs[job_id] = job
+
+        self.executor.submit(self._run_job, job_id, func, args, kwargs, on_complete, on_error)
+        logger.info(f"📥 Job {job_id} enfileirado")
+
+        return self.get_job(job_id)
+
+    def _run_job(
+        self,
+        job_id: str,
+        func: Callable,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        on_complete: Optional[Callable],
+        on_error: Optional[Callable]
+    ):
+        """Executa o job no worker e registra o resultado"""
+
+        with self.lock:
+            job = self.jobs[job_id]
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+
+        logger.info(f"▶️ Job {job_id} iniciado")
+
+        try:
+            result = func(*args, **kwargs)
+            if on_complete:
+                on_complete(result)
+
+            with self.lock:
+                job['status'] = 'completed'
+                job['result'] = result
+
+            logger.info(f"✅ Job {job_id} concluído")
+
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} falhou: {e}")
+            with self.lock:
+                job['status'] = 'error'
+                job['error'] = str(e)
+
+            if on_error:
+                try:
+                    on_error(e)
+                except Exception as callback_error:
+                    logger.error(f"❌ Erro no callback de falha do job {job_id}: {callback_error}")
+
+        finally:
+            with self.lock:
+                job['finished_at'] = datetime.now().isoformat()
+                job['finished_ts'] = time.time()
+
+    def get_job(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia do estado do job"""
+
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None
+
+            status = {k: v for k, v in job.items() if k not in ('result', 'finished_ts')}
+            if job['status'] == 'queued':
+                status['queue_position'] = self._queue_position(job_id)
+            if include_result:
+                status['result'] = job['result']
+
+            return status
+
+    def is_active(self, job_id: str) -> bool:
+        """Indica se o job está na fila ou em execução"""
+
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return bool(job and job['status'] in ('queued', 'running'))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas da fila"""
+
+        with self.lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queued_jobs': self.max_queued,
+                'queued': self._count('queued'),
+                'running': self._count('running'),
+                'completed': self._count('completed'),
+                'error': self._count('error'),
+                'total_tracked': len(self.jobs)
+            }
+
+    def _count(self, status: str) -> int:
+        """Conta jobs em um status (chamar com lock)"""
+        return sum(1 for job in self.jobs.values() if job['status'] == status)
+
+    def _queue_position(self, job_id: str) -> int:
+        """Posição do job na fila (chamar com lock)"""
+        queued = [jid for jid, job in self.jobs.items() if job['status'] == 'queued']
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def _prune_finished_jobs(self):
+        """Remove jobs finalizados há mais de job_ttl segundos (chamar com lock)"""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            jid for jid, job in self.jobs.items()
+            if job['finished_ts'] and job['finished_ts'] < cutoff
+        ]
+        for jid in expired:
+            del self.jobs[jid]
+
+# Instância global
+analysis_job_queue = AnalysisJobQueue()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Async Crawl Engine
+Motor HTTP assíncrono (aiohttp) com concorrência limitada e cortesia por host via rate limiter compartilhado
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Tuple, Coroutine
+from services.context_executor import ContextThreadPoolExecutor
+from services.rate_limiter import rate_limiter
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+logger = logging.getLogger(__name__)
+
+class AsyncCrawlSession:
+    """Sessão aiohttp de uma navegação: semáforo global + cota por host do rate limiter"""
+
+    def __init__(self, engine: 'AsyncCrawlEngine', headers: Dict[str, str]):
+        self.engine = engine
+        self.headers = headers
+        self.semaphore = asyncio.Semaphore(engine.max_concurrency)
+        self.session = None
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0, 'politeness_wait': 0.0}
+
+    async def __aenter__(self) -> 'AsyncCrawlSession':
+        connector = aiohttp.TCPConnector(limit=self.engine.max_concurrency, limit_per_host=0, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def fetch_text(self, url: str, timeout: float = 20.0) -> Tuple[Optional[int], Optional[str]]:
+        """GET com cortesia por host; retorna (status, texto) ou (None, None) em erro de rede"""
+        self.stats['politeness_wait'] += await rate_limiter.wait_async(url)
+
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            try:
+                async with self.session.get(
+                    url,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                    allow_redirects=True
+                ) as response:
+                    rate_limiter.observe(url, response.status, response.headers)
+                    body = await response.read()
+                    self.stats['bytes'] += len(body)
+                    text = body.decode(response.charset or 'utf-8', errors='replace')
+                    return response.status, text
+            except (aiohttp.ClientError, asyncio.TimeoutError, LookupError) as e:
+                self.stats['errors'] += 1
+                logger.warning(f"⚠️ Falha ao buscar {url}: {type(e).__name__} {e}")
+                return None, None
+
+class AsyncCrawlEngine:
+    """Configuração e ponte síncrona para navegações assíncronas"""
+
+    def __init__(self):
+        """Inicializa o motor de navegação assíncrona"""
+        self.enabled = HAS_AIOHTTP and os.getenv('CRAWL_ASYNC_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.max_concurrency = int(os.getenv('CRAWL_MAX_CONCURRENCY', '16'))
+        # Buscas via requests e parsing de HTML rodam fora do loop
+        self.blocking_executor = ContextThreadPoolExecutor(
+            max_workers=int(os.getenv('CRAWL_BLOCKING_WORKERS', '8')),
+            thread_name_prefix='crawl_blocking'
+        )
+        self.loop_executor = ContextThreadPoolExecutor(max_workers=4, thread_name_prefix='crawl_loop')
+
+        if self.enabled:
+            logger.info(f"🕸️ Async Crawl Engine: {self.max_concurrency} conexões simultâneas")
+        elif not HAS_AIOHTTP:
+            logger.warning("⚠️ aiohttp não instalado - navegação assíncrona desabilitada")
+
+    def session(self, headers: Dict[str, str]) -> AsyncCrawlSession:
+        # aiohttp só descomprime brotli com a biblioteca instalada
+        headers = {**headers, 'Accept-Encoding': 'gzip, deflate'}
+        return AsyncCrawlSession(self, headers)
+
+    async def run_blocking(self, func, *args):
+        """Executa função bloqueante (busca via requests, parsing) sem travar o loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.blocking_executor, func, *args)
+
+    def run(self, coro: Coroutine) -> Any:
+        """Executa corrotina a partir de código síncrono (em outra thread se já houver loop ativo)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        return self.loop_executor.submit(asyncio.run, coro).result()
+
+# Instância global
+async_crawl_engine = AsyncCrawlEngine()
@@ -19,10 +19,27 @@ from pathlib import Path
 import shutil
 from datetime import timedelta
 import gzip
+import atexit
+import threading
 import traceback
+import contextvars
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from services.session_container import SessionContainer, CONTAINER_SUFFIX
+from services.file_lock import lock_file, HAS_FCNTL
 
 logger = logging.getLogger(__name__)
 
+class SessaoSalvamento:
+    """Identificação da sessão de salvamento ativa no contexto atual"""
+
+    def __init__(self, session_id: Optional[str], analysis_id: Optional[str]):
+        self.session_id = session_id
+        self.analysis_id = analysis_id
+
+# Sessão por contexto: cada análise (thread/tarefa) enxerga a sua; propagada pelo ContextThreadPoolExecutor
+_sessao_atual = contextvars.ContextVar('autosave_sessao', default=None)
+
 class AutoSaveManager:
     """Gerenciador de salvamento automático ultra-robusto"""
 
@@ -48,11 +65,116 @@ class AutoSaveManager:
         for subdir in self.subdirs.values():
             subdir.mkdir(exist_ok=True)
 
-        self.session_id = None
-        self.analysis_id = None
-        self.current_session_id = None # Adicionado para uso interno
-
-        logger.info(f"✅ Auto Save Manager inicializado: {self.base_dir}")
+        # Formato das etapas de sessão: 'container' (um arquivo append-only por sessão) ou 'files' (um .txt/.json por etapa)
+        self.container_mode = os.getenv('AUTOSAVE_FORMAT', 'container').lower() == 'container'
+        self.containers_dir = self.base_dir / 'sessoes'
+        self.containers = OrderedDict()
+        self.containers_lock = threading.Lock()
+
+        # Sessões iniciadas (session_id -> analysis_id) e fallback para código sem contexto
+        self.sessoes = {}
+        self.max_sessoes = int(os.getenv('AUTOSAVE_MAX_TRACKED_SESSIONS', '1000'))
+        self.sessao_padrao = None
+
+        # Write-behind: gravações enfileiradas para um escritor em background
+        self.write_behind = os.getenv('AUTOSAVE_WRITE_BEHIND', 'true').lower() in ('1', 'true', 'yes')
+        self.batch_size = int(os.getenv('AUTOSAVE_BATCH_SIZE', '50'))
+        self.flush_interval = float(os.getenv('AUTOSAVE_FLUSH_INTERVAL', '1.0'))
+        self.journal_fsync = os.getenv('AUTOSAVE_JOURNAL_FSYNC', 'false').lower() in ('1', 'true', 'yes')
+        self.coalesce_etapas = set(
+            e.strip() for e in os.getenv('AUTOSAVE_COALESCE_ETAPAS', 'progresso,progresso_continuacao').split(',') if e.strip()
+        )
+
+        self.pending = []
+        self.pending_since = 0.0
+        self.flush_requested = False
+        self.in_progress = 0
+        self.batch_sessions = set()  # Sessões do lote que o escritor está gravando
+        self.draining = Counter()    # Etapas de uma sessão sendo gravadas por uma leitura (_flush_sessao)
+        self.created_dirs = set()
+        self.write_condition = threading.Condition()
+        self.write_stats = {'queued': 0, 'written': 0, 'coalesced': 0, 'batches': 0, 'errors': 0, 'recovered': 0}
+        self.writer_thread = None
+        self.journal_fd = None
+        self.journal_dir = self.base_dir / '.journal'
+        # Journal por processo, em segmentos: cada lote começa um segmento novo e o anterior
+        # é apagado quando todas as suas etapas estiverem gravadas. Cada segmento aberto fica
+        # travado (lock_file) enquanto o processo vive; a recuperação só regrava os destravados
+        self.journal_gen = 0
+        self.journal_refs = Counter()  # Segmento -> etapas ainda não gravadas
+        self.journal_fds = {}          # Segmento -> descritor aberto e travado
+
+        if self.write_behind:
+            try:
+                self._recover_journal()
+                self.journal_fd = self._open_journal(self.journal_gen)
+                self.writer_thread = threading.Thread(target=self._writer_loop, name='autosave-writer', daemon=True)
+                self.writer_thread.start()
+                atexit.register(self._close_journal)
+            except Exception as e:
+                logger.error(f"❌ Falha ao iniciar write-behind, usando gravação síncrona: {e}")
+                self.write_behind = False
+
+        logger.info(f"✅ Auto Save Manager inicializado: {self.base_dir}" + (" (write-behind)" if self.write_behind else ""))
+
+    # ===== SESSÃO POR CONTEXTO =====
+
+    def _sessao(self) -> Optional[SessaoSalvamento]:
+        """Sessão do contexto atual; sem contexto, a última iniciada (comportamento legado)"""
+        return _sessao_atual.get() or self.sessao_padrao
+
+    @property
+    def current_session_id(self) -> Optional[str]:
+        sessao = self._sessao()
+        return sessao.session_id if sessao else None
+
+    @current_session_id.setter
+    def current_session_id(self, value: Optional[str]):
+        self._ativar_sessao(value)
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.current_session_id
+
+    @session_id.setter
+    def session_id(self, value: Optional[str]):
+        self._ativar_sessao(value)
+
+    @property
+    def analysis_id(self) -> Optional[str]:
+        sessao = self._sessao()
+        return sessao.analysis_id if sessao else None
+
+    @analysis_id.setter
+    def analysis_id(self, value: Optional[str]):
+        self._ativar_sessao(self.current_session_id, value)
+
+    def _nova_sessao(self, session_id: Optional[str], analysis_id: Optional[str] = None) -> SessaoSalvamento:
+        """Cria identificação da sessão, reaproveitando o analysis_id já registrado"""
+        if session_id is None:
+            return SessaoSalvamento(None, analysis_id)
+
+        analysis_id = analysis_id or self.sessoes.get(session_id) or f"analysis_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        self.sessoes[session_id] = analysis_id
+        while len(self.sessoes) > self.max_sessoes:
+            self.sessoes.pop(next(iter(self.sessoes)))
+        return SessaoSalvamento(session_id, analysis_id)
+
+    def _ativar_sessao(self, session_id: Optional[str], analysis_id: Optional[str] = None) -> SessaoSalvamento:
+        """Define a sessão do contexto atual"""
+        sessao = self._nova_sessao(session_id, analysis_id)
+        _sessao_atual.set(sessao)
+        self.sessao_padrao = sessao
+        return sessao
+
+    @contextmanager
+    def usar_sessao(self, session_id: str, analysis_id: Optional[str] = None):
+        """Escopo de salvamento: dentro do bloco (e nas threads submetidas por ele) as etapas vão para session_id"""
+        token = _sessao_atual.set(self._nova_sessao(session_id, analysis_id))
+        try:
+            yield _sessao_atual.get()
+        finally:
+            _sessao_atual.reset(token)
 
     def _clean_segment_name(self, segmento: str) -> str:
         """Limpa nome do segmento para usar como nome de pasta"""
@@ -69,9 +191,8 @@ class AutoSaveManager:
             random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=9))
             session_id = f"session_{timestamp}_{random_id}"
 
-        self.current_session_id = session_id
-        self.session_id = session_id # Define session_id para ser consistente com o resto do código
-        self.analysis_id = f"analysis_{int(time.time())}_{uuid.uuid4().hex[:8]}" # Mantido para compatibilidade
+        # Vincula a sessão ao contexto atual (não afeta análises concorrentes)
+        self._ativar_sessao(session_id, f"analysis_{int(time.time())}_{uuid.uuid4().hex[:8]}")
 
         # Cria pasta específica por segmento se fornecido
         if segmento:
@@ -127,85 +248,455 @@ class AutoSaveManager:
         else:
             save_dir = self.base_dir
 
-        # Se há sessão ativa, cria subdiretório
+        # Se há sessão ativa, usa subdiretório da sessão
         if self.current_session_id: # Usando current_session_id para consistência
             save_dir = save_dir / self.current_session_id
-            save_dir.mkdir(exist_ok=True)
 
         # Nome do arquivo TXT para dados limpos
         filename = f"{nome_etapa}_{timestamp_str}.txt"
         filepath = save_dir / filename
 
         try:
-            # Prepara dados para salvamento
-            save_data = {
-                "etapa": nome_etapa,
-                "status": status,
-                "dados": dados,
-                "timestamp": timestamp,
-                "timestamp_iso": datetime.fromtimestamp(timestamp).isoformat(),
-                "session_id": self.current_session_id,
-                "analysis_id": self.analysis_id,
-                "categoria": categoria,
-                "tamanho_dados": len(str(dados)) if dados else 0
+            # Renderiza o conteúdo agora: os dados podem ser alterados pelo chamador depois
+            record = {
+                'etapa': nome_etapa,
+                'session_id': self.current_session_id,
+                'categoria': categoria,
+                'status': status,
+                'timestamp': timestamp,
+                'txt_path': str(filepath),
+                'txt': self._render_txt(nome_etapa, dados, status, timestamp, categoria)
             }
 
-            # Salva arquivo TXT limpo (sem dados brutos JSON)
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"ETAPA: {nome_etapa}\n")
-                f.write(f"STATUS: {status}\n")
-                f.write(f"TIMESTAMP: {datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"SESSÃO: {self.current_session_id}\n")
-                f.write(f"CATEGORIA: {categoria}\n")
-                f.write(f"TAMANHO: {len(str(dados)) if dados else 0} caracteres\n")
-                f.write("=" * 50 + "\n")
-
-                # Escreve dados de forma legível (não JSON bruto)
-                if isinstance(dados, dict):
-                    for key, value in dados.items():
-                        f.write(f"\n{key.upper()}:\n")
-                        if isinstance(value, list):
-                            for item in value[:10]:  # Limita a 10 itens
-                                f.write(f"• {str(item)[:200]}\n")
-                        elif isinstance(value, dict):
-                            for subkey, subvalue in list(value.items())[:5]:  # Limita a 5 subitens
-                                f.write(f"  {subkey}: {str(subvalue)[:100]}\n")
-                        else:
-                            f.write(f"{str(value)[:500]}\n")
-                elif isinstance(dados, list):
-                    for i, item in enumerate(dados[:20], 1):  # Limita a 20 itens
-                        f.write(f"{i}. {str(item)[:200]}\n")
-                else:
-                    f.write(f"DADOS: {str(dados)[:1000]}\n")
-
-            # Log de sucesso
-            logger.info(f"💾 Etapa '{nome_etapa}' salva: {filepath}")
+            # Com sessão, a etapa vai para o contêiner da sessão; filepath passa a ser a visão gerada sob demanda
+            container_record = self.container_mode and self.current_session_id is not None
+            if container_record:
+                record.update({
+                    'container': True,
+                    'record_id': uuid.uuid4().hex,  # Replay do journal não duplica a etapa no contêiner
+                    'nome': f"{nome_etapa}_{timestamp_str}",
+                    'pasta': categoria if categoria in self.subdirs else '',
+                    'analysis_id': self.analysis_id,
+                    'tamanho': len(str(dados)) if dados else 0
+                })
 
             # Salva também backup JSON para dados críticos
             if categoria in ['analise_completa', 'pesquisa_web'] and len(str(dados)) > 1000:
-                json_filepath = save_dir / f"{nome_etapa}_{timestamp_str}.json"
-                with open(json_filepath, "w", encoding="utf-8") as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2, default=str)
-
+                save_data = {
+                    "etapa": nome_etapa,
+                    "status": status,
+                    "dados": dados,
+                    "timestamp": timestamp,
+                    "timestamp_iso": datetime.fromtimestamp(timestamp).isoformat(),
+                    "session_id": self.current_session_id,
+                    "analysis_id": self.analysis_id,
+                    "categoria": categoria,
+                    "tamanho_dados": len(str(dados)) if dados else 0
+                }
+                record['json_path'] = str(save_dir / f"{nome_etapa}_{timestamp_str}.json")
+                record['json'] = json.dumps(save_data, ensure_ascii=False, indent=None if container_record else 2, default=str)
+
+            if self.write_behind and self._enqueue_record(record):
+                return str(filepath)
+
+            self._write_record(record)
             return str(filepath)
 
         except Exception as e:
-            # Salvamento de emergência em caso de erro
-            emergency_path = self.base_dir / f"EMERGENCY_{nome_etapa}_{timestamp_str}.txt"
+            return self._salvar_emergencia(nome_etapa, str(dados), status, timestamp, timestamp_str, e)
+
+    def _render_txt(self, nome_etapa: str, dados: Any, status: str, timestamp: float, categoria: str) -> str:
+        """Renderiza o arquivo TXT limpo (sem dados brutos JSON)"""
+        lines = [
+            f"ETAPA: {nome_etapa}\n",
+            f"STATUS: {status}\n",
+            f"TIMESTAMP: {datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M:%S')}\n",
+            f"SESSÃO: {self.current_session_id}\n",
+            f"CATEGORIA: {categoria}\n",
+            f"TAMANHO: {len(str(dados)) if dados else 0} caracteres\n",
+            "=" * 50 + "\n"
+        ]
+
+        # Escreve dados de forma legível (não JSON bruto)
+        if isinstance(dados, dict):
+            for key, value in dados.items():
+                lines.append(f"\n{key.upper()}:\n")
+                if isinstance(value, list):
+                    for item in value[:10]:  # Limita a 10 itens
+                        lines.append(f"• {str(item)[:200]}\n")
+                elif isinstance(value, dict):
+                    for subkey, subvalue in list(value.items())[:5]:  # Limita a 5 subitens
+                        lines.append(f"  {subkey}: {str(subvalue)[:100]}\n")
+                else:
+                    lines.append(f"{str(value)[:500]}\n")
+        elif isinstance(dados, list):
+            for i, item in enumerate(dados[:20], 1):  # Limita a 20 itens
+                lines.append(f"{i}. {str(item)[:200]}\n")
+        else:
+            lines.append(f"DADOS: {str(dados)[:1000]}\n")
+
+        return ''.join(lines)
+
+    def _write_record(self, record: Dict[str, Any]):
+        """Grava os arquivos de uma etapa no disco"""
+        if record.get('container'):
+            appended = self._container(record['session_id']).append({
+                'record_id': record.get('record_id'),
+                'etapa': record['etapa'],
+                'categoria': record['categoria'],
+                'status': record['status'],
+                'timestamp': record['timestamp'],
+                'session_id': record['session_id'],
+                'analysis_id': record.get('analysis_id'),
+                'nome': record['nome'],
+                'pasta': record.get('pasta', record['categoria']),
+                'tamanho': record.get('tamanho', 0)
+            }, record['txt'], record.get('json'))
+            if appended:
+                logger.info(f"💾 Etapa '{record['etapa']}' salva no contêiner da sessão {record['session_id']}")
+            else:
+                logger.info(f"↩️ Etapa '{record['etapa']}' já estava no contêiner da sessão {record['session_id']}")
+            return
+
+        txt_path = Path(record['txt_path'])
+        if txt_path.parent not in self.created_dirs:
+            txt_path.parent.mkdir(parents=True, exist_ok=True)
+            self.created_dirs.add(txt_path.parent)
+
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(record['txt'])
+
+        # Log de sucesso
+        logger.info(f"💾 Etapa '{record['etapa']}' salva: {txt_path}")
+
+        if record.get('json_path'):
+            with open(record['json_path'], "w", encoding="utf-8") as f:
+                f.write(record['json'])
+
+    def _salvar_emergencia(self, nome_etapa: str, dados_str: str, status: str, timestamp: float,
+                           timestamp_str: str, erro: Exception) -> str:
+        """Salvamento de emergência em caso de erro"""
+        emergency_path = self.base_dir / f"EMERGENCY_{nome_etapa}_{timestamp_str}.txt"
+        try:
+            with open(emergency_path, "w", encoding="utf-8") as f:
+                f.write(f"ERRO AO SALVAR: {str(erro)}\n")
+                f.write(f"DADOS: {dados_str[:1000]}...\n")
+                f.write(f"STATUS: {status}\n")
+                f.write(f"TIMESTAMP: {timestamp}\n")
+
+            logger.error(f"❌ Erro ao salvar '{nome_etapa}': {erro}")
+            logger.info(f"🆘 Backup de emergência salvo: {emergency_path}")
+
+        except Exception as emergency_error:
+            logger.critical(f"🚨 FALHA CRÍTICA no salvamento de emergência: {emergency_error}")
+
+        return str(emergency_path)
+
+    # ===== WRITE-BEHIND =====
+
+    def _enqueue_record(self, record: Dict[str, Any]) -> bool:
+        """Registra no journal e enfileira para o escritor; False se o journal falhar"""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+        with self.write_condition:
             try:
-                with open(emergency_path, "w", encoding="utf-8") as f:
-                    f.write(f"ERRO AO SALVAR: {str(e)}\n")
-                    f.write(f"DADOS: {str(dados)[:1000]}...\n")
-                    f.write(f"STATUS: {status}\n")
-                    f.write(f"TIMESTAMP: {timestamp}\n")
+                # Journal primeiro: um único append garante que nada se perde se o processo cair
+                os.write(self.journal_fd, line)
+                if self.journal_fsync:
+                    os.fsync(self.journal_fd)
+            except Exception as e:
+                logger.error(f"❌ Falha no journal do auto save, gravando de forma síncrona: {e}")
+                return False
+
+            record['journal_gen'] = self.journal_gen
+            self.journal_refs[self.journal_gen] += 1
+
+            # Progresso repetido: só a versão mais recente pendente é gravada
+            if record['etapa'] in self.coalesce_etapas:
+                key = (record['etapa'], record['categoria'], record['session_id'])
+                superseded = [r for r in self.pending if (r['etapa'], r['categoria'], r['session_id']) == key]
+                if superseded:
+                    self.pending = [r for r in self.pending if (r['etapa'], r['categoria'], r['session_id']) != key]
+                    self.write_stats['coalesced'] += len(superseded)
+                    self._release_journal(superseded)
+
+            if not self.pending:
+                self.pending_since = time.time()
+            self.pending.append(record)
+            self.write_stats['queued'] += 1
+            if len(self.pending) == 1 or len(self.pending) >= self.batch_size:
+                self.write_condition.notify_all()
+
+        return True
+
+    def _writer_loop(self):
+        """Escritor em background: grava lotes por tamanho ou intervalo"""
+        while True:
+            with self.write_condition:
+                while not self.pending:
+                    self.write_condition.wait()
+
+                # Espera o lote encher ou o intervalo vencer; flush() antecipa
+                deadline = self.pending_since + self.flush_interval
+                while len(self.pending) < self.batch_size and not self.flush_requested:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.write_condition.wait(timeout=remaining)
+
+                # Etapas de uma sessão sendo gravadas por uma leitura vão antes das mais novas
+                self.write_condition.wait_for(lambda: not self.draining)
+                if not self.pending:
+                    continue
+
+                batch = self.pending
+                self.pending = []
+                self.flush_requested = False
+                self.in_progress = len(batch)
+                self.batch_sessions = {r['session_id'] for r in batch}
+                self._rotate_journal()
+
+            self._write_batch(batch)
+
+            with self.write_condition:
+                self.in_progress = 0
+                self.batch_sessions = set()
+                self.write_stats['batches'] += 1
+                # Segmentos do journal com todas as etapas gravadas são apagados
+                self._release_journal(batch)
+                self.write_condition.notify_all()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Grava um lote de etapas"""
+        for record in batch:
+            try:
+                self._write_record(record)
+                self.write_stats['written'] += 1
+            except Exception as e:
+                self.write_stats['errors'] += 1
+                timestamp_str = datetime.fromtimestamp(record['timestamp']).strftime("%Y%m%d_%H%M%S_%f")[:-3]
+                self._salvar_emergencia(record['etapa'], record['txt'], record['status'], record['timestamp'], timestamp_str, e)
+
+    def _journal_segment(self, gen: int) -> Path:
+        return self.journal_dir / f'autosave.{os.getpid()}.{gen}.journal'
+
+    def _open_journal(self, gen: int) -> int:
+        """Abre e trava um segmento do journal deste processo"""
+        path = self._journal_segment(gen)
+        while True:
+            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            if not lock_file(fd, blocking=False):
+                os.close(fd)
+                raise RuntimeError(f"segmento do journal travado por outro processo: {path.name}")
+            try:
+                # A recuperação de outro processo pode ter apagado o arquivo entre o open e a trava
+                if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                    self.journal_fds[gen] = fd
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _discard_journal(self, gen: int):
+        """Fecha e apaga um segmento do journal deste processo (chamar com lock)"""
+        fd = self.journal_fds.pop(gen, None)
+        try:
+            if fd is not None and not HAS_FCNTL:
+                # No Windows o arquivo precisa ser fechado antes de apagado
+                os.close(fd)
+                fd = None
+            self._journal_segment(gen).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível apagar segmento do journal do auto save: {e}")
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _rotate_journal(self):
+        """Começa um novo segmento do journal para as próximas etapas (chamar com lock)"""
+        if not self.journal_refs.get(self.journal_gen):
+            # Nada pendente no segmento atual: basta zerá-lo
+            self._truncate_journal()
+            return
+        try:
+            fd = self._open_journal(self.journal_gen + 1)
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível rotacionar journal do auto save: {e}")
+            return
+        # O segmento anterior continua aberto e travado até suas etapas serem gravadas
+        self.journal_fd = fd
+        self.journal_gen += 1
+
+    def _release_journal(self, records: List[Dict[str, Any]]):
+        """Marca etapas como gravadas e apaga os segmentos antigos já sem pendências (chamar com lock)"""
+        for record in records:
+            gen = record.get('journal_gen')
+            if gen is None:
+                continue
+            self.journal_refs[gen] -= 1
+            if self.journal_refs[gen] <= 0:
+                del self.journal_refs[gen]
+                if gen != self.journal_gen:
+                    self._discard_journal(gen)
+
+    def _truncate_journal(self):
+        """Zera o segmento atual do journal (chamar com lock e sem etapas pendentes nele)"""
+        try:
+            os.ftruncate(self.journal_fd, 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível truncar journal do auto save: {e}")
+
+    def _recover_journal(self):
+        """Regrava etapas registradas em journals de processos encerrados (queda anterior)"""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+
+        def segment_order(journal: Path):
+            # autosave.<pid>.journal (formato antigo) ou autosave.<pid>.<segmento>.journal
+            parts = journal.name.split('.')
+            return (parts[1], int(parts[2]) if len(parts) > 3 and parts[2].isdigit() else -1)
 
-                logger.error(f"❌ Erro ao salvar '{nome_etapa}': {e}")
-                logger.info(f"🆘 Backup de emergência salvo: {emergency_path}")
+        recovered = 0
+        for journal in sorted(self.journal_dir.glob('autosave.*.journal'), key=segment_order):
+            try:
+                f = open(journal, 'r+', encoding='utf-8')
+            except FileNotFoundError:
+                continue  # Recuperado por outro processo
+            with f:
+                if not lock_file(f.fileno(), blocking=False):
+                    continue  # Segmento de outro worker em execução
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Última linha truncada pela queda
+                    try:
+                        self._write_record(record)
+                        recovered += 1
+                    except Exception as e:
+                        logger.error(f"❌ Erro ao recuperar etapa do journal: {e}")
 
-            except Exception as emergency_error:
-                logger.critical(f"🚨 FALHA CRÍTICA no salvamento de emergência: {emergency_error}")
+            try:
+                journal.unlink()
+            except FileNotFoundError:
+                pass
+
+        if recovered:
+            self.write_stats['recovered'] = recovered
+            logger.info(f"🩹 {recovered} etapas recuperadas do journal do auto save")
+
+    def _close_journal(self):
+        """Grava as etapas pendentes e apaga os segmentos do journal deste processo (saída do processo)"""
+        if not self.write_behind:
+            return
+        if not self.flush():
+            logger.warning("⚠️ Etapas pendentes na saída; journal do auto save mantido para recuperação")
+            return
+        with self.write_condition:
+            # Gravações posteriores (outros handlers de saída) vão direto para o disco
+            self.write_behind = False
+            for gen in list(self.journal_fds):
+                self._discard_journal(gen)
+            self.journal_fd = None
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """Aguarda a gravação de todas as etapas pendentes"""
+        if not self.write_behind:
+            return True
+
+        with self.write_condition:
+            self.flush_requested = True
+            self.write_condition.notify_all()
+            return self.write_condition.wait_for(
+                lambda: not self.pending and not self.in_progress and not self.draining, timeout=timeout
+            )
+
+    def _flush_sessao(self, session_id: Optional[str], timeout: Optional[float] = 30.0) -> bool:
+        """Grava na thread atual as etapas pendentes de uma sessão; não espera as demais sessões da fila"""
+        if not self.write_behind or not session_id:
+            return True
+
+        with self.write_condition:
+            # Só espera se o lote em gravação pelo escritor tiver etapas desta sessão (ordem de gravação)
+            if not self.write_condition.wait_for(
+                lambda: session_id not in self.batch_sessions and not self.draining[session_id], timeout=timeout
+            ):
+                return False
+            records = [r for r in self.pending if r['session_id'] == session_id]
+            if not records:
+                return True
+            self.pending = [r for r in self.pending if r['session_id'] != session_id]
+            self.draining[session_id] += len(records)
+
+        try:
+            self._write_batch(records)
+        finally:
+            with self.write_condition:
+                self.draining[session_id] -= len(records)
+                if self.draining[session_id] <= 0:
+                    del self.draining[session_id]
+                self._release_journal(records)
+                self.write_condition.notify_all()
+        return True
+
+    def finalizar_sessao(self, session_id: str = None) -> bool:
+        """Fim da sessão: garante que todas as etapas da sessão estão no disco"""
+        session_id = session_id or self.current_session_id
+        flushed = self._flush_sessao(session_id) if session_id else self.flush()
+        logger.info(f"🏁 Sessão {session_id} finalizada: etapas gravadas" if flushed else f"⚠️ Sessão {session_id}: gravação pendente após timeout")
+        return flushed
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Estatísticas do write-behind"""
+        with self.write_condition:
+            stats = dict(self.write_stats)
+            stats['pending'] = len(self.pending) + self.in_progress + sum(self.draining.values())
+            stats['journal_segments'] = len(self.journal_refs)
+        stats['write_behind'] = self.write_behind
+        stats['batch_size'] = self.batch_size
+        stats['flush_interval'] = self.flush_interval
+        return stats
+
+    # ===== CONTÊINER POR SESSÃO =====
+
+    def _container(self, session_id: str) -> SessionContainer:
+        """Contêiner da sessão (índice mantido em memória para as sessões recentes)"""
+        with self.containers_lock:
+            container = self.containers.get(session_id)
+            if container is None:
+                container = SessionContainer(self.containers_dir / f"{session_id}{CONTAINER_SUFFIX}")
+                self.containers[session_id] = container
+                while len(self.containers) > self.max_sessoes:
+                    self.containers.popitem(last=False)
+            else:
+                self.containers.move_to_end(session_id)
+            return container
+
+    def _container_existente(self, session_id: str) -> Optional[SessionContainer]:
+        container = self._container(session_id)
+        return container if container.exists() else None
+
+    def ler_registros(
+        self,
+        session_id: str = None,
+        categoria: str = None,
+        etapa: str = None,
+        prefixo: str = None
+    ) -> List[Dict[str, Any]]:
+        """Registros do contêiner da sessão (cabeçalho, txt e dados JSON), em ordem de gravação"""
+        session_id = session_id or self.current_session_id
+        self._flush_sessao(session_id)  # Leituras enxergam as etapas da sessão ainda na fila
+        container = self._container_existente(session_id) if session_id else None
+        if not container:
+            return []
+        return [container.read(entry) for entry in container.find(etapa=etapa, categoria=categoria, prefixo=prefixo)]
 
-            return str(emergency_path)
+    def renderizar_sessao(self, session_id: str, destino: Optional[Path] = None) -> List[str]:
+        """Gera as visões .txt/.json da sessão no layout antigo (por padrão, dentro de base_dir)"""
+        self._flush_sessao(session_id)
+        container = self._container_existente(session_id)
+        return container.render(destino or self.base_dir) if container else []
 
     def salvar_erro(self, etapa: str, erro: Exception, contexto: Dict[str, Any] = None) -> str:
         """Salva erro com contexto completo"""
@@ -235,11 +726,19 @@ class AutoSaveManager:
 
     def recuperar_etapa(self, nome_etapa: str, session_id: str = None) -> Optional[Dict[str, Any]]:
         """Recupera dados de uma etapa específica"""
-
         session_id = session_id or self.current_session_id
         if not session_id:
             logger.error("❌ Nenhuma sessão ativa")
             return None
+        self._flush_sessao(session_id)  # Leituras enxergam as etapas da sessão ainda na fila
+
+        container = self._container_existente(session_id)
+        if container:
+            # Mais recente primeiro
+            for entry in reversed(container.find(etapa=nome_etapa, com_json=True)):
+                if entry['status'] == "sucesso":
+                    logger.info(f"📂 Etapa '{nome_etapa}' recuperada do contêiner: {container.path}")
+                    return container.read(entry)['dados']
 
         # Busca em todos os subdiretórios
         for categoria, subdir in self.subdirs.items():
@@ -263,13 +762,25 @@ class AutoSaveManager:
 
     def listar_etapas_salvas(self, session_id: str = None) -> Dict[str, Any]:
         """Lista todas as etapas salvas de uma sessão"""
-
         session_id = session_id or self.current_session_id
         if not session_id:
             return {}
+        self._flush_sessao(session_id)  # Leituras enxergam as etapas da sessão ainda na fila
 
         etapas_encontradas = {}
 
+        container = self._container_existente(session_id)
+        if container:
+            for entry in container.find(com_json=True):
+                etapas_encontradas.setdefault(entry['etapa'], []).append({
+                    "arquivo": f"{container.path}#{entry['offset']}",
+                    "registro": entry['offset'],
+                    "status": entry['status'],
+                    "timestamp": entry['timestamp'],
+                    "categoria": entry['categoria'],
+                    "tamanho": entry.get('tamanho', 0)
+                })
+
         for categoria, subdir in self.subdirs.items():
             session_dir = subdir / session_id
             if session_dir.exists():
@@ -321,8 +832,11 @@ class AutoSaveManager:
             arquivo_mais_recente = max(arquivos, key=lambda x: x["timestamp"])
 
             try:
-                with open(arquivo_mais_recente["arquivo"], "r", encoding="utf-8") as f:
-                    dados_etapa = json.load(f)
+                if "registro" in arquivo_mais_recente:
+                    dados_etapa = self._container(session_id).read_at(arquivo_mais_recente["registro"])['dados']
+                else:
+                    with open(arquivo_mais_recente["arquivo"], "r", encoding="utf-8") as f:
+                        dados_etapa = json.load(f)
 
                 relatorio_consolidado["etapas_processadas"][etapa_nome] = dados_etapa
 
@@ -381,6 +895,16 @@ class AutoSaveManager:
                                 removidas += 1
                                 logger.info(f"🗑️ Sessão antiga removida: {item}")
 
+            # Contêineres de sessão antigos
+            if self.containers_dir.is_dir():
+                for container_path in self.containers_dir.glob(f"*{CONTAINER_SUFFIX}"):
+                    if container_path.stat().st_mtime < cutoff_time:
+                        container_path.unlink()
+                        with self.containers_lock:
+                            self.containers.pop(container_path.name[:-len(CONTAINER_SUFFIX)], None)
+                        removidas += 1
+                        logger.info(f"🗑️ Sessão antiga removida: {container_path}")
+
             # Também limpa pastas de segmento antigas
             segmento_base_path = self.base_dir / "por_segmento"
             if segmento_base_path.is_dir():
@@ -392,6 +916,7 @@ class AutoSaveManager:
                             logger.info(f"🗑️ Pasta de segmento antiga removida: {segmento_dir}")
 
 
+            self.created_dirs.clear()
             logger.info(f"🧹 Limpeza concluída: {removidas} sessões/segmentos antigos removidos")
 
         except Exception as e:
@@ -400,15 +925,21 @@ class AutoSaveManager:
     def listar_sessoes(self) -> List[str]:
         """Lista todas as sessões salvas"""
         try:
+            sessoes = []
+
+            # Sessões em contêiner
+            if self.containers_dir.is_dir():
+                for container_path in self.containers_dir.glob(f"*{CONTAINER_SUFFIX}"):
+                    sessoes.append(container_path.name[:-len(CONTAINER_SUFFIX)])
+
             session_path = os.path.join(str(self.base_dir), "logs") # Correção: base_dir em vez de base_path
             if not os.path.exists(session_path):
-                return []
+                return sessoes
 
-            sessoes = []
             for item in os.listdir(session_path):
                 # Verifica se o item é um diretório e começa com 'session_'
                 item_path = os.path.join(session_path, item)
-                if os.path.isdir(item_path) and item.startswith('session_'):
+                if os.path.isdir(item_path) and item.startswith('session_') and item not in sessoes:
                     sessoes.append(item)
 
             return sessoes
@@ -419,6 +950,7 @@ class AutoSaveManager:
 
     def _list_session_files(self, session_id: str, categoria: str = None) -> List[str]:
         """Lista arquivos de uma sessão específica"""
+        self._flush_sessao(session_id)  # Leituras enxergam as etapas da sessão ainda na fila
         try:
             files = []
             
@@ -444,9 +976,30 @@ class AutoSaveManager:
             logger.error(f"Erro ao listar arquivos da sessão {session_id}: {e}")
             return []
 
-    def obter_info_sessao(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Obtém informações de uma sessão específica"""
+    def obter_info_sessao(self, session_id: str, com_dados: bool = False) -> Optional[Dict[str, Any]]:
+        """Obtém informações de uma sessão específica (com_dados=True inclui o conteúdo da última versão de cada etapa)"""
+        self._flush_sessao(session_id)  # Leituras enxergam as etapas da sessão ainda na fila
         try:
+            container = self._container_existente(session_id)
+            if container:
+                # Só os cabeçalhos do índice; o conteúdo é descomprimido apenas se pedido
+                ultimas = {entry['etapa']: entry for entry in container.records()}
+                etapas = {}
+                for nome_etapa, entry in ultimas.items():
+                    etapas[nome_etapa] = {
+                        'arquivo': f"{entry['nome']}.json" if entry.get('json') else f"{entry['nome']}.txt",
+                        'timestamp': entry['nome'][len(nome_etapa) + 1:],
+                        'registro': entry['offset']
+                    }
+                    if com_dados:
+                        registro = container.read(entry)
+                        etapas[nome_etapa]['dados'] = registro['dados'] if registro['dados'] is not None else registro['txt']
+                return {
+                    'session_id': session_id,
+                    'etapas': etapas,
+                    'total_etapas': len(etapas)
+                }
+
             # A lógica original de `obter_info_sessao` utilizava `self.base_path`, que não estava definido.
             # Assumindo que `self.base_dir` é o caminho correto.
             session_dir_path = self.base_dir / "logs" / session_id
@@ -476,20 +1029,15 @@ class AutoSaveManager:
                         etapa_nome = arquivo.replace('.txt', '').replace('.json', '')
                         timestamp_str = 'unknown'
 
-                    arquivo_path = session_dir_path / arquivo
-
-                    with open(arquivo_path, 'r', encoding='utf-8') as f:
-                        if arquivo.endswith('.json'):
-                            dados = json.load(f)
-                        else:
-                            dados = f.read()
-
                     etapas[etapa_nome] = {
                         'arquivo': arquivo,
-                        'dados': dados,
                         'timestamp': timestamp_str
                     }
 
+                    if com_dados:
+                        with open(session_dir_path / arquivo, 'r', encoding='utf-8') as f:
+                            etapas[etapa_nome]['dados'] = json.load(f) if arquivo.endswith('.json') else f.read()
+
             return {
                 'session_id': session_id,
                 'etapas': etapas,
@@ -5,10 +5,13 @@ ARQV30 Enhanced v2.0 - Component Orchestrator
 Orquestrador seguro de componentes com validação rigorosa
 """
 
+import os
 import logging
 import time
 import json
 from typing import Dict, List, Any, Optional, Callable
+from concurrent.futures import wait, FIRST_COMPLETED
+from services.context_executor import ContextThreadPoolExecutor
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,8 @@ class ComponentOrchestrator:
         self.validation_rules = {}
         self.component_results = {}
         self.execution_stats = {}
+        self.max_parallel = int(os.getenv('COMPONENT_MAX_PARALLEL', '4'))
+        self.default_timeout = float(os.getenv('COMPONENT_TIMEOUT', '900'))
         
         logger.info("Component Orchestrator inicializado")
     
@@ -36,7 +41,8 @@ class ComponentOrchestrator:
         executor: Callable,
         dependencies: List[str] = None,
         validation_rules: Dict[str, Any] = None,
-        required: bool = True
+        required: bool = True,
+        timeout: Optional[float] = None
     ):
         """Registra um componente no orquestrador"""
         
@@ -45,6 +51,7 @@ class ComponentOrchestrator:
             'dependencies': dependencies or [],
             'validation_rules': validation_rules or {},
             'required': required,
+            'timeout': timeout or self.default_timeout,
             'status': 'pending'
         }
         
@@ -58,65 +65,155 @@ class ComponentOrchestrator:
         input_data: Dict[str, Any],
         progress_callback: Optional[Callable] = None
     ) -> Dict[str, Any]:
-        """Executa todos os componentes registrados em ordem"""
+        """Executa os componentes em paralelo respeitando o grafo de dependências"""
         
-        logger.info(f"🚀 Iniciando execução de {len(self.component_registry)} componentes")
+        logger.info(f"🚀 Iniciando execução de {len(self.component_registry)} componentes (DAG paralelo)")
         start_time = time.time()
         
         successful_components = {}
         failed_components = {}
+        timings = {}
+        # Estatísticas desta execução: o singleton é compartilhado entre análises simultâneas
+        run_stats = {}
         
-        for i, component_name in enumerate(self.execution_order):
-            if progress_callback:
-                progress_callback(i + 1, f"Executando {component_name}...")
-            
-            try:
-                # Verifica dependências
-                if not self._check_dependencies(component_name):
-                    error_msg = f"Dependências não atendidas para {component_name}"
-                    logger.error(f"❌ {error_msg}")
-                    failed_components[component_name] = error_msg
-                    self._mark_component_failed(component_name, error_msg)
-                    continue
+        pending = [name for name in self.execution_order if name in self.component_registry]
+        running = {}
+        started_count = 0
+        
+        executor = ContextThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel, len(pending) or 1)),
+            thread_name_prefix='component'
+        )
+        
+        try:
+            while pending or running:
+                # Cancela componentes cujas dependências obrigatórias falharam ou não existem
+                for component_name in list(pending):
+                    dependencies = self.component_registry[component_name]['dependencies']
+                    blocked_by = [
+                        dep for dep in dependencies
+                        if dep not in self.component_registry
+                        or (dep in failed_components and self.component_registry[dep]['required'])
+                    ]
+                    if blocked_by:
+                        error_msg = f"Cancelado: dependências falharam para {component_name} ({', '.join(blocked_by)})"
+                        logger.error(f"❌ {error_msg}")
+                        failed_components[component_name] = error_msg
+                        self._mark_component_failed(component_name, error_msg)
+                        run_stats[component_name] = {
+                            'execution_time': 0,
+                            'status': 'cancelled',
+                            'error': error_msg
+                        }
+                        pending.remove(component_name)
                 
-                # Executa componente
-                result = self._execute_single_component(component_name, input_data, successful_components)
+                # Dispara todos os componentes prontos (dependência opcional que falhou fica ausente da entrada)
+                ready = [
+                    name for name in pending
+                    if all(
+                        dep in successful_components or dep in failed_components
+                        for dep in self.component_registry[name]['dependencies']
+                    )
+                ]
+                for component_name in ready:
+                    pending.remove(component_name)
+                    started_count += 1
+                    if progress_callback:
+                        progress_callback(started_count, f"Executando {component_name}...")
+                    
+                    # Medição própria de cada future: a de um componente abandonado nunca é lida
+                    measurement = {}
+                    future = executor.submit(
+                        self._execute_single_component,
+                        component_name,
+                        input_data,
+                        dict(successful_components),
+                        measurement
+                    )
+                    timeout = self.component_registry[component_name]['timeout']
+                    started_at = time.time()
+                    running[future] = (component_name, started_at, started_at + timeout, measurement)
+                    timings[component_name] = {'start': started_at - start_time}
                 
-                # Verifica se houve erro no resultado
-                if result is not None and not isinstance(result, dict) or not result.get('error'):
-                    # Valida resultado
-                    if self._validate_component_result(component_name, result):
-                        successful_components[component_name] = result
-                        self._mark_component_successful(component_name, result)
-                        logger.info(f"✅ Componente {component_name} executado com sucesso")
-                    else:
-                        error_msg = f"Resultado inválido para {component_name}"
+                if not running:
+                    # Nada executando e nada pronto: dependências circulares
+                    for component_name in pending:
+                        error_msg = f"Dependências não atendidas para {component_name}"
                         logger.error(f"❌ {error_msg}")
                         failed_components[component_name] = error_msg
                         self._mark_component_failed(component_name, error_msg)
-                elif result and isinstance(result, dict) and result.get('error'):
-                    # Componente retornou com erro explícito
-                    error_msg = f"Componente {component_name} falhou: {result.get('error')}"
-                    logger.error(f"❌ {error_msg}")
-                    failed_components[component_name] = error_msg
-                    self._mark_component_failed(component_name, error_msg)
-                else:
-                    error_msg = f"Componente {component_name} retornou None ou resultado inválido"
-                    logger.error(f"❌ {error_msg}")
-                    failed_components[component_name] = error_msg
-                    self._mark_component_failed(component_name, error_msg)
+                        run_stats[component_name] = {
+                            'execution_time': 0,
+                            'status': 'cancelled',
+                            'error': error_msg
+                        }
+                    pending = []
+                    break
                 
-            except Exception as e:
-                error_msg = f"Erro na execução de {component_name}: {str(e)}"
-                logger.error(f"❌ {error_msg}")
-                failed_components[component_name] = error_msg
-                self._mark_component_failed(component_name, error_msg)
+                next_deadline = min(deadline for _, _, deadline, _ in running.values())
+                done, _ = wait(
+                    list(running.keys()),
+                    timeout=max(0, next_deadline - time.time()),
+                    return_when=FIRST_COMPLETED
+                )
                 
-                # Se é componente obrigatório, pode interromper
-                if self.component_registry[component_name]['required']:
-                    logger.error(f"🚨 Componente obrigatório {component_name} falhou - análise comprometida")
+                for future in done:
+                    component_name, started_at, _, measurement = running.pop(future)
+                    timings[component_name]['end'] = time.time() - start_time
+                    execution_time = measurement.get('execution_time', time.time() - started_at)
+                    try:
+                        result = future.result()
+                        error_msg = self._evaluate_component_result(component_name, result)
+                        run_stats[component_name] = {
+                            'execution_time': execution_time,
+                            'status': 'success',
+                            'result_size': len(str(result)) if result else 0
+                        }
+                    except Exception as e:
+                        error_msg = f"Erro na execução de {component_name}: {str(e)}"
+                        run_stats[component_name] = {
+                            'execution_time': execution_time,
+                            'status': 'failed',
+                            'error': str(e)
+                        }
+                        if self.component_registry[component_name]['required']:
+                            logger.error(f"🚨 Componente obrigatório {component_name} falhou - análise comprometida")
+                    
+                    if error_msg:
+                        logger.error(f"❌ {error_msg}")
+                        run_stats[component_name].update(status='failed', error=error_msg)
+                        failed_components[component_name] = error_msg
+                        self._mark_component_failed(component_name, error_msg)
+                    else:
+                        successful_components[component_name] = result
+                        self._mark_component_successful(component_name, result)
+                        logger.info(f"✅ Componente {component_name} executado com sucesso")
+                
+                # Componentes que estouraram o timeout são abandonados (o término tardio é ignorado)
+                now = time.time()
+                for future, (component_name, started_at, deadline, _) in list(running.items()):
+                    if now >= deadline:
+                        running.pop(future)
+                        future.cancel()
+                        timings[component_name]['end'] = now - start_time
+                        timeout = self.component_registry[component_name]['timeout']
+                        error_msg = f"Timeout de {timeout:g}s em {component_name}"
+                        logger.error(f"⏰ {error_msg}")
+                        failed_components[component_name] = error_msg
+                        self._mark_component_failed(component_name, error_msg)
+                        run_stats[component_name] = {
+                            'execution_time': now - started_at,
+                            'status': 'timeout',
+                            'error': error_msg
+                        }
+        finally:
+            # Não espera por componentes abandonados após timeout
+            executor.shutdown(wait=False)
         
         execution_time = time.time() - start_time
+        # Snapshot da última execução para get_execution_summary
+        self.execution_stats = dict(run_stats)
+        critical_path = self._compute_critical_path(timings, successful_components, failed_components)
         
         # Gera relatório final
         execution_report = {
@@ -126,17 +223,73 @@ class ComponentOrchestrator:
                 'total_components': len(self.component_registry),
                 'successful_count': len(successful_components),
                 'failed_count': len(failed_components),
-                'success_rate': (len(successful_components) / len(self.component_registry)) * 100,
+                'success_rate': (len(successful_components) / len(self.component_registry)) * 100 if self.component_registry else 0,
                 'execution_time': execution_time,
+                'critical_path': critical_path,
                 'timestamp': datetime.now().isoformat()
             },
-            'component_details': self.execution_stats
+            'component_details': run_stats
         }
         
-        logger.info(f"📊 Execução concluída: {len(successful_components)}/{len(self.component_registry)} componentes bem-sucedidos")
+        logger.info(f"📊 Execução concluída: {len(successful_components)}/{len(self.component_registry)} componentes bem-sucedidos em {execution_time:.2f}s (caminho crítico: {' → '.join(critical_path['path'])})")
         
         return execution_report
     
+    def _evaluate_component_result(self, component_name: str, result: Any) -> Optional[str]:
+        """Retorna mensagem de erro se o resultado do componente for inválido"""
+        
+        if result is None:
+            return f"Componente {component_name} retornou None ou resultado inválido"
+        
+        if isinstance(result, dict) and result.get('error'):
+            return f"Componente {component_name} falhou: {result.get('error')}"
+        
+        if not self._validate_component_result(component_name, result):
+            return f"Resultado inválido para {component_name}"
+        
+        return None
+    
+    def _compute_critical_path(
+        self,
+        timings: Dict[str, Dict[str, float]],
+        successful_components: Dict[str, Any],
+        failed_components: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Calcula o caminho crítico (cadeia de dependências mais longa) da execução"""
+        
+        durations = {
+            name: max(0.0, t.get('end', t['start']) - t['start'])
+            for name, t in timings.items()
+        }
+        
+        longest = {}
+        
+        def chain(name):
+            if name not in longest:
+                deps = [d for d in self.component_registry[name]['dependencies'] if d in durations]
+                best_dep = max((chain(d) for d in deps), key=lambda c: c[0], default=(0.0, []))
+                longest[name] = (best_dep[0] + durations[name], best_dep[1] + [name])
+            return longest[name]
+        
+        paths = [chain(name) for name in durations]
+        length, path = max(paths, key=lambda c: c[0], default=(0.0, []))
+        serial_time = sum(durations.values())
+        
+        return {
+            'path': path,
+            'length': round(length, 3),
+            'serial_time': round(serial_time, 3),
+            'components': {
+                name: {
+                    'start': round(t['start'], 3),
+                    'end': round(t.get('end', t['start']), 3),
+                    'duration': round(durations[name], 3),
+                    'status': 'success' if name in successful_components else 'failed' if name in failed_components else 'unknown'
+                }
+                for name, t in timings.items()
+            }
+        }
+    
     def _check_dependencies(self, component_name: str) -> bool:
         """Verifica se as dependências de um componente foram atendidas"""
         
@@ -154,9 +307,10 @@ class ComponentOrchestrator:
         self, 
         component_name: str, 
         input_data: Dict[str, Any],
-        previous_results: Dict[str, Any]
+        previous_results: Dict[str, Any],
+        measurement: Optional[Dict[str, float]] = None
     ) -> Any:
-        """Executa um único componente"""
+        """Executa um único componente; o tempo de execução vai para measurement (lido por execute_components)"""
         
         component = self.component_registry[component_name]
         executor = component['executor']
@@ -171,29 +325,11 @@ class ComponentOrchestrator:
             }
             
             # Executa o componente
-            result = executor(execution_data)
-            
-            execution_time = time.time() - start_time
-            
-            # Registra estatísticas
-            self.execution_stats[component_name] = {
-                'execution_time': execution_time,
-                'status': 'success',
-                'result_size': len(str(result)) if result else 0
-            }
-            
-            return result
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            
-            self.execution_stats[component_name] = {
-                'execution_time': execution_time,
-                'status': 'failed',
-                'error': str(e)
-            }
+            return executor(execution_data)
             
-            raise e
+        finally:
+            if measurement is not None:
+                measurement['execution_time'] = time.time() - start_time
     
     def _validate_component_result(self, component_name: str, result: Any) -> bool:
         """Valida o resultado de um componente"""
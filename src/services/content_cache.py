@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Content Cache
+Cache persistente de conteúdo extraído por URL resolvida, revalidado com ETag/Last-Modified
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urldefrag
+from services.response_cache import create_response_cache
+
+logger = logging.getLogger(__name__)
+
+class ContentCache:
+    """Texto extraído, extrator usado e qualidade por URL; entradas antigas passam por GET condicional"""
+
+    def __init__(self):
+        """Inicializa o cache de conteúdo (SQLite com despejo LRU por tamanho, ou Redis)"""
+        self.cache = create_response_cache('content', default_ttl=7 * 86400, default_max_entries=10000, default_max_mb=500)
+        # Dentro desta janela o conteúdo é servido sem nenhuma requisição
+        self.fresh_seconds = float(os.getenv('CONTENT_CACHE_FRESH_SECONDS', '3600'))
+        self.counters = {'fresh_hits': 0, 'revalidated': 0, 'changed': 0, 'stores': 0, 'evicted': 0}
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache.enabled
+
+    def make_key(self, url: str) -> str:
+        """Chave pela URL resolvida, sem fragmento"""
+        return self.cache.make_key('content', urldefrag(url.strip())[0])
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(self.make_key(url), group='content')
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Validado há menos de fresh_seconds (com ou sem validadores HTTP); PDFs valem até o TTL do cache"""
+        if self._is_pdf(entry):
+            return True
+        return time.time() - entry.get('validated_at', 0) < self.fresh_seconds
+
+    @staticmethod
+    def _is_pdf(entry: Dict[str, Any]) -> bool:
+        """Conteúdo extraído de PDF (extratores pdf_*), que não muda no mesmo endereço"""
+        extractor = entry.get('extractor') or ''
+        return extractor.startswith('pdf_') or urldefrag(entry.get('url', ''))[0].lower().endswith('.pdf')
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Cabeçalhos If-None-Match / If-Modified-Since para revalidação"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(
+        self,
+        url: str,
+        content: str,
+        extractor: Optional[str],
+        quality_score: float,
+        validators: Optional[Dict[str, str]] = None,
+        latency: float = 0.0
+    ):
+        """Armazena conteúdo extraído com os validadores da resposta"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        validators = validators or {}
+        self.cache.set(self.make_key(url), {
+            'url': url,
+            'content': content,
+            'extractor': extractor,
+            'quality_score': quality_score,
+            'etag': validators.get('etag'),
+            'last_modified': validators.get('last_modified'),
+            'fetched_at': now,
+            'validated_at': now
+        }, group='content', latency=latency)
+        self._count('stores')
+
+    def mark_revalidated(self, url: str, entry: Dict[str, Any], validators: Optional[Dict[str, str]] = None):
+        """304 recebido: renova a janela de frescor (e o LRU) sem reprocessar"""
+        entry = dict(entry)
+        entry['validated_at'] = time.time()
+        for name, value in (validators or {}).items():
+            if value:
+                entry[name] = value
+        self.cache.set(self.make_key(url), entry, group='content')
+        self._count('revalidated')
+
+    def invalidate(self, url: str):
+        """Remove a entrada de uma URL que deixou de existir (404/410)"""
+        self.cache.delete(self.make_key(url))
+        self._count('evicted')
+
+    def record_fresh_hit(self):
+        self._count('fresh_hits')
+
+    def record_changed(self):
+        self._count('changed')
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def clear(self):
+        """Remove todo o conteúdo em cache"""
+        self.cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Ocupação do cache e contadores de revalidação"""
+        stats = self.cache.get_stats()
+        with self.lock:
+            stats['counters'] = dict(self.counters)
+        stats['fresh_seconds'] = self.fresh_seconds
+        return stats
+
+# Instância global
+content_cache = ContentCache()
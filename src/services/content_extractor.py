@@ -13,6 +13,7 @@ from typing import Optional, Dict, Any
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 import re
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +87,7 @@ class ContentExtractor:
             
             jina_url = f"{self.jina_reader_url}{url}"
             
+            rate_limiter.wait(jina_url)
             response = requests.get(
                 jina_url,
                 headers=headers,
@@ -109,6 +111,7 @@ class ContentExtractor:
     def _extract_direct(self, url: str) -> Optional[str]:
         """Extração direta usando BeautifulSoup"""
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -154,6 +157,7 @@ class ContentExtractor:
     def _extract_with_readability(self, url: str) -> Optional[str]:
         """Extração usando algoritmo de readability"""
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -201,6 +205,7 @@ class ContentExtractor:
     def _extract_fallback(self, url: str) -> Optional[str]:
         """Extração de fallback mais agressiva"""
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -267,6 +272,7 @@ class ContentExtractor:
     def extract_metadata(self, url: str) -> Dict[str, Any]:
         """Extrai metadados da página"""
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -342,6 +348,7 @@ class ContentExtractor:
     def extract_links(self, url: str, internal_only: bool = True) -> list:
         """Extrai links da página"""
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Context Executor
+ThreadPoolExecutor que propaga contextvars (sessão de salvamento) para as threads do pool
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Executa cada tarefa em uma cópia do contexto de quem a submeteu"""
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
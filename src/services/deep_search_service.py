@@ -15,6 +15,8 @@ import json
 from datetime import datetime
 from bs4 import BeautifulSoup
 import re
+from services.search_cache import cached_search
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -63,19 +65,16 @@ class DeepSearchService:
                 logger.info("🌐 Executando Google Custom Search REAL...")
                 google_results = self._google_search_real(query, max_results // 2)
                 search_results.extend(google_results)
-                time.sleep(1)  # Rate limiting
             
             # 2. BUSCA REAL COM BING
             logger.info("🔍 Executando Bing Search REAL...")
             bing_results = self._bing_search_real(query, max_results // 3)
             search_results.extend(bing_results)
-            time.sleep(1)
             
             # 3. BUSCA REAL COM DUCKDUCKGO
             logger.info("🦆 Executando DuckDuckGo Search REAL...")
             ddg_results = self._duckduckgo_search_real(query, max_results // 3)
             search_results.extend(ddg_results)
-            time.sleep(1)
             
             # 4. EXTRAI CONTEÚDO REAL DAS PÁGINAS ENCONTRADAS
             content_results = []
@@ -92,7 +91,6 @@ class DeepSearchService:
                         'relevance_score': self._calculate_real_relevance(content, query, context_data),
                         'source_engine': result.get('source', 'unknown')
                     })
-                    time.sleep(0.5)  # Rate limiting
             
             # 5. PROCESSA COM ANÁLISE REAL
             processed_content = self._process_real_content(query, context_data, content_results)
@@ -107,6 +105,7 @@ class DeepSearchService:
             logger.error(f"❌ ERRO CRÍTICO na busca profunda REAL: {str(e)}", exc_info=True)
             return self._generate_real_emergency_search(query, context_data)
     
+    @cached_search('google')
     def _google_search_real(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca REAL usando Google Custom Search API"""
         
@@ -125,6 +124,7 @@ class DeepSearchService:
                 'sort': 'date'
             }
             
+            rate_limiter.wait(self.google_search_url)
             response = requests.get(
                 self.google_search_url, 
                 params=params, 
@@ -154,12 +154,14 @@ class DeepSearchService:
             logger.error(f"❌ Erro no Google Search REAL: {str(e)}")
             return []
     
+    @cached_search('bing')
     def _bing_search_real(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca REAL usando Bing"""
         
         try:
             search_url = f"https://www.bing.com/search?q={quote_plus(query)}&cc=br&setlang=pt-br&count={max_results}"
             
+            rate_limiter.wait(search_url)
             response = requests.get(
                 search_url,
                 headers=self.headers,
@@ -199,12 +201,14 @@ class DeepSearchService:
             logger.error(f"❌ Erro no Bing Search REAL: {str(e)}")
             return []
     
+    @cached_search('duckduckgo')
     def _duckduckgo_search_real(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca REAL usando DuckDuckGo"""
         
         try:
             search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
             
+            rate_limiter.wait(search_url)
             response = requests.get(
                 search_url,
                 headers=self.headers,
@@ -272,6 +276,7 @@ class DeepSearchService:
             
             jina_url = f"{self.jina_reader_url}{url}"
             
+            rate_limiter.wait(jina_url)
             response = requests.get(
                 jina_url,
                 headers=headers,
@@ -298,6 +303,7 @@ class DeepSearchService:
         """Extração REAL direta usando requests + BeautifulSoup"""
         
         try:
+            rate_limiter.wait(url)
             response = requests.get(
                 url,
                 headers=self.headers,
@@ -10,10 +10,13 @@ import logging
 import time
 import asyncio
 from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from services.exa_client import exa_client
 from services.production_search_manager import production_search_manager
 from services.auto_save_manager import salvar_etapa, salvar_erro
+from services.context_executor import ContextThreadPoolExecutor
+from services.search_cache import cached_search
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +79,7 @@ class EnhancedSearchCoordinator:
         start_time = time.time()
         
         # EXECUTA BUSCAS SIMULTANEAMENTE com ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=3) as executor:
+        with ContextThreadPoolExecutor(max_workers=3) as executor:
             futures = {}
             
             # Busca Exa (se disponível) - NEURAL SEARCH
@@ -182,6 +185,7 @@ class EnhancedSearchCoordinator:
         
         return google_query.strip()
     
+    @cached_search('exa')
     def _execute_exa_neural_search(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Executa busca NEURAL específica no Exa"""
         
@@ -248,6 +252,7 @@ class EnhancedSearchCoordinator:
                 'error': str(e)
             }
     
+    @cached_search('google')
     def _execute_google_keyword_search(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Executa busca KEYWORD específica no Google"""
         
@@ -274,6 +279,7 @@ class EnhancedSearchCoordinator:
                 'dateRestrict': 'm12'  # Últimos 12 meses
             }
             
+            rate_limiter.wait('https://www.googleapis.com/customsearch/v1')
             response = requests.get(
                 'https://www.googleapis.com/customsearch/v1',
                 params=params,
@@ -117,7 +117,7 @@ class ErrorRecoverySystem:
             # Encontra provedor disponível
             available_provider = None
             for provider, status in provider_status.items():
-                if status == 'available':
+                if status.get('available'):
                     available_provider = provider
                     break
             
@@ -11,6 +11,7 @@ import requests
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +84,7 @@ class ExaClient:
             if end_published_date:
                 payload["endPublishedDate"] = end_published_date
             
+            rate_limiter.wait(f"{self.base_url}/search")
             response = requests.post(
                 f"{self.base_url}/search",
                 headers=self.headers,
@@ -122,6 +124,7 @@ class ExaClient:
                 "summary": summary
             }
             
+            rate_limiter.wait(f"{self.base_url}/contents")
             response = requests.post(
                 f"{self.base_url}/contents",
                 headers=self.headers,
@@ -159,6 +162,7 @@ class ExaClient:
                 "excludeSourceDomain": exclude_source_domain
             }
             
+            rate_limiter.wait(f"{self.base_url}/findSimilar")
             response = requests.post(
                 f"{self.base_url}/findSimilar",
                 headers=self.headers,
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Extraction Benchmark
+Compara o tempo de CPU por página do pipeline HTML com parse único e do pipeline antigo (um parse por extrator)
+
+Uso (a partir de src/):
+    python -m services.extraction_benchmark corpus/ --save https://exemplo.com.br/relatorio
+    python -m services.extraction_benchmark corpus/ --repeat 3
+"""
+
+import re
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any
+
+import services.robust_content_extractor as extractor_module
+from services.robust_content_extractor import robust_content_extractor
+from services.extractor_history import extractor_history
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+
+def save_pages(urls: List[str], corpus_dir: Path) -> int:
+    """Baixa páginas reais para o corpus (HTML bruto + índice arquivo -> URL)"""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    index_path = corpus_dir / INDEX_FILE
+    index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+
+    saved = 0
+    for url in urls:
+        html = robust_content_extractor._fetch_html(url)
+        if not html:
+            print(f"❌ Falha ao baixar {url}")
+            continue
+        name = re.sub(r'[^a-zA-Z0-9]+', '_', url.split('://', 1)[-1]).strip('_')[:120] + '.html'
+        (corpus_dir / name).write_text(html, encoding='utf-8')
+        index[name] = url
+        saved += 1
+        print(f"💾 {url} -> {name} ({len(html)} caracteres)")
+
+    index_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+    return saved
+
+def _run_pipeline(html: str, url: str, single_parse: bool) -> Dict[str, Any]:
+    robust_content_extractor.single_parse = single_parse
+    started = time.process_time()
+    content, extractor_name = robust_content_extractor._extract_from_html(html, url)
+    return {
+        'cpu_ms': (time.process_time() - started) * 1000,
+        'extractor': extractor_name,
+        'content_length': len(content) if content else 0
+    }
+
+def run_benchmark(corpus_dir: Path, repeat: int = 1) -> Dict[str, Any]:
+    """Executa os dois pipelines sobre cada página do corpus e resume o tempo de CPU"""
+    index_path = corpus_dir / INDEX_FILE
+    index = json.loads(index_path.read_text(encoding='utf-8')) if index_path.exists() else {}
+    pages = sorted(corpus_dir.glob('*.html'))
+    if not pages:
+        raise ValueError(f"Nenhuma página .html em {corpus_dir}")
+
+    # Sem salvamentos de etapa durante a medição
+    original_save = extractor_module.salvar_etapa, extractor_module.salvar_erro
+    extractor_module.salvar_etapa = lambda *args, **kwargs: None
+    extractor_module.salvar_erro = lambda *args, **kwargs: None
+    # Nem leitura nem registro no histórico por domínio: os dois pipelines usam a ordem padrão
+    # e a medição não altera o histórico de produção
+    extractor_history.order = lambda url, default_order: list(default_order)
+    extractor_history.record = lambda *args, **kwargs: None
+    original_mode = robust_content_extractor.single_parse
+
+    results = []
+    try:
+        for page_path in pages:
+            html = page_path.read_text(encoding='utf-8', errors='replace')
+            url = index.get(page_path.name, f"https://{page_path.stem}/")
+            runs = {'legacy': [], 'single_parse': []}
+            for _ in range(repeat):
+                runs['legacy'].append(_run_pipeline(html, url, single_parse=False))
+                runs['single_parse'].append(_run_pipeline(html, url, single_parse=True))
+
+            results.append({
+                'page': page_path.name,
+                'html_length': len(html),
+                'legacy_cpu_ms': min(run['cpu_ms'] for run in runs['legacy']),
+                'single_parse_cpu_ms': min(run['cpu_ms'] for run in runs['single_parse']),
+                'legacy_extractor': runs['legacy'][0]['extractor'],
+                'single_parse_extractor': runs['single_parse'][0]['extractor'],
+                'legacy_length': runs['legacy'][0]['content_length'],
+                'single_parse_length': runs['single_parse'][0]['content_length']
+            })
+    finally:
+        extractor_module.salvar_etapa, extractor_module.salvar_erro = original_save
+        del extractor_history.order, extractor_history.record
+        robust_content_extractor.single_parse = original_mode
+
+    legacy_avg = sum(r['legacy_cpu_ms'] for r in results) / len(results)
+    single_avg = sum(r['single_parse_cpu_ms'] for r in results) / len(results)
+    return {
+        'pages': len(results),
+        'legacy_avg_cpu_ms': round(legacy_avg, 2),
+        'single_parse_avg_cpu_ms': round(single_avg, 2),
+        'reduction_percent': round((1 - single_avg / legacy_avg) * 100, 1) if legacy_avg else 0.0,
+        'same_extractor': sum(1 for r in results if r['legacy_extractor'] == r['single_parse_extractor']),
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline de extração HTML')
+    parser.add_argument('corpus', help='Diretório com páginas .html salvas')
+    parser.add_argument('--save', nargs='+', metavar='URL', help='Baixa as URLs para o corpus antes de medir')
+    parser.add_argument('--repeat', type=int, default=1, help='Execuções por página (usa a menor medida)')
+    parser.add_argument('--json', action='store_true', help='Imprime o resultado completo em JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    corpus_dir = Path(args.corpus)
+    if args.save:
+        save_pages(args.save, corpus_dir)
+
+    summary = run_benchmark(corpus_dir, repeat=max(args.repeat, 1))
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    for r in summary['results']:
+        print(
+            f"{r['page'][:60]:60} {r['legacy_cpu_ms']:8.1f}ms -> {r['single_parse_cpu_ms']:8.1f}ms  "
+            f"({r['legacy_extractor']} -> {r['single_parse_extractor']})"
+        )
+    print(
+        f"\n📊 {summary['pages']} páginas: {summary['legacy_avg_cpu_ms']}ms -> "
+        f"{summary['single_parse_avg_cpu_ms']}ms de CPU por página ({summary['reduction_percent']}% menos); "
+        f"mesmo extrator em {summary['same_extractor']}/{summary['pages']}"
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Extractor History
+Histórico persistente de extratores por domínio para ordenar as tentativas de extração
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Sufixos de segundo nível comuns (ex.: empresa.com.br é o domínio registrável de blog.empresa.com.br)
+SECOND_LEVEL_LABELS = {'com', 'net', 'org', 'gov', 'edu', 'co', 'ac', 'mil', 'art', 'blog', 'jus', 'leg', 'ind', 'inf'}
+
+def registrable_domain(url_or_host: str) -> str:
+    """Domínio registrável aproximado, sem depender da lista de sufixos públicos"""
+    host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+    labels = (host or '').lower().strip('.').split('.')
+    if len(labels) <= 2:
+        return '.'.join(labels)
+    if len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+class ExtractorHistory:
+    """Por domínio: sucessos, falhas e tempo médio de cada extrator, e o último que funcionou"""
+
+    def __init__(self):
+        """Inicializa o histórico (SQLite em CACHE_DIR)"""
+        self.enabled = os.getenv('EXTRACTOR_HISTORY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        # Extrator sem nenhum sucesso após tantas falhas no domínio vai para o fim da fila
+        self.demote_after = int(os.getenv('EXTRACTOR_HISTORY_DEMOTE_AFTER', '3'))
+        self.max_domains = int(os.getenv('EXTRACTOR_HISTORY_MAX_DOMAINS', '20000'))
+        self.domains: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.conn = None
+
+        if not self.enabled:
+            return
+
+        path = Path(os.getenv('CACHE_DIR', 'cache')) / 'extractor_history.sqlite3'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS domains (
+                    domain TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_domains_updated ON domains(updated_at)")
+            self.conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Histórico de extratores apenas em memória: {e}")
+            self.conn = None
+
+    def _load(self, domain: str) -> Dict[str, Any]:
+        """Histórico do domínio (memória, depois disco); chamar com lock"""
+        entry = self.domains.get(domain)
+        if entry is None:
+            entry = {'domain': domain, 'last_success': None, 'extractors': {}}
+            if self.conn is not None:
+                row = self.conn.execute("SELECT data FROM domains WHERE domain = ?", (domain,)).fetchone()
+                if row:
+                    entry = json.loads(row[0])
+            self.domains[domain] = entry
+        return entry
+
+    def order(self, url: str, default_order: List[str]) -> List[str]:
+        """Último extrator bem-sucedido primeiro, depois por taxa de sucesso; os que sempre falham por último"""
+        if not self.enabled:
+            return list(default_order)
+
+        with self.lock:
+            entry = self._load(registrable_domain(url))
+            history = {name: dict(stats) for name, stats in entry['extractors'].items()}
+            last_success = entry['last_success']
+
+        if not history:
+            return list(default_order)
+
+        def rank(name: str):
+            stats = history.get(name, {})
+            success, failed = stats.get('success', 0), stats.get('failed', 0)
+            demoted = success == 0 and failed >= self.demote_after
+            success_rate = (success + 1) / (success + failed + 2)  # Suavizado: sem histórico = 0.5
+            return (
+                demoted,
+                name != last_success,
+                -success_rate,
+                stats.get('avg_time', 0.0),
+                default_order.index(name)
+            )
+
+        return sorted(default_order, key=rank)
+
+    def record(self, url: str, extractor_name: str, success: bool, elapsed: float):
+        """Registra o resultado de um extrator para o domínio da URL"""
+        if not self.enabled:
+            return
+
+        domain = registrable_domain(url)
+        with self.lock:
+            entry = self._load(domain)
+            stats = entry['extractors'].setdefault(
+                extractor_name, {'success': 0, 'failed': 0, 'avg_time': 0.0}
+            )
+            if success:
+                stats['success'] += 1
+                # Média do tempo das extrações bem-sucedidas
+                stats['avg_time'] += (elapsed - stats['avg_time']) / stats['success']
+                entry['last_success'] = extractor_name
+                entry['last_success_time'] = round(elapsed, 4)
+            else:
+                stats['failed'] += 1
+            entry['updated_at'] = time.time()
+            self._persist(domain, entry)
+
+            if len(self.domains) > self.max_domains:
+                self.domains.pop(next(iter(self.domains)))
+
+    def _persist(self, domain: str, entry: Dict[str, Any]):
+        """Grava o domínio no disco; chamar com lock"""
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO domains (domain, data, updated_at) VALUES (?, ?, ?)",
+                (domain, json.dumps(entry), entry['updated_at'])
+            )
+            self.conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao gravar histórico de extratores de {domain}: {e}")
+
+    def get_domain_stats(self, url_or_domain: str, default_order: List[str]) -> Dict[str, Any]:
+        """Histórico e ordem atual de um domínio"""
+        domain = registrable_domain(url_or_domain)
+        with self.lock:
+            entry = json.loads(json.dumps(self._load(domain)))
+        entry['order'] = self.order(domain, default_order)
+        return entry
+
+    def get_stats(self, default_order: List[str], limit: int = 50) -> Dict[str, Any]:
+        """Domínios atualizados mais recentemente, com a ordem aprendida para cada um"""
+        if not self.enabled:
+            return {'enabled': False}
+
+        with self.lock:
+            if self.conn is not None:
+                total = self.conn.execute("SELECT COUNT(*) FROM domains").fetchone()[0]
+                domains = [row[0] for row in self.conn.execute(
+                    "SELECT domain FROM domains ORDER BY updated_at DESC LIMIT ?", (limit,)
+                ).fetchall()]
+            else:
+                total = len(self.domains)
+                domains = sorted(
+                    self.domains, key=lambda d: self.domains[d].get('updated_at', 0), reverse=True
+                )[:limit]
+
+        reordered = 0
+        recent = {}
+        for domain in domains:
+            recent[domain] = self.get_domain_stats(domain, default_order)
+            if recent[domain]['order'] != list(default_order):
+                reordered += 1
+
+        return {
+            'enabled': True,
+            'total_domains': total,
+            'reordered_domains_in_sample': reordered,
+            'domains': recent
+        }
+
+    def clear(self):
+        """Esquece todo o histórico"""
+        with self.lock:
+            self.domains.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM domains")
+                self.conn.commit()
+
+# Instância global
+extractor_history = ExtractorHistory()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - File Lock
+Trava consultiva em arquivos, entre processos (fcntl.flock no POSIX, msvcrt.locking no Windows)
+"""
+
+import os
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+    import msvcrt
+
+# No Windows a trava cobre um byte muito além do fim do arquivo, para não bloquear leituras e escritas
+_WINDOWS_LOCK_OFFSET = 0x7FFFFFFE
+
+def lock_file(fd: int, blocking: bool = True) -> bool:
+    """Trava exclusiva no arquivo; sem blocking, retorna False se outro processo já a detém"""
+    if HAS_FCNTL:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except (BlockingIOError, PermissionError):
+            return False
+
+    position = os.lseek(fd, 0, os.SEEK_CUR)
+    try:
+        os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                # LK_LOCK desiste após ~10s de tentativas; continua esperando
+    finally:
+        os.lseek(fd, position, os.SEEK_SET)
+
+def unlock_file(fd: int):
+    """Libera a trava obtida com lock_file"""
+    if HAS_FCNTL:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+
+    position = os.lseek(fd, 0, os.SEEK_CUR)
+    try:
+        os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.lseek(fd, position, os.SEEK_SET)
@@ -9,6 +9,9 @@ import os
 import logging
 import json
 import time
+import atexit
+import sqlite3
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import uuid
@@ -21,7 +24,12 @@ class LocalFileManager:
     def __init__(self):
         """Inicializa o gerenciador de arquivos locais"""
         self.base_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'analyses_data')
+        # Índices (manifesto SQLite, contadores) ficam fora de base_dir: a limpeza por idade varre base_dir
+        self.index_dir = os.getenv('ANALYSES_INDEX_DIR') or os.path.join(self.base_dir, '..', 'analyses_index')
         self._ensure_directory_structure()
+        self.manifest_lock = threading.Lock()
+        self.manifest = self._open_manifest()
+        self._init_storage_stats()
         
         logger.info(f"Local File Manager inicializado: {self.base_dir}")
     
@@ -35,13 +43,131 @@ class LocalFileManager:
             'insights', 'pesquisa_web', 'completas', 'metadata'
         ]
         
-        # Cria diretório base
+        # Cria diretório base e o de índices
         os.makedirs(self.base_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
         
         # Cria subdiretórios
         for subdir in subdirs:
             os.makedirs(os.path.join(self.base_dir, subdir), exist_ok=True)
     
+    def _open_manifest(self) -> Optional[sqlite3.Connection]:
+        """Abre o manifesto análise -> arquivos; reconstrói a partir dos metadados se estiver ausente"""
+        manifest_path = os.path.join(self.index_dir, 'files_manifest.sqlite3')
+        try:
+            existed = os.path.exists(manifest_path)
+            conn = sqlite3.connect(manifest_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    rel_path TEXT PRIMARY KEY,
+                    analysis_id TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    modified REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_analysis ON files(analysis_id, section)")
+            conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Manifesto de arquivos indisponível: {str(e)}")
+            return None
+
+        if not existed:
+            self._rebuild_manifest(conn)
+        return conn
+
+    def rebuild_manifest(self) -> int:
+        """Reconstrói o manifesto a partir de metadata/*_metadata.json"""
+        if self.manifest is None:
+            return 0
+        return self._rebuild_manifest(self.manifest)
+
+    def _rebuild_manifest(self, conn: sqlite3.Connection) -> int:
+        rows = []
+        metadata_dir = os.path.join(self.base_dir, 'metadata')
+        for filename in os.listdir(metadata_dir):
+            if not filename.endswith('_metadata.json'):
+                continue
+            metadata_path = os.path.join(metadata_dir, filename)
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except Exception as e:
+                logger.error(f"❌ Erro ao ler metadata {filename}: {str(e)}")
+                continue
+
+            analysis_id = metadata.get('analysis_id')
+            if not analysis_id:
+                continue
+            files = [{'type': entry.get('type'), 'name': entry.get('name')} for entry in metadata.get('files_saved', [])]
+            files.append({'type': 'metadata', 'name': filename})
+            for entry in files:
+                if entry['type'] and entry['name']:
+                    row = self._manifest_row(analysis_id, os.path.join(self.base_dir, entry['type'], entry['name']), entry['type'])
+                    if row:
+                        rows.append(row)
+
+        with self.manifest_lock:
+            conn.execute("DELETE FROM files")
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (rel_path, analysis_id, section, name, size, modified) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+        logger.info(f"🗂️ Manifesto de arquivos reconstruído: {len(rows)} arquivos")
+        return len(rows)
+
+    def _manifest_row(self, analysis_id: str, file_path: str, section: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (
+            os.path.relpath(file_path, self.base_dir),
+            analysis_id,
+            section,
+            os.path.basename(file_path),
+            stat.st_size,
+            stat.st_mtime
+        )
+
+    def _manifest_add(self, analysis_id: str, saved_files: List[Dict[str, Any]]):
+        """Registra no manifesto (e nos contadores de armazenamento) os arquivos gravados para a análise"""
+        rows = [row for row in (
+            self._manifest_row(analysis_id, entry['path'], entry['type']) for entry in saved_files
+        ) if row]
+        for row in rows:
+            self._account(os.path.join(self.base_dir, row[0]), 1, row[4])
+        if self.manifest is None:
+            return
+        try:
+            with self.manifest_lock:
+                self.manifest.executemany(
+                    "INSERT OR REPLACE INTO files (rel_path, analysis_id, section, name, size, modified) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.manifest.commit()
+        except Exception as e:
+            logger.error(f"❌ Erro ao atualizar manifesto da análise {analysis_id}: {str(e)}")
+
+    def _manifest_files(self, analysis_id: str, section: Optional[str] = None, name: Optional[str] = None) -> List[sqlite3.Row]:
+        if self.manifest is None:
+            return []
+        query = "SELECT * FROM files WHERE analysis_id = ?"
+        params = [analysis_id]
+        if section:
+            query += " AND section = ?"
+            params.append(section)
+        if name:
+            query += " AND name = ?"
+            params.append(name)
+        with self.manifest_lock:
+            return self.manifest.execute(query + " ORDER BY section, name", params).fetchall()
+
     def save_analysis_locally(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """Salva análise completa em arquivos locais organizados"""
         
@@ -104,6 +230,7 @@ class LocalFileManager:
                     'size': os.path.getsize(metadata_file_path)
                 })
             
+            self._manifest_add(analysis_id, saved_files)
             logger.info(f"✅ Análise salva localmente: {len(saved_files)} arquivos")
             
             return {
@@ -246,15 +373,14 @@ class LocalFileManager:
             return []
     
     def get_analysis_directory(self, analysis_id: str) -> Optional[str]:
-        """Obtém diretório de uma análise específica"""
+        """Obtém diretório de uma análise específica (o da análise completa, se houver)"""
         
-        # Busca por arquivos que contenham o ID da análise
-        for root, dirs, files in os.walk(self.base_dir):
-            for file in files:
-                if analysis_id[:8] in file:
-                    return root
+        files = self.get_analysis_files(analysis_id)
+        if not files:
+            return None
         
-        return None
+        complete = [file for file in files if file['type'] == 'completas']
+        return os.path.dirname((complete or files)[0]['path'])
     
     def delete_local_analysis(self, analysis_id: str) -> bool:
         """Remove análise local por ID"""
@@ -262,17 +388,21 @@ class LocalFileManager:
         try:
             deleted_files = 0
             
-            # Busca e remove todos os arquivos relacionados
-            for root, dirs, files in os.walk(self.base_dir):
-                for file in files:
-                    if analysis_id[:8] in file:
-                        file_path = os.path.join(root, file)
-                        try:
-                            os.remove(file_path)
-                            deleted_files += 1
-                            logger.info(f"🗑️ Arquivo removido: {file}")
-                        except Exception as e:
-                            logger.error(f"❌ Erro ao remover {file}: {str(e)}")
+            # Remove os arquivos registrados no manifesto
+            for file in self.get_analysis_files(analysis_id):
+                try:
+                    self.remove_file(file['path'])
+                    deleted_files += 1
+                    logger.info(f"🗑️ Arquivo removido: {file['name']}")
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.error(f"❌ Erro ao remover {file['name']}: {str(e)}")
+            
+            if self.manifest is not None:
+                with self.manifest_lock:
+                    self.manifest.execute("DELETE FROM files WHERE analysis_id = ?", (analysis_id,))
+                    self.manifest.commit()
             
             if deleted_files > 0:
                 logger.info(f"✅ Análise {analysis_id} removida: {deleted_files} arquivos")
@@ -286,100 +416,185 @@ class LocalFileManager:
             return False
     
     def get_analysis_files(self, analysis_id: str) -> List[Dict[str, Any]]:
-        """Obtém lista de arquivos de uma análise"""
+        """Obtém lista de arquivos de uma análise (pelo manifesto)"""
         
         try:
-            files = []
-            
-            for root, dirs, filenames in os.walk(self.base_dir):
-                for filename in filenames:
-                    if analysis_id[:8] in filename:
-                        file_path = os.path.join(root, filename)
-                        
-                        # Determina tipo baseado no diretório
-                        section_type = os.path.basename(root)
-                        
-                        files.append({
-                            'name': filename,
-                            'path': file_path,
-                            'type': section_type,
-                            'size': os.path.getsize(file_path),
-                            'modified': datetime.fromtimestamp(
-                                os.path.getmtime(file_path)
-                            ).isoformat()
-                        })
-            
-            return files
+            return [{
+                'name': row['name'],
+                'path': os.path.join(self.base_dir, row['rel_path']),
+                'type': row['section'],
+                'size': row['size'],
+                'modified': datetime.fromtimestamp(row['modified']).isoformat()
+            } for row in self._manifest_files(analysis_id)]
             
         except Exception as e:
             logger.error(f"❌ Erro ao obter arquivos da análise {analysis_id}: {str(e)}")
             return []
     
+    def get_analysis_file_path(self, analysis_id: str, name: str) -> Optional[str]:
+        """Caminho de um arquivo da análise pelo nome, se estiver no manifesto"""
+        
+        rows = self._manifest_files(analysis_id, name=name)
+        return os.path.join(self.base_dir, rows[0]['rel_path']) if rows else None
+    
     def load_analysis_section(self, analysis_id: str, section_name: str) -> Optional[Dict[str, Any]]:
         """Carrega uma seção específica da análise"""
         
         try:
-            section_dir = os.path.join(self.base_dir, section_name)
-            
-            if not os.path.exists(section_dir):
+            rows = self._manifest_files(analysis_id, section=section_name)
+            if not rows:
                 return None
             
-            # Busca arquivo da seção
-            for filename in os.listdir(section_dir):
-                if analysis_id[:8] in filename and filename.endswith('.json'):
-                    file_path = os.path.join(section_dir, filename)
-                    
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-            
-            return None
+            with open(os.path.join(self.base_dir, rows[0]['rel_path']), 'r', encoding='utf-8') as f:
+                return json.load(f)
             
         except Exception as e:
             logger.error(f"❌ Erro ao carregar seção {section_name} da análise {analysis_id}: {str(e)}")
             return None
     
+    # ===== CONTABILIDADE DE ARMAZENAMENTO =====
+
+    def _init_storage_stats(self):
+        """Contadores por seção mantidos a cada gravação/remoção e reconciliados em segundo plano"""
+        self.stats_lock = threading.Lock()
+        self.stats_path = os.path.join(self.index_dir, 'storage_stats.json')
+        self.reconcile_interval = float(os.getenv('STORAGE_RECONCILE_INTERVAL', '900'))
+        self.stats_flush_interval = float(os.getenv('STORAGE_STATS_FLUSH_INTERVAL', '30'))
+        self.stats_dirty = False
+        self.stats_stop = threading.Event()
+
+        self.storage_stats = {'sections': {}, 'last_reconciled': None, 'reconcile_seconds': 0.0, 'last_drift_bytes': 0}
+        needs_reconcile = True
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                self.storage_stats.update(json.load(f))
+            needs_reconcile = False
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Estatísticas de armazenamento ilegíveis, serão recalculadas: {str(e)}")
+
+        if self.reconcile_interval > 0:
+            self.stats_thread = threading.Thread(
+                target=self._storage_stats_loop, args=(needs_reconcile,), name='storage-reconciler', daemon=True
+            )
+            self.stats_thread.start()
+        elif needs_reconcile:
+            self.reconcile_storage_stats()
+        atexit.register(self._flush_storage_stats)
+
+    def _section_of(self, file_path: str) -> str:
+        """Seção = primeiro diretório abaixo de base_dir"""
+        rel_path = os.path.relpath(file_path, self.base_dir)
+        return rel_path.split(os.sep, 1)[0] if os.sep in rel_path else os.path.basename(os.path.normpath(self.base_dir))
+
+    def _account(self, file_path: str, files_delta: int, bytes_delta: int):
+        """Aplica uma gravação (+) ou remoção (-) aos contadores da seção"""
+        section = self._section_of(file_path)
+        with self.stats_lock:
+            counters = self.storage_stats['sections'].setdefault(section, {'files': 0, 'size_bytes': 0})
+            counters['files'] = max(counters['files'] + files_delta, 0)
+            counters['size_bytes'] = max(counters['size_bytes'] + bytes_delta, 0)
+            self.stats_dirty = True
+
+    def remove_file(self, file_path: str) -> int:
+        """Remove um arquivo sob base_dir, atualizando contadores e manifesto; retorna os bytes liberados"""
+        size = os.path.getsize(file_path)
+        os.remove(file_path)
+        self._account(file_path, -1, -size)
+        if self.manifest is not None:
+            with self.manifest_lock:
+                self.manifest.execute("DELETE FROM files WHERE rel_path = ?", (os.path.relpath(file_path, self.base_dir),))
+                self.manifest.commit()
+        return size
+
+    def reconcile_storage_stats(self) -> Dict[str, Any]:
+        """Varre base_dir uma vez e substitui os contadores (corrige gravações feitas fora do manager)"""
+        started = time.time()
+        sections: Dict[str, Dict[str, int]] = {}
+        pending = [self.base_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                counters = sections.setdefault(self._section_of(entry.path), {'files': 0, 'size_bytes': 0})
+                                counters['files'] += 1
+                                counters['size_bytes'] += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warning(f"⚠️ Erro ao varrer {directory}: {str(e)}")
+
+        with self.stats_lock:
+            previous = sum(section['size_bytes'] for section in self.storage_stats['sections'].values())
+            current = sum(section['size_bytes'] for section in sections.values())
+            self.storage_stats.update({
+                'sections': sections,
+                'last_reconciled': datetime.now().isoformat(),
+                'reconcile_seconds': round(time.time() - started, 3),
+                'last_drift_bytes': current - previous
+            })
+            self.stats_dirty = True
+
+        if current != previous:
+            logger.info(f"📏 Armazenamento reconciliado: diferença de {current - previous} bytes")
+        self._flush_storage_stats()
+        return self.get_storage_stats()
+
+    def _flush_storage_stats(self):
+        """Persiste os contadores se houve mudança"""
+        with self.stats_lock:
+            if not self.stats_dirty:
+                return
+            snapshot = json.dumps(self.storage_stats, ensure_ascii=False)
+            self.stats_dirty = False
+        try:
+            temp_path = self.stats_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(temp_path, self.stats_path)
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar estatísticas de armazenamento: {str(e)}")
+
+    def _storage_stats_loop(self, reconcile_now: bool):
+        next_reconcile = time.time() if reconcile_now else time.time() + self.reconcile_interval
+        while not self.stats_stop.is_set():
+            if time.time() >= next_reconcile:
+                try:
+                    self.reconcile_storage_stats()
+                except Exception as e:
+                    logger.error(f"❌ Erro na reconciliação de armazenamento: {str(e)}")
+                next_reconcile = time.time() + self.reconcile_interval
+            self._flush_storage_stats()
+            self.stats_stop.wait(min(self.stats_flush_interval, max(next_reconcile - time.time(), 0.1)))
+
     def get_storage_stats(self) -> Dict[str, Any]:
-        """Obtém estatísticas de armazenamento"""
+        """Obtém estatísticas de armazenamento (dos contadores em memória, sem varrer o disco)"""
         
-        try:
+        with self.stats_lock:
+            sections = {name: dict(counters) for name, counters in self.storage_stats['sections'].items()}
             stats = {
                 'base_directory': self.base_dir,
-                'total_files': 0,
-                'total_size_bytes': 0,
-                'sections': {}
+                'total_files': sum(counters['files'] for counters in sections.values()),
+                'total_size_bytes': sum(counters['size_bytes'] for counters in sections.values()),
+                'sections': sections,
+                'last_reconciled': self.storage_stats['last_reconciled'],
+                'reconcile_seconds': self.storage_stats['reconcile_seconds'],
+                'last_drift_bytes': self.storage_stats['last_drift_bytes']
             }
-            
-            for root, dirs, files in os.walk(self.base_dir):
-                section_name = os.path.basename(root)
-                
-                if section_name not in stats['sections']:
-                    stats['sections'][section_name] = {
-                        'files': 0,
-                        'size_bytes': 0
-                    }
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        stats['total_files'] += 1
-                        stats['total_size_bytes'] += file_size
-                        stats['sections'][section_name]['files'] += 1
-                        stats['sections'][section_name]['size_bytes'] += file_size
-                    except:
-                        continue
-            
-            # Converte bytes para MB
-            stats['total_size_mb'] = round(stats['total_size_bytes'] / (1024 * 1024), 2)
-            
-            for section in stats['sections'].values():
-                section['size_mb'] = round(section['size_bytes'] / (1024 * 1024), 2)
-            
-            return stats
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao obter estatísticas: {str(e)}")
-            return {}
+        
+        # Converte bytes para MB
+        stats['total_size_mb'] = round(stats['total_size_bytes'] / (1024 * 1024), 2)
+        
+        for section in stats['sections'].values():
+            section['size_mb'] = round(section['size_bytes'] / (1024 * 1024), 2)
+        
+        return stats
 
 # Instância global
 local_file_manager = LocalFileManager()
\ No newline at end of file
@@ -11,7 +11,7 @@ import logging
 import time
 import asyncio
 from typing import Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from datetime import datetime
 
 # Import all services
@@ -33,6 +33,7 @@ from services.mcp_supadata_manager import mcp_supadata_manager
 from services.enhanced_search_coordinator import enhanced_search_coordinator
 from services.alibaba_websailor import AlibabaWebSailorAgent
 from services.auto_save_manager import auto_save_manager, salvar_etapa, salvar_erro
+from services.context_executor import ContextThreadPoolExecutor
 from services.local_file_manager import LocalFileManager
 
 logger = logging.getLogger(__name__)
@@ -74,6 +75,18 @@ class MasterOrchestrator:
         progress_callback: Optional[callable] = None
     ) -> Dict[str, Any]:
         """Executa análise completa com todos os serviços em paralelo"""
+
+        # Escopo de salvamento da sessão: análises concorrentes não se misturam
+        with auto_save_manager.usar_sessao(session_id):
+            return self._execute_comprehensive_analysis(data, session_id, progress_callback)
+
+    def _execute_comprehensive_analysis(
+        self,
+        data: Dict[str, Any],
+        session_id: str,
+        progress_callback: Optional[callable] = None
+    ) -> Dict[str, Any]:
+        """Executa análise completa com todos os serviços em paralelo"""
         
         try:
             logger.info(f"🚀 INICIANDO ANÁLISE COMPLETA ULTRA-ROBUSTA")
@@ -149,7 +162,7 @@ class MasterOrchestrator:
             
             search_results = {}
             
-            with ThreadPoolExecutor(max_workers=4) as executor:
+            with ContextThreadPoolExecutor(max_workers=4) as executor:
                 futures = {}
                 
                 # 1. Enhanced Search Coordinator (Exa + Google)
@@ -253,7 +266,7 @@ class MasterOrchestrator:
             
             specialized_results = {}
             
-            with ThreadPoolExecutor(max_workers=8) as executor:
+            with ContextThreadPoolExecutor(max_workers=8) as executor:
                 futures = {}
                 
                 # Combina dados para os agentes
@@ -15,6 +15,8 @@ from bs4 import BeautifulSoup
 import json
 import random
 from services.exa_client import exa_client
+from services.search_cache import search_cache, cached_search
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -67,24 +69,13 @@ class ProductionSearchManager:
             'Connection': 'keep-alive'
         }
 
-        self.cache = {}
-        self.cache_ttl = 3600  # 1 hora
-
         enabled_count = sum(1 for p in self.providers.values() if p['enabled'])
         logger.info(f"Production Search Manager inicializado com {enabled_count} provedores")
 
     def search_with_fallback(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Realiza busca com sistema de fallback automático"""
 
-        # Verifica cache primeiro
-        cache_key = f"{query}_{max_results}"
-        if cache_key in self.cache:
-            cache_data = self.cache[cache_key]
-            if time.time() - cache_data['timestamp'] < self.cache_ttl:
-                logger.info(f"🔄 Resultado do cache para: {query}")
-                return cache_data['results']
-
-        # Busca com fallback
+        # Busca com fallback (cada provedor consulta o cache de busca compartilhado)
         for provider_name in self._get_provider_order():
             if not self._is_provider_available(provider_name):
                 continue
@@ -102,13 +93,6 @@ class ProductionSearchManager:
                     continue
 
                 if results:
-                    # Cache resultado
-                    self.cache[cache_key] = {
-                        'results': results,
-                        'timestamp': time.time(),
-                        'provider': provider_name
-                    }
-
                     logger.info(f"✅ {provider_name}: {len(results)} resultados")
                     return results
                 else:
@@ -148,6 +132,7 @@ class ProductionSearchManager:
             if self.providers[provider_name]['error_count'] >= self.providers[provider_name]['max_errors']:
                 logger.warning(f"⚠️ Provedor {provider_name} desabilitado temporariamente")
 
+    @cached_search('google')
     def _search_google(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Google Custom Search API"""
         provider = self.providers['google']
@@ -162,6 +147,7 @@ class ProductionSearchManager:
             'safe': 'off'
         }
 
+        rate_limiter.wait(provider['base_url'])
         response = requests.get(
             provider['base_url'],
             params=params,
@@ -185,6 +171,7 @@ class ProductionSearchManager:
         else:
             raise Exception(f"Google API retornou status {response.status_code}")
 
+    @cached_search('serper')
     def _search_serper(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Serper API"""
         provider = self.providers['serper']
@@ -202,6 +189,7 @@ class ProductionSearchManager:
             'num': max_results
         }
 
+        rate_limiter.wait(provider['base_url'])
         response = requests.post(
             provider['base_url'],
             json=payload,
@@ -225,10 +213,12 @@ class ProductionSearchManager:
         else:
             raise Exception(f"Serper API retornou status {response.status_code}")
 
+    @cached_search('bing')
     def _search_bing(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Bing (scraping)"""
         search_url = f"{self.providers['bing']['base_url']}?q={quote_plus(query)}&cc=br&setlang=pt-br&count={max_results}"
 
+        rate_limiter.wait(search_url)
         response = requests.get(search_url, headers=self.headers, timeout=15)
 
         if response.status_code == 200:
@@ -293,8 +283,8 @@ class ProductionSearchManager:
             logger.info("🔄 Reset erros de todos os provedores")
 
     def clear_cache(self):
-        """Limpa cache de busca"""
-        self.cache = {}
+        """Limpa cache de busca (compartilhado por todos os gerenciadores)"""
+        search_cache.clear()
         logger.info("🧹 Cache de busca limpo")
 
     def test_provider(self, provider_name: str) -> bool:
@@ -322,6 +312,7 @@ class ProductionSearchManager:
             logger.error(f"❌ Teste do provedor {provider_name} falhou: {e}")
             return False
 
+    @cached_search('exa')
     def _search_exa(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Exa Neural Search"""
         try:
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Provider Health
+Estatísticas ao vivo e circuit breaker por provedor de IA
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ProviderHealth:
+    """Latência (p50/p95 com decaimento exponencial), taxa de sucesso, tokens/s e circuit breaker"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        prior_latency: float,
+        failure_threshold: int = 2,
+        cooldown: float = 60.0,
+        max_cooldown: float = 600.0,
+        alpha: float = 0.2,
+        window: int = 100
+    ):
+        self.name = name
+        self.prior_latency = prior_latency
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+
+        self.latencies = deque(maxlen=window)
+        self.success_rate = 1.0
+        self.tokens_per_second = None
+        self.samples = 0
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+
+        self.lock = threading.Lock()
+
+    def allow_request(self, force_probe: bool = False) -> bool:
+        """Indica se o provedor pode receber uma chamada agora (reserva a sonda em half-open).
+
+        force_probe antecipa o half-open de um circuito aberto antes do fim do cooldown,
+        sem alterar o cooldown (usado quando todos os circuitos estão abertos).
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.time() < self.open_until and not force_probe:
+                    return False
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+                logger.info(f"🔎 Circuito de {self.name} em half-open: liberando requisição de teste")
+
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def is_routable(self) -> bool:
+        """Como allow_request, mas sem reservar a sonda"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.time() >= self.open_until
+            return not self.probe_in_flight
+
+    def record_success(self, latency: float, content: Optional[str] = None):
+        """Registra chamada bem-sucedida"""
+        with self.lock:
+            self.latencies.append(latency)
+            self.samples += 1
+            self.success_rate = (1 - self.alpha) * self.success_rate + self.alpha
+
+            if content and latency > 0:
+                tps = (len(content) / 4) / latency  # ~4 caracteres por token
+                self.tokens_per_second = tps if self.tokens_per_second is None else (
+                    (1 - self.alpha) * self.tokens_per_second + self.alpha * tps
+                )
+
+            if self.state != self.CLOSED:
+                logger.info(f"✅ Circuito de {self.name} fechado após sonda bem-sucedida")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self.probe_in_flight = False
+
+    def record_failure(self, latency: Optional[float] = None):
+        """Registra falha e abre o circuito quando necessário"""
+        # Falhas lentas (timeouts) pesam na latência; falhas rápidas só na taxa de sucesso
+        slow_failure = latency is not None and latency >= self.latency_quantile(0.5)
+        with self.lock:
+            if slow_failure:
+                self.latencies.append(latency)
+            self.samples += 1
+            self.success_rate = (1 - self.alpha) * self.success_rate
+            self.consecutive_failures += 1
+
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self):
+        """Libera a sonda reservada sem registrar resultado (chamada abandonada)"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def _open(self):
+        """Abre o circuito (chamar com lock)"""
+        self.state = self.OPEN
+        self.open_until = time.time() + self.cooldown
+        self.probe_in_flight = False
+        self.trips += 1
+        logger.warning(f"⚠️ Circuito de {self.name} aberto por {self.cooldown:.0f}s após {self.consecutive_failures} falhas consecutivas")
+
+    def reset(self):
+        """Fecha o circuito e zera falhas"""
+        with self.lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self.open_until = 0.0
+            self.probe_in_flight = False
+
+    def latency_quantile(self, q: float) -> float:
+        """Quantil de latência ponderado exponencialmente (amostras recentes pesam mais)"""
+        with self.lock:
+            samples = list(self.latencies)
+
+        if not samples:
+            return self.prior_latency * (2 if q > 0.5 else 1)
+
+        decay = 1 - self.alpha
+        n = len(samples)
+        weighted = sorted((lat, decay ** (n - 1 - i)) for i, lat in enumerate(samples))
+        total = sum(w for _, w in weighted)
+
+        cumulative = 0.0
+        for lat, w in weighted:
+            cumulative += w
+            if cumulative >= q * total:
+                return lat
+        return weighted[-1][0]
+
+    def routing_score(self) -> float:
+        """Custo esperado em segundos (menor é melhor)"""
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return (p50 + 0.5 * p95) / max(self.success_rate, 0.05)
+
+    def seconds_until_retry(self) -> float:
+        with self.lock:
+            return max(0.0, self.open_until - time.time()) if self.state == self.OPEN else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Entradas usadas pela decisão de roteamento"""
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        with self.lock:
+            return {
+                'circuit_state': self.state,
+                'retry_in': round(max(0.0, self.open_until - time.time()), 1) if self.state == self.OPEN else 0.0,
+                'circuit_trips': self.trips,
+                'consecutive_failures': self.consecutive_failures,
+                'latency_p50': round(p50, 3),
+                'latency_p95': round(p95, 3),
+                'success_rate': round(self.success_rate, 3),
+                'tokens_per_second': round(self.tokens_per_second, 1) if self.tokens_per_second else None,
+                'samples': self.samples,
+                'routing_score': round((p50 + 0.5 * p95) / max(self.success_rate, 0.05), 3)
+            }
@@ -188,7 +188,12 @@ Execute uma análise ULTRA-PROFUNDA seguindo estas camadas:
 RETORNE JSON ESTRUTURADO ULTRA-COMPLETO com análise arqueológica detalhada.
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='arqueologist'
+        )
         
         if response:
             return self._process_archaeological_response(response, data)
@@ -345,7 +350,12 @@ RETORNE JSON com análise visceral completa:
 ```
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='visceral_master'
+        )
         
         if response:
             return self._process_visceral_response(response, data)
@@ -493,7 +503,12 @@ RETORNE JSON com drivers customizados completos:
 ```
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='drivers_architect'
+        )
         
         if response:
             return self._process_drivers_response(response, data)
@@ -632,7 +647,12 @@ RETORNE JSON com arsenal completo de PROVIs:
 ```
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='visual_director'
+        )
         
         if response:
             return self._process_visual_response(response, data)
@@ -764,7 +784,12 @@ RETORNE JSON com sistema anti-objeção completo:
 ```
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='anti_objection'
+        )
         
         if response:
             return self._process_anti_objection_response(response, data)
@@ -889,7 +914,12 @@ RETORNE JSON com orquestração completa:
 ```
 """
         
-        response = ai_manager.generate_analysis(prompt, max_tokens=8192)
+        response = ai_manager.generate_analysis_streamed(
+            prompt,
+            max_tokens=8192,
+            session_id=session_id,
+            section='pre_pitch_architect'
+        )
         
         if response:
             return self._process_pre_pitch_response(response, data)
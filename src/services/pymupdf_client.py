@@ -9,13 +9,25 @@ import os
 import logging
 import requests
 import tempfile
-from typing import Dict, Any, Optional
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Tuple
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extrai o texto das páginas [start, end) em um processo do pool"""
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        return [doc[page_num].get_text() or "" for page_num in range(start, min(end, len(doc)))]
+
 class PyMuPDFClient:
     """Cliente para extração de PDF usando PyMuPDF"""
-    
+
     def __init__(self):
         """Inicializa cliente PyMuPDF"""
         try:
@@ -25,62 +37,185 @@ class PyMuPDFClient:
         except ImportError:
             self.available = False
             logger.warning("⚠️ PyMuPDF não instalado")
-    
+
+        self.session = requests.Session()
+        rate_limiter.mount(self.session)
+
+        # Download em blocos direto para o disco, abortado acima do limite
+        self.max_bytes = int(os.getenv('PDF_MAX_BYTES', str(50 * 1024 * 1024)))
+        self.chunk_size = int(os.getenv('PDF_CHUNK_SIZE', str(256 * 1024)))
+        self.timeout = int(os.getenv('PDF_TIMEOUT', '30'))
+        # Texto suficiente para a análise: páginas restantes não são extraídas
+        self.target_chars = int(os.getenv('PDF_TARGET_CHARS', '100000'))
+        # PDFs com mais páginas que isso são extraídos em paralelo, por faixas de páginas
+        self.parallel_min_pages = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '16'))
+        self.pages_per_task = int(os.getenv('PDF_PAGES_PER_TASK', '8'))
+        self.max_workers = int(os.getenv('PDF_PROCESS_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+        self.process_pool = None
+        self.pool_lock = threading.Lock()
+
     def is_available(self) -> bool:
         """Verifica se PyMuPDF está disponível"""
         return self.available
-    
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Pool de processos criado sob demanda (spawn: seguro com as threads do servidor)"""
+        if self.max_workers < 2:
+            return None
+        with self.pool_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.process_pool
+
+    def _reset_process_pool(self):
+        with self.pool_lock:
+            if self.process_pool is not None:
+                self.process_pool.shutdown(wait=False, cancel_futures=True)
+                self.process_pool = None
+
+    def download_pdf(self, url: str, session: Optional[requests.Session] = None) -> Tuple[str, int]:
+        """Baixa o PDF em blocos para um arquivo temporário; retorna (caminho, bytes). Falha acima de PDF_MAX_BYTES"""
+        session = session or self.session
+        with session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+
+            declared = int(response.headers.get('Content-Length') or 0)
+            if declared > self.max_bytes:
+                raise ValueError(f"PDF com {declared} bytes excede o limite de {self.max_bytes} bytes")
+
+            size = 0
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
+                temp_path = temp_file.name
+                try:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ValueError(f"PDF excede o limite de {self.max_bytes} bytes")
+                        temp_file.write(chunk)
+                except Exception:
+                    temp_file.close()
+                    os.unlink(temp_path)
+                    raise
+
+        logger.info(f"📥 PDF baixado: {size} bytes de {url}")
+        return temp_path, size
+
+    def extract_text_from_file(self, pdf_path: str, target_chars: Optional[int] = None) -> Dict[str, Any]:
+        """Extrai o texto das páginas em ordem, parando quando há texto suficiente"""
+        import fitz
+
+        target_chars = target_chars or self.target_chars
+        with fitz.open(pdf_path) as doc:
+            total_pages = len(doc)
+            if total_pages < self.parallel_min_pages or self._get_process_pool() is None:
+                return self._page_result(self._extract_serial(doc, target_chars), total_pages, parallel=False)
+
+        try:
+            pages = self._extract_parallel(pdf_path, total_pages, target_chars)
+        except Exception as e:
+            # Pool quebrado ou erro em um worker: extrai em série, com a mesma parada antecipada
+            logger.warning(f"⚠️ Extração paralela do PDF falhou, extraindo em série: {e}")
+            if isinstance(e, BrokenProcessPool):
+                self._reset_process_pool()
+            with fitz.open(pdf_path) as doc:
+                return self._page_result(self._extract_serial(doc, target_chars), total_pages, parallel=False)
+
+        return self._page_result(pages, total_pages, parallel=True)
+
+    def _extract_serial(self, doc, target_chars: int) -> List[str]:
+        """Páginas em ordem até reunir target_chars caracteres"""
+        pages = []
+        collected = 0
+        for page_num in range(len(doc)):
+            page_text = doc[page_num].get_text() or ""
+            pages.append(page_text)
+            collected += len(page_text)
+            if collected >= target_chars:
+                break
+        return pages
+
+    def _extract_parallel(self, pdf_path: str, total_pages: int, target_chars: int) -> List[str]:
+        """Faixas de páginas no pool; cancela as faixas pendentes quando o prefixo já tem texto suficiente"""
+        pool = self._get_process_pool()
+        ranges = [(start, min(start + self.pages_per_task, total_pages))
+                  for start in range(0, total_pages, self.pages_per_task)]
+        futures = {pool.submit(_extract_page_range, pdf_path, start, end): index
+                   for index, (start, end) in enumerate(ranges)}
+
+        done_ranges: Dict[int, List[str]] = {}
+        prefix = 0
+        prefix_chars = 0
+        try:
+            for future in as_completed(futures):
+                done_ranges[futures[future]] = future.result()
+                # Só o prefixo contíguo conta, para o texto manter a ordem das páginas
+                while prefix in done_ranges:
+                    prefix_chars += sum(len(text) for text in done_ranges[prefix])
+                    prefix += 1
+                if prefix_chars >= target_chars or prefix == len(ranges):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return [text for index in range(prefix) for text in done_ranges[index]]
+
+    def _page_result(self, pages: List[str], total_pages: int, parallel: bool) -> Dict[str, Any]:
+        text = "\n".join(page_text for page_text in pages if page_text)
+        return {
+            'text': text,
+            'total_pages': total_pages,
+            'pages_read': len(pages),
+            'truncated': len(pages) < total_pages,
+            'parallel': parallel
+        }
+
     def extract_from_url(self, url: str) -> Dict[str, Any]:
         """Extrai texto de PDF via URL"""
-        
+
         if not self.available:
             return {'success': False, 'error': 'PyMuPDF não disponível'}
-        
+
         try:
-            import fitz
-            
-            # Baixa PDF
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Salva temporariamente
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_path = temp_file.name
-            
+            temp_path, size = self.download_pdf(url)
+
             try:
-                # Abre PDF com PyMuPDF
-                doc = fitz.open(temp_path)
-                text = ""
-                
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    page_text = page.get_text()
-                    if page_text:
-                        text += page_text + "\n"
-                
-                doc.close()
-                
+                extraction = self.extract_text_from_file(temp_path)
+                text = extraction['text']
+
                 return {
                     'success': True,
                     'text': text,
                     'metadata': {
-                        'pages': len(doc),
+                        'pages': extraction['total_pages'],
+                        'pages_read': extraction['pages_read'],
+                        'truncated': extraction['truncated'],
+                        'parallel': extraction['parallel'],
+                        'size_bytes': size,
                         'url': url,
                         'extractor': 'PyMuPDF'
+                    },
+                    'statistics': {
+                        'characters': len(text),
+                        'words': len(text.split()),
+                        'pages': extraction['pages_read']
                     }
                 }
-                
+
             finally:
                 # Remove arquivo temporário
                 try:
                     os.unlink(temp_path)
                 except:
                     pass
-                    
+
         except Exception as e:
             logger.error(f"❌ Erro PyMuPDF: {e}")
             return {'success': False, 'error': str(e)}
 
 # Instância global
-pymupdf_client = PyMuPDFClient()
\ No newline at end of file
+pymupdf_client = PyMuPDFClient()
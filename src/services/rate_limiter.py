@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Rate Limiter
+Token bucket por host/API compartilhado por todos os fetchers (requests, trafilatura e aiohttp)
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Cotas padrão (requisições/s, rajada) das APIs usadas; demais hosts usam RATE_LIMIT_DEFAULT_*
+DEFAULT_HOST_RULES = {
+    'r.jina.ai': (10.0, 20.0),
+    'googleapis.com': (10.0, 10.0),
+    'google.serper.dev': (5.0, 10.0),
+    'api.exa.ai': (5.0, 10.0),
+    'bing.com': (1.0, 2.0),
+    'duckduckgo.com': (1.0, 2.0),
+    'search.yahoo.com': (1.0, 2.0)
+}
+
+class TokenBucket:
+    """Token bucket com reserva: cada chamada reserva um token e recebe quanto deve esperar"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(rate, 0.01)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0.0
+        self.penalties = 0
+
+    def reserve(self) -> float:
+        """Reserva um token; retorna os segundos de espera até poder usá-lo"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            delay = max(delay, self.blocked_until - now)
+
+            self.requests += 1
+            self.waited += delay
+            return delay
+
+    def penalize(self, seconds: float):
+        """Bloqueia o host/API por `seconds` (429, Retry-After, backoff de retry)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.penalties += 1
+
+class RateLimiter:
+    """Agenda requisições por host: hosts diferentes seguem em velocidade total, cada host respeita sua cota"""
+
+    def __init__(self):
+        """Inicializa o rate limiter compartilhado"""
+        self.enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.default_rate = float(os.getenv('RATE_LIMIT_DEFAULT_RATE', '2'))
+        self.default_burst = float(os.getenv('RATE_LIMIT_DEFAULT_BURST', '4'))
+        self.max_penalty = float(os.getenv('RATE_LIMIT_MAX_PENALTY', '60'))
+        self.rules = dict(DEFAULT_HOST_RULES)
+        self.rules.update(self._parse_rules(os.getenv('RATE_LIMIT_HOSTS', '')))
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+        logger.info(
+            f"🚦 Rate Limiter: {self.default_rate}/s por host (rajada {self.default_burst}), "
+            f"{len(self.rules)} regras específicas" if self.enabled else "🚦 Rate Limiter desabilitado"
+        )
+
+    def _parse_rules(self, raw: str) -> Dict[str, Tuple[float, float]]:
+        """RATE_LIMIT_HOSTS='r.jina.ai=10:20,example.com=0.5' (requisições/s[:rajada])"""
+        rules = {}
+        for item in raw.split(','):
+            if '=' not in item:
+                continue
+            host, spec = item.split('=', 1)
+            try:
+                rate, _, burst = spec.partition(':')
+                rules[host.strip().lower()] = (float(rate), float(burst or rate))
+            except ValueError:
+                logger.warning(f"⚠️ Regra de rate limit inválida ignorada: {item}")
+        return rules
+
+    def host_key(self, url_or_host: str) -> str:
+        """Normaliza URL ou host para a chave do bucket (sem 'www.' e porta)"""
+        target = url_or_host.strip().lower()
+        host = urlparse(target).hostname if '://' in target else target.split('/')[0].split(':')[0]
+        host = host or target
+        return host[4:] if host.startswith('www.') else host
+
+    def _rule_for(self, host: str) -> Tuple[float, float]:
+        """Regra mais específica: host exato ou domínio pai (bing.com vale para cc.bing.com)"""
+        parts = host.split('.')
+        for i in range(len(parts) - 1):
+            rule = self.rules.get('.'.join(parts[i:]))
+            if rule:
+                return rule
+        return self.default_rate, self.default_burst
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        key = self.host_key(url_or_host)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(*self._rule_for(key))
+                    self.buckets[key] = bucket
+        return bucket
+
+    def reserve(self, url_or_host: str) -> float:
+        """Reserva a vez da requisição; retorna a espera necessária"""
+        if not self.enabled or not url_or_host:
+            return 0.0
+        return self.bucket(url_or_host).reserve()
+
+    def wait(self, url_or_host: str) -> float:
+        """Bloqueia a thread até a requisição ao host ser permitida"""
+        delay = self.reserve(url_or_host)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, url_or_host: str) -> float:
+        """Versão assíncrona de wait (não bloqueia o loop)"""
+        delay = self.reserve(url_or_host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def penalize(self, url_or_host: str, seconds: float):
+        """Adia as próximas requisições ao host (todas as threads e sessões)"""
+        if not self.enabled or not url_or_host:
+            return
+        seconds = min(seconds, self.max_penalty)
+        self.bucket(url_or_host).penalize(seconds)
+        logger.info(f"🚦 {self.host_key(url_or_host)} em espera por {seconds:.1f}s")
+
+    def observe(self, url: str, status_code: Optional[int], headers: Optional[Dict[str, str]] = None):
+        """Aplica Retry-After em respostas 429/503"""
+        if status_code not in (429, 503):
+            return
+        retry_after = (headers or {}).get('Retry-After')
+        try:
+            seconds = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            seconds = 0.0  # Retry-After em formato de data: usa a espera padrão
+        self.penalize(url, seconds or 5.0)
+
+    def mount(self, session):
+        """Passa todas as requisições de uma requests.Session pelo rate limiter"""
+        adapter = RateLimitedAdapter(self)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requisições, espera acumulada e penalidades por host"""
+        hosts = {
+            host: {
+                'rate': bucket.rate,
+                'burst': bucket.capacity,
+                'requests': bucket.requests,
+                'waited_seconds': round(bucket.waited, 3),
+                'penalties': bucket.penalties
+            }
+            for host, bucket in list(self.buckets.items())
+        }
+        return {
+            'enabled': self.enabled,
+            'default_rate': self.default_rate,
+            'default_burst': self.default_burst,
+            'hosts': hosts,
+            'total_requests': sum(h['requests'] for h in hosts.values()),
+            'total_waited_seconds': round(sum(h['waited_seconds'] for h in hosts.values()), 3)
+        }
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter que aguarda a vez do host antes de enviar e respeita Retry-After"""
+
+    def __init__(self, limiter: RateLimiter, *args, **kwargs):
+        self.limiter = limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.wait(request.url)
+        response = super().send(request, **kwargs)
+        self.limiter.observe(request.url, response.status_code, response.headers)
+        return response
+
+# Instância global
+rate_limiter = RateLimiter()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Response Cache
+Cache persistente endereçado por conteúdo com TTL e despejo LRU
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, List
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+class SQLiteCacheBackend:
+    """Backend em disco (SQLite) com limite de entradas e de bytes"""
+
+    def __init__(self, path: Path, max_entries: int, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                meta TEXT,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, meta, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if row[2] < now:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return row[0], json.loads(row[1]) if row[1] else {}
+
+    def set(self, key: str, value: str, ttl: float, meta: Dict[str, Any] = None):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, meta, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta or {}, default=str), len(value.encode('utf-8')), now, now + ttl, now)
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def delete(self, key: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.commit()
+
+    def _evict(self, now: float):
+        """Remove expirados e, se necessário, os menos usados recentemente (chamar com lock)"""
+        self.conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"🧹 Cache {self.path.name}: {evicted} entradas LRU removidas")
+
+    def get_info(self) -> Dict[str, Any]:
+        with self.lock:
+            count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            'backend': 'disk',
+            'path': str(self.path),
+            'entries': count,
+            'size_bytes': total,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes
+        }
+
+class RedisCacheBackend:
+    """Backend Redis com TTL nativo e índice LRU em sorted set"""
+
+    def __init__(self, url: str, namespace: str, max_entries: int):
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.client.ping()
+        self.prefix = f"arqv30:cache:{namespace}:"
+        self.lru_key = f"arqv30:cache:{namespace}:__lru__"
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.client.zrem(self.lru_key, key)
+            return None
+        self.client.zadd(self.lru_key, {key: time.time()})
+        payload = json.loads(raw)
+        return payload['value'], payload.get('meta', {})
+
+    def set(self, key: str, value: str, ttl: float, meta: Dict[str, Any] = None):
+        payload = json.dumps({'value': value, 'meta': meta or {}}, default=str)
+        pipe = self.client.pipeline()
+        pipe.setex(self.prefix + key, int(max(1, ttl)), payload)
+        pipe.zadd(self.lru_key, {key: time.time()})
+        pipe.execute()
+
+        overflow = self.client.zcard(self.lru_key) - self.max_entries
+        if overflow > 0:
+            oldest = [k.decode() if isinstance(k, bytes) else k for k, _ in self.client.zpopmin(self.lru_key, overflow)]
+            if oldest:
+                self.client.delete(*[self.prefix + k for k in oldest])
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+        self.client.zrem(self.lru_key, key)
+
+    def clear(self):
+        keys = [k.decode() if isinstance(k, bytes) else k for k in self.client.zrange(self.lru_key, 0, -1)]
+        if keys:
+            self.client.delete(*[self.prefix + k for k in keys])
+        self.client.delete(self.lru_key)
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': 'redis',
+            'entries': self.client.zcard(self.lru_key),
+            'max_entries': self.max_entries
+        }
+
+class ResponseCache:
+    """Cache de respostas com chave derivada do conteúdo e contadores por grupo"""
+
+    def __init__(self, namespace: str, backend, default_ttl: float):
+        self.namespace = namespace
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.enabled = backend is not None
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normaliza texto para que variações de espaço não gerem chaves diferentes"""
+        return re.sub(r'\s+', ' ', str(text or '')).strip()
+
+    def make_key(self, *parts: Any) -> str:
+        """Gera chave SHA-256 a partir das partes fornecidas"""
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, group: str = 'default') -> Optional[Any]:
+        """Busca valor no cache, registrando hit/miss e latência economizada"""
+        if not self.enabled:
+            return None
+
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao ler cache {self.namespace}: {e}")
+            entry = None
+
+        stats = self._group_stats(group)
+        with self.stats_lock:
+            if entry is None:
+                stats['misses'] += 1
+                return None
+
+            value, meta = entry
+            stats['hits'] += 1
+            stats['saved_latency'] += float(meta.get('latency', 0) or 0)
+
+        return json.loads(value)
+
+    def get_any(self, candidates: List[Tuple[str, str]]) -> Optional[Tuple[str, Any]]:
+        """Busca a primeira chave presente entre (grupo, chave); miss contabilizado no primeiro grupo"""
+        if not self.enabled or not candidates:
+            return None
+
+        for group, key in candidates:
+            try:
+                entry = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao ler cache {self.namespace}: {e}")
+                entry = None
+
+            if entry is not None:
+                value, meta = entry
+                with self.stats_lock:
+                    stats = self._group_stats(group)
+                    stats['hits'] += 1
+                    stats['saved_latency'] += float(meta.get('latency', 0) or 0)
+                return group, json.loads(value)
+
+        with self.stats_lock:
+            self._group_stats(candidates[0][0])['misses'] += 1
+        return None
+
+    def set(self, key: str, value: Any, group: str = 'default', ttl: Optional[float] = None, latency: float = 0.0):
+        """Armazena valor serializável em JSON"""
+        if not self.enabled:
+            return
+
+        try:
+            self.backend.set(
+                key,
+                json.dumps(value, ensure_ascii=False, default=str),
+                ttl or self.default_ttl,
+                {'group': group, 'latency': latency}
+            )
+            with self.stats_lock:
+                self._group_stats(group)['stores'] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao gravar cache {self.namespace}: {e}")
+
+    def delete(self, key: str):
+        """Remove uma entrada"""
+        if not self.enabled:
+            return
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao remover entrada do cache {self.namespace}: {e}")
+
+    def clear(self):
+        """Limpa todas as entradas do namespace"""
+        if self.enabled:
+            self.backend.clear()
+            logger.info(f"🧹 Cache {self.namespace} limpo")
+
+    def _group_stats(self, group: str) -> Dict[str, Any]:
+        if group not in self.stats:
+            self.stats[group] = {'hits': 0, 'misses': 0, 'stores': 0, 'saved_latency': 0.0}
+        return self.stats[group]
+
+    def get_group_stats(self, group: str) -> Dict[str, Any]:
+        """Contadores de um grupo (ex.: provedor)"""
+        with self.stats_lock:
+            stats = dict(self._group_stats(group))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 2) if lookups else 0.0
+        stats['saved_latency'] = round(stats['saved_latency'], 3)
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas completas do cache"""
+        info = {'enabled': self.enabled, 'namespace': self.namespace, 'ttl': self.default_ttl}
+        if self.enabled:
+            try:
+                info.update(self.backend.get_info())
+            except Exception as e:
+                info['error'] = str(e)
+        with self.stats_lock:
+            groups = list(self.stats.keys())
+        info['groups'] = {group: self.get_group_stats(group) for group in groups}
+        return info
+
+def create_response_cache(namespace: str, default_ttl: float = 86400, default_max_entries: int = 5000,
+                          default_max_mb: int = 200) -> ResponseCache:
+    """Cria cache configurado por variáveis de ambiente (<NAMESPACE>_CACHE_*)"""
+
+    prefix = namespace.upper()
+    enabled = os.getenv(f'{prefix}_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    ttl = float(os.getenv(f'{prefix}_CACHE_TTL', str(default_ttl)))
+    max_entries = int(os.getenv(f'{prefix}_CACHE_MAX_ENTRIES', str(default_max_entries)))
+    max_bytes = int(float(os.getenv(f'{prefix}_CACHE_MAX_MB', str(default_max_mb))) * 1024 * 1024)
+    backend_name = os.getenv(f'{prefix}_CACHE_BACKEND', os.getenv('CACHE_BACKEND', 'disk')).lower()
+
+    if not enabled:
+        logger.info(f"ℹ️ Cache {namespace} desabilitado")
+        return ResponseCache(namespace, None, ttl)
+
+    backend = None
+    if backend_name == 'redis':
+        if HAS_REDIS:
+            try:
+                backend = RedisCacheBackend(os.getenv('REDIS_URL', 'redis://localhost:6379/0'), namespace, max_entries)
+                logger.info(f"✅ Cache {namespace} usando Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis indisponível para cache {namespace}, usando disco: {e}")
+        else:
+            logger.warning(f"⚠️ Biblioteca 'redis' não instalada, cache {namespace} usando disco")
+
+    if backend is None:
+        cache_dir = Path(os.getenv('CACHE_DIR', 'cache'))
+        try:
+            backend = SQLiteCacheBackend(cache_dir / f"{namespace}.sqlite3", max_entries, max_bytes)
+            logger.info(f"✅ Cache {namespace} em disco: {backend.path}")
+        except Exception as e:
+            logger.error(f"❌ Falha ao abrir cache {namespace} em disco: {e}")
+
+    return ResponseCache(namespace, backend, ttl)
@@ -14,9 +14,10 @@ import json
 from typing import Dict, List, Optional, Any, Tuple
 from urllib.parse import urljoin, urlparse
 import re
-import tempfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
+from concurrent.futures import as_completed
 from services.auto_save_manager import salvar_etapa, salvar_erro
+from services.context_executor import ContextThreadPoolExecutor
 
 # Imports condicionais para não quebrar se não estiver instalado
 try:
@@ -44,6 +45,19 @@ try:
 except ImportError:
     HAS_BEAUTIFULSOUP = False
 
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from lxml.cssselect import CSSSelector
+    HAS_CSSSELECT = HAS_LXML
+except ImportError:
+    HAS_CSSSELECT = False
+
 try:
     import PyPDF2
     HAS_PYPDF2 = True
@@ -63,12 +77,124 @@ except ImportError:
     HAS_PYMUPDF = False
 
 from services.url_resolver import url_resolver
+from services.rate_limiter import rate_limiter
+from services.content_cache import content_cache
+from services.extractor_history import extractor_history, registrable_domain
 
 logger = logging.getLogger(__name__)
 
+# Seletores usados pelas estratégias de extração (compilados uma vez quando há lxml + cssselect)
+DYNAMIC_CONTENT_SELECTORS = [
+    '[data-content]', '[data-text]', '.content-loaded',
+    '.server-rendered', '.static-content', '.preloaded',
+    'main', 'article', '.post-content', '.article-content',
+    '.entry-content', '.page-content', '.text-content'
+]
+
+CONTENT_SELECTORS = [
+    '.content', '#content', '.post', '.article',
+    '.entry', '.text', '.body', '.main-content',
+    '.post-content', '.article-content', '.entry-content',
+    '.page-content', '.text-content', '.story-content'
+]
+
+def _compile_selectors(selectors: List[str]) -> List[Any]:
+    compiled = []
+    for selector in selectors:
+        try:
+            compiled.append(CSSSelector(selector))
+        except Exception:
+            continue
+    return compiled
+
+class ParsedHTML:
+    """HTML de uma página com uma única árvore lxml compartilhada por todos os extratores"""
+
+    def __init__(self, html: str, use_lxml: bool = True):
+        self.html = html
+        self.use_lxml = use_lxml and HAS_LXML
+        self._tree = None
+        self._parsed = False
+        self._lower = None
+        self._full_text = None
+        self._clean_trees = {}
+        self._visible_text_length = None
+        self._paragraph_count = None
+        self.parse_cpu_time = 0.0
+
+    @property
+    def tree(self):
+        """Árvore lxml (parse único, sob demanda); None sem lxml ou com HTML inválido"""
+        if not self._parsed:
+            self._parsed = True
+            if self.use_lxml and self.html:
+                started = time.thread_time()
+                try:
+                    self._tree = lxml.html.document_fromstring(self.html)
+                except (etree.ParserError, ValueError) as e:
+                    logger.warning(f"⚠️ lxml não conseguiu interpretar o HTML: {e}")
+                self.parse_cpu_time = time.thread_time() - started
+        return self._tree
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.html.lower()
+        return self._lower
+
+    @property
+    def full_text(self) -> Optional[str]:
+        """Texto de todo o documento sem scripts/estilos (como get_text do BeautifulSoup)"""
+        if self._full_text is None:
+            tree = self.clean_tree('script', 'style')
+            if tree is not None:
+                self._full_text = tree.text_content()
+        return self._full_text
+
+    def copy_tree(self):
+        """Cópia da árvore para extratores que a modificam (trafilatura, readability)"""
+        tree = self.tree
+        return copy.deepcopy(tree) if tree is not None else None
+
+    def clean_tree(self, *tags: str):
+        """Cópia sem as tags indicadas, memorizada por conjunto de tags (somente leitura)"""
+        if tags not in self._clean_trees:
+            tree = self.copy_tree()
+            if tree is not None:
+                etree.strip_elements(tree, *tags, with_tail=False)
+            self._clean_trees[tags] = tree
+        return self._clean_trees[tags]
+
+    @property
+    def visible_text_length(self) -> Optional[int]:
+        """Caracteres de texto visível (sem scripts/estilos), sem espaços redundantes"""
+        if self._visible_text_length is None:
+            tree = self.clean_tree('script', 'style', 'noscript', 'iframe', 'template')
+            if tree is not None:
+                self._visible_text_length = len(' '.join(tree.text_content().split()))
+        return self._visible_text_length
+
+    @property
+    def paragraph_count(self) -> Optional[int]:
+        """Parágrafos substanciais (base do score de readability e newspaper)"""
+        if self._paragraph_count is None and self.tree is not None:
+            self._paragraph_count = sum(
+                1 for p in self.tree.iter('p') if len(p.text_content().strip()) >= 40
+            )
+        return self._paragraph_count
+
+def _node_text(element, strip: bool = False) -> str:
+    """Equivalente lxml de get_text()/get_text(strip=True) do BeautifulSoup"""
+    if strip:
+        return ''.join(text.strip() for text in element.xpath('.//text()'))
+    return element.text_content()
+
 class RobustContentExtractor:
     """Extrator de conteúdo multicamadas e robusto com suporte aprimorado a PDF"""
 
+    # Ordem padrão dos extratores HTML (reordenada por domínio pelo histórico)
+    HTML_EXTRACTORS = ['trafilatura', 'readability', 'newspaper', 'beautifulsoup']
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
@@ -79,11 +205,20 @@ class RobustContentExtractor:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        rate_limiter.mount(self.session)
 
         self.timeout = 30
         self.min_content_length = 200  # Reduzido de 500 para 200
         self.max_content_length = 50000  # 50K chars max
 
+        # Pipeline de parse único: uma árvore lxml por página, compartilhada pelos extratores
+        self.single_parse = os.getenv('EXTRACTION_SINGLE_PARSE', 'true').lower() in ('1', 'true', 'yes')
+        # Orçamento de CPU por extrator; estourado, os extratores pesados restantes são pulados
+        self.extractor_cpu_budget = float(os.getenv('EXTRACTOR_CPU_BUDGET_MS', '2000')) / 1000
+        self.trafilatura_config = trafilatura.settings.use_config() if HAS_TRAFILATURA else None
+        self.dynamic_selectors = _compile_selectors(DYNAMIC_CONTENT_SELECTORS) if HAS_CSSSELECT else []
+        self.content_selectors = _compile_selectors(CONTENT_SELECTORS) if HAS_CSSSELECT else []
+
         # Estatísticas dos extratores
         self.stats = {
             'trafilatura': {'success': 0, 'failed': 0, 'total_time': 0, 'usage_count': 0, 'available': HAS_TRAFILATURA},
@@ -100,6 +235,9 @@ class RobustContentExtractor:
                 'success_rate': 0.0
             }
         }
+        for extractor_name, extractor_stats in self.stats.items():
+            if extractor_name != 'global':
+                extractor_stats.update({'cpu_time': 0.0, 'skipped': 0, 'budget_exceeded': 0})
 
         logger.info("🔧 Robust Content Extractor inicializado")
         logger.info(f"📚 Extratores disponíveis: {self._get_available_extractors()}")
@@ -138,147 +276,268 @@ class RobustContentExtractor:
                 self._update_global_stats()
                 return None
 
-            # 2. Verifica se é PDF
-            if self._is_pdf_url(url):
-                logger.info("📄 Detectado PDF - usando extratores especializados")
-                # PRIORIDADE MÁXIMA: PyMuPDF primeiro
-                from services.pymupdf_client import pymupdf_client
-                if pymupdf_client.is_available():
-                    logger.info("🚀 Usando PyMuPDF Pro com PRIORIDADE MÁXIMA")
-                    pdf_result = pymupdf_client.extract_from_url(url)
-                    if pdf_result.get('success') and pdf_result.get('text'):
-                        content = pdf_result['text']
-                        if self._validate_content(content, url):
-                            salvar_etapa("extracao_pymupdf_pro", {
-                                "url": url,
-                                "content_length": len(content),
-                                "pages": pdf_result.get('metadata', {}).get('pages', 0),
-                                "extractor": "PyMuPDF_Pro_Priority"
-                            }, categoria="pesquisa_web")
-                            self.stats['global']['total_successes'] += 1
-                            self._update_global_stats()
-                            logger.info(f"✅ PyMuPDF Pro SUCESSO: {len(content)} caracteres")
-                            return content
-
-                # Fallback para outros extratores de PDF
-                content = self._extract_pdf_content(url)
-                if content and self._validate_content(content, url):
-                    # Salva extração de PDF bem-sucedida
-                    salvar_etapa("extracao_pdf", {
-                        "url": url,
-                        "content_length": len(content),
-                        "extractor": "pdf_specialized"
-                    }, categoria="pesquisa_web")
-                    self.stats['global']['total_successes'] += 1
-                    self._update_global_stats()
-                    return content
-
-            # 3. Baixa conteúdo HTML
-            html_content = self._fetch_html(url)
-            if not html_content:
-                logger.error(f"❌ Falha ao baixar HTML para {url}")
-                salvar_erro("download_html", Exception(f"Falha no download: {url}"))
-                self.stats['global']['total_failures'] += 1
-                self._update_global_stats()
-                return None
-
-            # Valida HTML mínimo
-            if len(html_content) < 500:
-                logger.warning(f"⚠️ HTML muito pequeno: {len(html_content)} caracteres")
-                # Continua tentando extrair, mas com expectativas baixas
-
-            logger.info(f"📥 HTML baixado: {len(html_content)} caracteres")
-
-            # 4. Verifica se é página dinâmica (JavaScript-heavy)
-            if self._is_dynamic_page(html_content):
-                logger.warning(f"⚠️ Página dinâmica detectada: {url}")
-                # Tenta extração mais agressiva
-                content = self._extract_dynamic_content(html_content, url)
-                if content and self._validate_content(content, url):
-                    # Salva extração dinâmica bem-sucedida
-                    salvar_etapa("extracao_dinamica", {
-                        "url": url,
-                        "content_length": len(content),
-                        "extractor": "dynamic_specialized"
-                    }, categoria="pesquisa_web")
-                    self.stats['global']['total_successes'] += 1
+            # 2. Cache persistente de conteúdo (revalidado com ETag/Last-Modified)
+            prefetched = None
+            cached = content_cache.get(url)
+            if cached:
+                if content_cache.is_fresh(cached):
+                    content_cache.record_fresh_hit()
+                    return self._serve_cached(url, cached, "cache")
+
+                html_content, validators, status = self._fetch_page(url, content_cache.conditional_headers(cached))
+                if status == 304:
+                    content_cache.mark_revalidated(url, cached, validators)
+                    return self._serve_cached(url, cached, "cache_304")
+                if status in (404, 410):
+                    # Página removida: o conteúdo em cache não deve mais ser servido
+                    logger.info(f"🗑️ {url} retornou {status}: removendo do cache de conteúdo")
+                    content_cache.invalidate(url)
+                    self.stats['global']['total_failures'] += 1
                     self._update_global_stats()
-                    return content
-
-            # 5. Tenta extratores em ordem de prioridade
-            extractors = [
-                ('trafilatura', self._extract_with_trafilatura),
-                ('readability', self._extract_with_readability),
-                ('newspaper', self._extract_with_newspaper),
-                ('beautifulsoup', self._extract_with_beautifulsoup)
-            ]
-
-            for extractor_name, extractor_func in extractors:
-                if not self._is_extractor_available(extractor_name):
-                    continue
-
-                try:
-                    logger.info(f"🔍 Tentando extração com {extractor_name}...")
-                    extractor_start = time.time()
-                    self.stats[extractor_name]['usage_count'] += 1
+                    return None
+                if status is None or status >= 500:
+                    # Servidor inacessível ou com erro: conteúdo anterior é melhor que nenhum
+                    return self._serve_cached(url, cached, "cache_stale")
+                if html_content:
+                    # Página mudou: reaproveita o download da revalidação
+                    content_cache.record_changed()
+                    prefetched = (html_content, validators)
+
+            # 3. Extração completa
+            content, extractor, validators = self._extract_resolved(url, prefetched)
+            if content:
+                content_cache.store(
+                    url,
+                    content,
+                    extractor,
+                    self._quality_score(content),
+                    validators,
+                    latency=time.time() - start_time
+                )
+            return content
 
-                    content = extractor_func(html_content, url)
-                    extractor_time = time.time() - extractor_start
+        except Exception as e:
+            logger.error(f"❌ Erro crítico na extração de {url}: {str(e)}")
+            salvar_erro("extracao_critica", e, contexto={"url": url})
+            self.stats['global']['total_failures'] += 1
+            self._update_global_stats()
+            return None
 
+    def _extract_resolved(
+        self,
+        url: str,
+        prefetched: Optional[Tuple[str, Dict[str, str]]] = None
+    ) -> Tuple[Optional[str], Optional[str], Dict[str, str]]:
+        """Extrai conteúdo de URL já resolvida; retorna (conteúdo, extrator, validadores HTTP)"""
+
+        # 1. Verifica se é PDF
+        if self._is_pdf_url(url):
+            logger.info("📄 Detectado PDF - usando extratores especializados")
+            # PRIORIDADE MÁXIMA: PyMuPDF primeiro
+            from services.pymupdf_client import pymupdf_client
+            if pymupdf_client.is_available():
+                logger.info("🚀 Usando PyMuPDF Pro com PRIORIDADE MÁXIMA")
+                pdf_result = pymupdf_client.extract_from_url(url)
+                if pdf_result.get('success') and pdf_result.get('text'):
+                    content = pdf_result['text']
                     if self._validate_content(content, url):
-                        self.stats[extractor_name]['success'] += 1
-                        self.stats[extractor_name]['total_time'] += extractor_time
-                        self.stats['global']['total_successes'] += 1
-                        self._update_global_stats()
-
-                        # Salva extração bem-sucedida
-                        salvar_etapa("extracao_sucesso", {
+                        salvar_etapa("extracao_pymupdf_pro", {
                             "url": url,
-                            "extractor": extractor_name,
                             "content_length": len(content),
-                            "extraction_time": extractor_time
+                            "pages": pdf_result.get('metadata', {}).get('pages', 0),
+                            "extractor": "PyMuPDF_Pro_Priority"
                         }, categoria="pesquisa_web")
-
-                        logger.info(f"✅ Extração bem-sucedida com {extractor_name}: {len(content)} caracteres em {extractor_time:.2f}s")
-                        return content
-                    else:
-                        self.stats[extractor_name]['failed'] += 1
-                        logger.warning(f"⚠️ Conteúdo insuficiente com {extractor_name}: {len(content) if content else 0} caracteres")
-
-                except Exception as e:
-                    self.stats[extractor_name]['failed'] += 1
-                    logger.error(f"❌ Erro com {extractor_name}: {str(e)}")
-                    salvar_erro(f"extrator_{extractor_name}", e, contexto={"url": url})
-                    continue
-
-            # 6. Fallback final - extração agressiva
-            logger.warning(f"⚠️ Todos os extratores padrão falharam, tentando extração agressiva...")
-            content = self._aggressive_fallback_extraction(html_content, url)
-            if content and len(content) >= 100:  # Critério mais flexível para fallback
-                logger.info(f"✅ Extração agressiva bem-sucedida: {len(content)} caracteres")
-                # Salva fallback bem-sucedido
-                salvar_etapa("extracao_fallback", {
+                        self.stats['global']['total_successes'] += 1
+                        self._update_global_stats()
+                        logger.info(f"✅ PyMuPDF Pro SUCESSO: {len(content)} caracteres")
+                        return content, 'pdf_pymupdf_pro', {}
+
+            # Fallback para outros extratores de PDF
+            content = self._extract_pdf_content(url)
+            if content and self._validate_content(content, url):
+                # Salva extração de PDF bem-sucedida
+                salvar_etapa("extracao_pdf", {
                     "url": url,
                     "content_length": len(content),
-                    "extractor": "aggressive_fallback"
+                    "extractor": "pdf_specialized"
                 }, categoria="pesquisa_web")
                 self.stats['global']['total_successes'] += 1
                 self._update_global_stats()
-                return content
+                return content, 'pdf_specialized', {}
 
-            # Todos os extratores falharam
-            logger.error(f"❌ FALHA CRÍTICA: Todos os extratores falharam para {url}")
-            salvar_erro("extracao_total_falha", Exception(f"Todos extratores falharam: {url}"))
+        # 2. Baixa conteúdo HTML (ou usa o já obtido na revalidação do cache)
+        if prefetched:
+            html_content, validators = prefetched
+        else:
+            html_content, validators, _ = self._fetch_page(url)
+        if not html_content:
+            logger.error(f"❌ Falha ao baixar HTML para {url}")
+            salvar_erro("download_html", Exception(f"Falha no download: {url}"))
             self.stats['global']['total_failures'] += 1
             self._update_global_stats()
-            return None
+            return None, None, {}
+
+        content, extractor_name = self._extract_from_html(html_content, url)
+        return content, extractor_name, (validators if content else {})
+
+    def _extract_from_html(self, html_content: str, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Pipeline HTML: um único parse, pré-checagens baratas e orçamento de CPU por extrator"""
+
+        # Valida HTML mínimo
+        if len(html_content) < 500:
+            logger.warning(f"⚠️ HTML muito pequeno: {len(html_content)} caracteres")
+            # Continua tentando extrair, mas com expectativas baixas
+
+        logger.info(f"📥 HTML baixado: {len(html_content)} caracteres")
+        page = ParsedHTML(html_content, use_lxml=self.single_parse)
+
+        # 3. Verifica se é página dinâmica (JavaScript-heavy)
+        if self._is_dynamic_page(page):
+            logger.warning(f"⚠️ Página dinâmica detectada: {url}")
+            # Tenta extração mais agressiva
+            content = self._extract_dynamic_content(page, url)
+            if content and self._validate_content(content, url):
+                # Salva extração dinâmica bem-sucedida
+                salvar_etapa("extracao_dinamica", {
+                    "url": url,
+                    "content_length": len(content),
+                    "extractor": "dynamic_specialized"
+                }, categoria="pesquisa_web")
+                self.stats['global']['total_successes'] += 1
+                self._update_global_stats()
+                return content, 'dynamic_specialized'
+
+        # 4. Tenta extratores em ordem de prioridade (o último que funcionou neste domínio vem primeiro)
+        extractors = {
+            'trafilatura': self._extract_with_trafilatura,
+            'readability': self._extract_with_readability,
+            'newspaper': self._extract_with_newspaper,
+            'beautifulsoup': self._extract_with_beautifulsoup
+        }
+        extraction_order = extractor_history.order(url, self.HTML_EXTRACTORS)
+        if extraction_order != self.HTML_EXTRACTORS:
+            logger.info(f"🧭 Ordem aprendida para {registrable_domain(url)}: {', '.join(extraction_order)}")
+        over_budget = False
+
+        for extractor_name in extraction_order:
+            extractor_func = extractors[extractor_name]
+            if not self._is_extractor_available(extractor_name):
+                continue
 
-        except Exception as e:
-            logger.error(f"❌ Erro crítico na extração de {url}: {str(e)}")
-            salvar_erro("extracao_critica", e, contexto={"url": url})
-            self.stats['global']['total_failures'] += 1
+            skip_reason = self._precheck_extractor(extractor_name, page, url, over_budget)
+            if skip_reason:
+                self.stats[extractor_name]['skipped'] += 1
+                logger.info(f"⏭️ {extractor_name} ignorado: {skip_reason}")
+                continue
+
+            try:
+                logger.info(f"🔍 Tentando extração com {extractor_name}...")
+                extractor_start = time.time()
+                cpu_start = time.thread_time()
+                self.stats[extractor_name]['usage_count'] += 1
+
+                content = extractor_func(page, url)
+                extractor_time = time.time() - extractor_start
+                cpu_time = time.thread_time() - cpu_start
+                self.stats[extractor_name]['cpu_time'] += cpu_time
+
+                if cpu_time > self.extractor_cpu_budget:
+                    self.stats[extractor_name]['budget_exceeded'] += 1
+                    over_budget = True
+                    logger.warning(
+                        f"⏱️ {extractor_name} usou {cpu_time * 1000:.0f}ms de CPU "
+                        f"(orçamento {self.extractor_cpu_budget * 1000:.0f}ms) em {url}"
+                    )
+
+                if self._validate_content(content, url):
+                    self.stats[extractor_name]['success'] += 1
+                    self.stats[extractor_name]['total_time'] += extractor_time
+                    extractor_history.record(url, extractor_name, True, extractor_time)
+                    self.stats['global']['total_successes'] += 1
+                    self._update_global_stats()
+
+                    # Salva extração bem-sucedida
+                    salvar_etapa("extracao_sucesso", {
+                        "url": url,
+                        "extractor": extractor_name,
+                        "content_length": len(content),
+                        "extraction_time": extractor_time,
+                        "cpu_time": cpu_time
+                    }, categoria="pesquisa_web")
+
+                    logger.info(f"✅ Extração bem-sucedida com {extractor_name}: {len(content)} caracteres em {extractor_time:.2f}s")
+                    return content, extractor_name
+                else:
+                    self.stats[extractor_name]['failed'] += 1
+                    extractor_history.record(url, extractor_name, False, extractor_time)
+                    logger.warning(f"⚠️ Conteúdo insuficiente com {extractor_name}: {len(content) if content else 0} caracteres")
+
+            except Exception as e:
+                self.stats[extractor_name]['failed'] += 1
+                extractor_history.record(url, extractor_name, False, time.time() - extractor_start)
+                logger.error(f"❌ Erro com {extractor_name}: {str(e)}")
+                salvar_erro(f"extrator_{extractor_name}", e, contexto={"url": url})
+                continue
+
+        # 5. Fallback final - extração agressiva
+        logger.warning(f"⚠️ Todos os extratores padrão falharam, tentando extração agressiva...")
+        content = self._aggressive_fallback_extraction(page, url)
+        if content and len(content) >= 100:  # Critério mais flexível para fallback
+            logger.info(f"✅ Extração agressiva bem-sucedida: {len(content)} caracteres")
+            # Salva fallback bem-sucedido
+            salvar_etapa("extracao_fallback", {
+                "url": url,
+                "content_length": len(content),
+                "extractor": "aggressive_fallback"
+            }, categoria="pesquisa_web")
+            self.stats['global']['total_successes'] += 1
             self._update_global_stats()
-            return None
+            return content, 'aggressive_fallback'
+
+        # Todos os extratores falharam
+        logger.error(f"❌ FALHA CRÍTICA: Todos os extratores falharam para {url}")
+        salvar_erro("extracao_total_falha", Exception(f"Todos extratores falharam: {url}"))
+        self.stats['global']['total_failures'] += 1
+        self._update_global_stats()
+        return None, None
+
+    def _serve_cached(self, url: str, entry: Dict[str, Any], origin: str) -> str:
+        """Retorna conteúdo do cache contabilizando como extração bem-sucedida"""
+        self.stats['global']['total_successes'] += 1
+        self._update_global_stats()
+        logger.info(
+            f"💾 Conteúdo de {url} servido do cache ({origin}, extrator {entry.get('extractor')}): "
+            f"{len(entry['content'])} caracteres"
+        )
+        return entry['content']
+
+    def _quality_score(self, content: str) -> float:
+        """Pontuação 0-100: volume de texto e proporção de parágrafos substanciais"""
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        if not lines:
+            return 0.0
+        substantial = sum(1 for line in lines if len(line) >= 80)
+        length_score = min(len(content) / 5000, 1.0) * 60
+        structure_score = substantial / len(lines) * 40
+        return round(length_score + structure_score, 1)
+
+    def _precheck_extractor(self, extractor_name: str, page: ParsedHTML, url: str, over_budget: bool) -> Optional[str]:
+        """Motivo para pular um extrator que certamente falharia (ou None para executá-lo)"""
+        if page.tree is None:
+            return None  # Sem árvore compartilhada não há métricas baratas
+
+        # Nenhum extrator produz mais texto do que a página tem; _validate_content exige 500
+        min_length = 500 if not self._is_pdf_url(url) else 200
+        if page.visible_text_length < min_length:
+            return f"apenas {page.visible_text_length} caracteres de texto visível"
+
+        if extractor_name in ('readability', 'newspaper'):
+            if over_budget:
+                return "orçamento de CPU da página já estourado"
+            if page.paragraph_count < 2:
+                return f"{page.paragraph_count} parágrafos substanciais"
+
+        return None
 
     def _is_pdf_url(self, url: str) -> bool:
         """Verifica se a URL aponta para um PDF"""
@@ -290,14 +549,9 @@ class RobustContentExtractor:
         """Extrai conteúdo de PDF usando múltiplas estratégias"""
 
         try:
-            # Baixa o PDF
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-
-            # Salva temporariamente
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_path = temp_file.name
+            # Baixa o PDF em blocos direto para o disco (com limite de tamanho)
+            from services.pymupdf_client import pymupdf_client
+            temp_path, _ = pymupdf_client.download_pdf(url, session=self.session)
 
             try:
                 # Tenta PDFPlumber primeiro (melhor para PDFs complexos)
@@ -349,12 +603,16 @@ class RobustContentExtractor:
         try:
             import pdfplumber
 
+            from services.pymupdf_client import pymupdf_client
+
             text = ""
             with pdfplumber.open(pdf_path) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
                         text += page_text + "\n"
+                    if len(text) >= pymupdf_client.target_chars:
+                        break
 
             return self._clean_content(text) if text else None
 
@@ -367,6 +625,8 @@ class RobustContentExtractor:
         try:
             import PyPDF2
 
+            from services.pymupdf_client import pymupdf_client
+
             text = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -374,6 +634,8 @@ class RobustContentExtractor:
                     page_text = page.extract_text()
                     if page_text:
                         text += page_text + "\n"
+                    if len(text) >= pymupdf_client.target_chars:
+                        break
 
             return self._clean_content(text) if text else None
 
@@ -384,26 +646,18 @@ class RobustContentExtractor:
     def _extract_pdf_with_pymupdf(self, pdf_path: str) -> Optional[str]:
         """Extrai texto usando PyMuPDF"""
         try:
-            import fitz
+            from services.pymupdf_client import pymupdf_client
 
-            doc = fitz.open(pdf_path)
-            text = ""
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                if page_text:
-                    text += page_text + "\n"
-
-            doc.close()
+            text = pymupdf_client.extract_text_from_file(pdf_path)['text']
             return self._clean_content(text) if text else None
 
         except Exception as e:
             logger.error(f"Erro PyMuPDF: {e}")
             return None
 
-    def _is_dynamic_page(self, html: str) -> bool:
+    def _is_dynamic_page(self, page: ParsedHTML) -> bool:
         """Verifica se é página dinâmica (JavaScript-heavy)"""
+        html = page.html
         if not html:
             return False
 
@@ -415,75 +669,84 @@ class RobustContentExtractor:
             'javascript required', 'js-', 'ng-', 'v-'
         ]
 
-        html_lower = html.lower()
+        html_lower = page.lower
         js_indicators = sum(1 for indicator in dynamic_indicators if indicator in html_lower)
+        if js_indicators <= 3:
+            return False  # Dispensa o cálculo de texto na maioria das páginas
 
         # Se tem muitos indicadores JS e pouco conteúdo de texto
-        text_content = BeautifulSoup(html, 'html.parser').get_text() if HAS_BEAUTIFULSOUP else html
+        if page.full_text is not None:
+            text_content = page.full_text
+        else:
+            text_content = BeautifulSoup(html, 'html.parser').get_text() if HAS_BEAUTIFULSOUP else html
         text_ratio = len(text_content.strip()) / len(html) if html else 0
 
-        return js_indicators > 3 and text_ratio < 0.1
+        return text_ratio < 0.1
 
-    def _extract_dynamic_content(self, html: str, url: str) -> Optional[str]:
+    def _extract_dynamic_content(self, page: ParsedHTML, url: str) -> Optional[str]:
         """Extração especializada para conteúdo dinâmico"""
 
-        if not HAS_BEAUTIFULSOUP:
+        tree = page.clean_tree('script', 'style', 'noscript', 'iframe')
+        if tree is None and not HAS_BEAUTIFULSOUP:
             return None
 
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Remove scripts e elementos dinâmicos
-            for element in soup(['script', 'style', 'noscript', 'iframe']):
-                element.decompose()
-
-            # Busca por elementos com conteúdo pré-renderizado
-            content_selectors = [
-                '[data-content]', '[data-text]', '.content-loaded',
-                '.server-rendered', '.static-content', '.preloaded',
-                'main', 'article', '.post-content', '.article-content',
-                '.entry-content', '.page-content', '.text-content'
-            ]
-
             extracted_content = []
 
-            for selector in content_selectors:
-                try:
-                    elements = soup.select(selector)
-                    for element in elements:
-                        text = element.get_text(strip=True)
+            if tree is not None:
+                # Busca por elementos com conteúdo pré-renderizado
+                for selector in self.dynamic_selectors:
+                    for element in selector(tree):
+                        text = _node_text(element, strip=True)
                         if len(text) > 50:  # Conteúdo substancial
                             extracted_content.append(text)
-                except:
-                    continue
+                all_text = tree.text_content()
+            else:
+                soup = BeautifulSoup(page.html, 'html.parser')
+
+                # Remove scripts e elementos dinâmicos
+                for element in soup(['script', 'style', 'noscript', 'iframe']):
+                    element.decompose()
+
+                # Busca por elementos com conteúdo pré-renderizado
+                for selector in DYNAMIC_CONTENT_SELECTORS:
+                    try:
+                        elements = soup.select(selector)
+                        for element in elements:
+                            text = element.get_text(strip=True)
+                            if len(text) > 50:  # Conteúdo substancial
+                                extracted_content.append(text)
+                    except:
+                        continue
+                all_text = soup.get_text()
 
             if extracted_content:
                 combined = '\n\n'.join(extracted_content)
                 return self._clean_content(combined)
 
             # Fallback: extrai todo texto disponível
-            all_text = soup.get_text()
             return self._clean_content(all_text) if len(all_text) > 100 else None
 
         except Exception as e:
             logger.error(f"Erro na extração dinâmica: {e}")
             return None
 
-    def _aggressive_fallback_extraction(self, html: str, url: str) -> Optional[str]:
+    def _aggressive_fallback_extraction(self, page: ParsedHTML, url: str) -> Optional[str]:
         """Extração agressiva como último recurso"""
 
-        if not HAS_BEAUTIFULSOUP:
+        tree = page.clean_tree('script', 'style')
+        if tree is None and not HAS_BEAUTIFULSOUP:
             return None
 
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Remove apenas elementos críticos
-            for element in soup(['script', 'style']):
-                element.decompose()
-
-            # Coleta todo texto disponível
-            all_text = soup.get_text()
+            # Coleta todo texto disponível (sem scripts e estilos)
+            if tree is not None:
+                all_text = tree.text_content()
+            else:
+                soup = BeautifulSoup(page.html, 'html.parser')
+                for element in soup(['script', 'style']):
+                    element.decompose()
+                all_text = soup.get_text()
 
             # Filtra linhas com conteúdo significativo
             lines = all_text.split('\n')
@@ -508,7 +771,19 @@ class RobustContentExtractor:
 
     def _fetch_html(self, url: str) -> Optional[str]:
         """Baixa conteúdo HTML da URL com retry"""
+        return self._fetch_page(url)[0]
+
+    def _fetch_page(
+        self,
+        url: str,
+        conditional_headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[str], Dict[str, str], Optional[int]]:
+        """Baixa HTML com retry; retorna (html, validadores ETag/Last-Modified, status).
+
+        Sem html, status é o da última resposta HTTP (None em erro de rede); 404/410 não são repetidos.
+        """
         max_retries = 3
+        last_status = None
 
         for attempt in range(max_retries):
             try:
@@ -516,9 +791,22 @@ class RobustContentExtractor:
                     url,
                     timeout=self.timeout,
                     verify=False,  # Para evitar problemas de SSL
-                    allow_redirects=True
+                    allow_redirects=True,
+                    headers=conditional_headers
                 )
 
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                if response.status_code == 304:
+                    return None, validators, 304
+
+                last_status = response.status_code
+                if response.status_code in (404, 410):
+                    logger.warning(f"⚠️ {url} não existe mais ({response.status_code})")
+                    return None, {}, response.status_code
+
                 response.raise_for_status()
 
                 # Detecta encoding
@@ -530,40 +818,43 @@ class RobustContentExtractor:
                 if len(html) < 500:
                     logger.warning(f"⚠️ HTML muito pequeno (tentativa {attempt + 1}): {len(html)} caracteres")
                     if attempt < max_retries - 1:
-                        time.sleep(2)  # Aguarda antes de tentar novamente
+                        rate_limiter.penalize(url, 2)  # Aguarda antes de tentar novamente (só este host)
                         continue
 
-                return html
+                return html, validators, response.status_code
 
             except requests.exceptions.Timeout:
                 logger.warning(f"⏰ Timeout na tentativa {attempt + 1} para {url}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 + random.uniform(0, 2))  # Delay aleatório
+                    rate_limiter.penalize(url, 2 + random.uniform(0, 2))  # Delay aleatório só para este host
                     continue
             except Exception as e:
                 logger.error(f"❌ Erro ao baixar {url} (tentativa {attempt + 1}): {str(e)}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 + random.uniform(0, 2))  # Delay aleatório
+                    rate_limiter.penalize(url, 2 + random.uniform(0, 2))  # Delay aleatório só para este host
                     continue
 
-        return None
+        return None, {}, last_status
 
-    def _extract_with_trafilatura(self, html: str, url: str) -> Optional[str]:
+    def _extract_with_trafilatura(self, page: ParsedHTML, url: str) -> Optional[str]:
         """Extrai com Trafilatura (prioridade 1) com configurações aprimoradas"""
         if not HAS_TRAFILATURA:
             return None
 
         try:
+            # Trafilatura aceita a árvore já interpretada (cópia, pois ela é podada)
+            document = page.copy_tree()
+
             # Configurações mais agressivas para trafilatura
             content = trafilatura.extract(
-                html,
+                document if document is not None else page.html,
                 include_comments=False,
                 include_tables=True,
                 include_formatting=False,
                 favor_precision=False,  # Mudado para False para ser mais inclusivo
                 favor_recall=True,      # Prioriza recuperar mais conteúdo
                 url=url,
-                config=trafilatura.settings.use_config()
+                config=self.trafilatura_config
             )
 
             if content:
@@ -576,19 +867,27 @@ class RobustContentExtractor:
             logger.error(f"Erro Trafilatura: {e}")
             return None
 
-    def _extract_with_readability(self, html: str, url: str) -> Optional[str]:
+    def _extract_with_readability(self, page: ParsedHTML, url: str) -> Optional[str]:
         """Extrai com Readability (prioridade 2) com configurações aprimoradas"""
         if not HAS_READABILITY:
             return None
 
         try:
+            # Readability também aceita a árvore lxml (cópia, pois ela é limpa no lugar)
+            document = page.copy_tree()
+
             # Configurações mais inclusivas
-            doc = Document(html, positive_keywords=['content', 'article', 'post', 'text', 'main'])
+            doc = Document(
+                document if document is not None else page.html,
+                positive_keywords=['content', 'article', 'post', 'text', 'main']
+            )
             content = doc.summary()
 
             if content:
                 # Remove tags HTML
-                if HAS_BEAUTIFULSOUP:
+                if HAS_LXML:
+                    content = lxml.html.fromstring(content).text_content()
+                elif HAS_BEAUTIFULSOUP:
                     soup = BeautifulSoup(content, 'html.parser')
                     content = soup.get_text()
                 else:
@@ -604,14 +903,15 @@ class RobustContentExtractor:
             logger.error(f"Erro Readability: {e}")
             return None
 
-    def _extract_with_newspaper(self, html: str, url: str) -> Optional[str]:
+    def _extract_with_newspaper(self, page: ParsedHTML, url: str) -> Optional[str]:
         """Extrai com Newspaper3k (prioridade 3) com configurações aprimoradas"""
         if not HAS_NEWSPAPER:
             return None
 
         try:
+            # Newspaper só aceita o HTML em texto
             article = Article(url)
-            article.set_html(html)
+            article.set_html(page.html)
             article.parse()
 
             content = article.text
@@ -625,28 +925,32 @@ class RobustContentExtractor:
             logger.error(f"Erro Newspaper: {e}")
             return None
 
-    def _extract_with_beautifulsoup(self, html: str, url: str) -> Optional[str]:
-        """Extrai com BeautifulSoup (fallback final) com estratégia aprimorada"""
-        if not HAS_BEAUTIFULSOUP:
+    def _extract_with_beautifulsoup(self, page: ParsedHTML, url: str) -> Optional[str]:
+        """Extrai com BeautifulSoup (fallback final) com estratégia aprimorada; usa a árvore lxml quando disponível"""
+        tree = page.clean_tree('script', 'style', 'nav', 'header', 'footer', 'aside', 'form')
+        if tree is None and not HAS_BEAUTIFULSOUP:
             return None
 
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            if tree is not None:
+                document = tree
+            else:
+                document = BeautifulSoup(page.html, 'html.parser')
 
-            # Remove scripts e styles
-            for script in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']):
-                script.decompose()
+                # Remove scripts e styles
+                for script in document(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']):
+                    script.decompose()
 
             # Estratégia em camadas para encontrar conteúdo
             content_strategies = [
                 # Estratégia 1: Elementos semânticos
-                lambda: self._extract_semantic_content(soup),
+                lambda: self._extract_semantic_content(document),
                 # Estratégia 2: Elementos por classe/ID
-                lambda: self._extract_by_selectors(soup),
+                lambda: self._extract_by_selectors(document),
                 # Estratégia 3: Maior bloco de texto
-                lambda: self._extract_largest_text_block(soup),
+                lambda: self._extract_largest_text_block(document),
                 # Estratégia 4: Todo o body
-                lambda: self._extract_full_body(soup)
+                lambda: self._extract_full_body(document)
             ]
 
             for strategy in content_strategies:
@@ -663,14 +967,22 @@ class RobustContentExtractor:
             logger.error(f"Erro BeautifulSoup: {e}")
             return None
 
+    def _is_lxml_document(self, document) -> bool:
+        return HAS_LXML and isinstance(document, lxml.html.HtmlElement)
+
     def _extract_semantic_content(self, soup) -> Optional[str]:
         """Extrai usando elementos semânticos HTML5"""
-        semantic_elements = soup.find_all(['article', 'main', 'section'])
+        if self._is_lxml_document(soup):
+            semantic_elements = list(soup.iter('article', 'main', 'section'))
+            get_text = _node_text
+        else:
+            semantic_elements = soup.find_all(['article', 'main', 'section'])
+            get_text = lambda element: element.get_text()
 
         if semantic_elements:
             content_parts = []
             for element in semantic_elements:
-                text = element.get_text()
+                text = get_text(element)
                 if len(text) > 50:
                     content_parts.append(text)
 
@@ -681,20 +993,20 @@ class RobustContentExtractor:
 
     def _extract_by_selectors(self, soup) -> Optional[str]:
         """Extrai usando seletores CSS comuns"""
-        content_selectors = [
-            '.content', '#content', '.post', '.article',
-            '.entry', '.text', '.body', '.main-content',
-            '.post-content', '.article-content', '.entry-content',
-            '.page-content', '.text-content', '.story-content'
-        ]
+        if self._is_lxml_document(soup):
+            finders = [lambda selector=selector: selector(soup) for selector in self.content_selectors]
+            get_text = _node_text
+        else:
+            finders = [lambda selector=selector: soup.select(selector) for selector in CONTENT_SELECTORS]
+            get_text = lambda element: element.get_text()
 
-        for selector in content_selectors:
+        for find in finders:
             try:
-                elements = soup.select(selector)
+                elements = find()
                 if elements:
                     content_parts = []
                     for element in elements:
-                        text = element.get_text()
+                        text = get_text(element)
                         if len(text) > 50:
                             content_parts.append(text)
 
@@ -707,13 +1019,18 @@ class RobustContentExtractor:
 
     def _extract_largest_text_block(self, soup) -> Optional[str]:
         """Encontra e extrai o maior bloco de texto"""
-        all_divs = soup.find_all(['div', 'section', 'article'])
+        if self._is_lxml_document(soup):
+            all_divs = soup.iter('div', 'section', 'article')
+            get_text = _node_text
+        else:
+            all_divs = soup.find_all(['div', 'section', 'article'])
+            get_text = lambda element: element.get_text()
 
         largest_text = ""
         largest_size = 0
 
         for div in all_divs:
-            text = div.get_text()
+            text = get_text(div)
             if len(text) > largest_size:
                 largest_size = len(text)
                 largest_text = text
@@ -722,6 +1039,10 @@ class RobustContentExtractor:
 
     def _extract_full_body(self, soup) -> Optional[str]:
         """Extrai todo o conteúdo do body como último recurso"""
+        if self._is_lxml_document(soup):
+            body = soup.find('body')
+            return _node_text(body if body is not None else soup)
+
         body = soup.find('body')
         if body:
             return body.get_text()
@@ -868,7 +1189,15 @@ class RobustContentExtractor:
     def get_extractor_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas dos extratores"""
         self._update_global_stats()
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['content_cache'] = content_cache.get_stats()
+        stats['url_resolver'] = url_resolver.get_stats()
+        stats['domain_history'] = extractor_history.get_stats(self.HTML_EXTRACTORS)
+        return stats
+
+    def get_domain_history(self, url_or_domain: str) -> Dict[str, Any]:
+        """Histórico de extratores e ordem atual para um domínio"""
+        return extractor_history.get_domain_stats(url_or_domain, self.HTML_EXTRACTORS)
 
     def reset_extractor_stats(self, extractor_name: Optional[str] = None):
         """Reset estatísticas dos extratores"""
@@ -876,7 +1205,8 @@ class RobustContentExtractor:
             if extractor_name != 'global':
                 self.stats[extractor_name].update({
                     'success': 0, 'failed': 0, 'total_time': 0, 'usage_count': 0,
-                    'success_rate': 0, 'avg_response_time': 0
+                    'success_rate': 0, 'avg_response_time': 0,
+                    'cpu_time': 0.0, 'skipped': 0, 'budget_exceeded': 0
                 })
             logger.info(f"🔄 Reset estatísticas do extrator: {extractor_name}")
         else:
@@ -885,7 +1215,8 @@ class RobustContentExtractor:
                 if extractor != 'global':
                     self.stats[extractor].update({
                         'success': 0, 'failed': 0, 'total_time': 0, 'usage_count': 0,
-                        'success_rate': 0, 'avg_response_time': 0
+                        'success_rate': 0, 'avg_response_time': 0,
+                        'cpu_time': 0.0, 'skipped': 0, 'budget_exceeded': 0
                     })
 
             self.stats['global'] = {
@@ -899,9 +1230,10 @@ class RobustContentExtractor:
     def batch_extract(self, urls: List[str], max_workers: int = 5) -> Dict[str, Optional[str]]:
         """Extrai conteúdo de múltiplas URLs em paralelo"""
         results = {}
+        resolved_urls = url_resolver.resolve_many(urls)
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(self.extract_content, url): url for url in urls}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_url = {executor.submit(self.extract_content, resolved_urls.get(url, url)): url for url in urls}
 
             for future in as_completed(future_to_url):
                 url = future_to_url[future]
@@ -954,12 +1286,14 @@ class RobustContentExtractor:
         return result
 
     def clear_cache(self):
-        """Limpa cache de sessão"""
+        """Limpa cache de sessão e o cache persistente de conteúdo"""
         self.session.close()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        rate_limiter.mount(self.session)
+        content_cache.clear()
         logger.info("🧹 Cache de extração limpo")
 
 # Instância global
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Search Cache
+Cache persistente de resultados de busca compartilhado por todos os gerenciadores de busca
+"""
+
+import os
+import time
+import logging
+import functools
+from typing import Dict, Any, Optional, Callable, Tuple
+from services.response_cache import create_response_cache
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class SearchCache:
+    """Cache de buscas por (provedor, variante, query normalizada, max_results) com TTL por provedor"""
+
+    def __init__(self):
+        """Inicializa o cache de busca (SQLite por padrão, Redis com SEARCH_CACHE_BACKEND=redis)"""
+        self.cache = create_response_cache('search', default_ttl=86400, default_max_entries=20000)
+        self.single_flight = SingleFlight('Search Cache', wait_timeout=120)
+        self.provider_ttls = {}
+
+    def ttl_for(self, provider: str) -> float:
+        """TTL do provedor: SEARCH_CACHE_TTL_<PROVEDOR> ou o TTL padrão do cache"""
+        if provider not in self.provider_ttls:
+            env_value = os.getenv(f'SEARCH_CACHE_TTL_{provider.upper()}')
+            self.provider_ttls[provider] = float(env_value) if env_value else self.cache.default_ttl
+        return self.provider_ttls[provider]
+
+    def normalize_query(self, query: str) -> str:
+        """Caixa e espaços não geram chaves diferentes"""
+        return self.cache.normalize_text(query).lower()
+
+    def make_key(self, provider: str, query: str, max_results: Any = None, variant: str = '', params: Tuple = ()) -> str:
+        return self.cache.make_key('search', provider, variant, self.normalize_query(query), max_results, params)
+
+    def get(self, provider: str, query: str, max_results: Any = None, variant: str = '', params: Tuple = ()) -> Optional[Any]:
+        return self.cache.get(self.make_key(provider, query, max_results, variant, params), group=provider)
+
+    def set(self, provider: str, query: str, max_results: Any, results: Any, variant: str = '',
+            params: Tuple = (), latency: float = 0.0):
+        self.cache.set(
+            self.make_key(provider, query, max_results, variant, params),
+            results,
+            group=provider,
+            ttl=self.ttl_for(provider),
+            latency=latency
+        )
+
+    def cached(
+        self,
+        provider: str,
+        query: str,
+        max_results: Any,
+        func: Callable[[], Any],
+        variant: str = '',
+        params: Tuple = (),
+        is_cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Retorna do cache ou executa func (uma vez para chamadas concorrentes idênticas) e armazena"""
+        if not self.cache.enabled:
+            return func()
+
+        cached_results = self.get(provider, query, max_results, variant, params)
+        if cached_results is not None:
+            logger.info(f"🔄 Busca {provider} servida do cache: {query}")
+            return cached_results
+
+        def fetch():
+            started = time.time()
+            results = func()
+            if (is_cacheable or _has_results)(results):
+                self.set(provider, query, max_results, results, variant, params, latency=time.time() - started)
+            return results
+
+        return self.single_flight.do(self.make_key(provider, query, max_results, variant, params), fetch)
+
+    def clear(self):
+        """Remove todas as buscas em cache"""
+        self.cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hits/misses por provedor, ocupação e deduplicação"""
+        stats = self.cache.get_stats()
+        stats['single_flight'] = self.single_flight.get_stats()
+        stats['provider_ttls'] = dict(self.provider_ttls)
+        return stats
+
+def _has_results(results: Any) -> bool:
+    """Só armazena buscas com resultados (falhas e vazios são tentados novamente)"""
+    if isinstance(results, dict):
+        return bool(results.get('success', True) and results.get('results'))
+    return bool(results)
+
+def cached_search(provider: str, variant: str = ''):
+    """Decorator para métodos de busca (self, query, ...): argumentos escalares entram na chave"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, query, *args, **kwargs):
+            # Dicionários de contexto não alteram a busca e ficam fora da chave
+            scalar_args = tuple(a for a in args if isinstance(a, (str, int, float, bool, type(None))))
+            scalar_kwargs = tuple(sorted(
+                (k, v) for k, v in kwargs.items() if isinstance(v, (str, int, float, bool, type(None)))
+            ))
+            max_results = scalar_args[0] if scalar_args else kwargs.get('max_results')
+            return search_cache.cached(
+                provider,
+                query,
+                max_results,
+                lambda: func(self, query, *args, **kwargs),
+                variant=variant or type(self).__name__,
+                params=(scalar_args[1:], scalar_kwargs)
+            )
+        return wrapper
+    return decorator
+
+# Instância global
+search_cache = SearchCache()
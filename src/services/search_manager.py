@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any
 from urllib.parse import quote_plus
 from bs4 import BeautifulSoup
 import json
+from services.search_cache import cached_search
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +132,7 @@ class SearchManager:
         
         return []
     
+    @cached_search('google')
     def _search_google(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Google Custom Search API"""
         try:
@@ -145,6 +148,7 @@ class SearchManager:
                 'dateRestrict': 'm6'
             }
             
+            rate_limiter.wait(url)
             response = requests.get(url, params=params, headers=self.headers, timeout=15)
             
             if response.status_code == 200:
@@ -170,6 +174,7 @@ class SearchManager:
                 self.providers['google']['rate_limit_reset'] = time.time() + 3600
             raise e
     
+    @cached_search('serper')
     def _search_serper(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Serper API"""
         try:
@@ -187,6 +192,7 @@ class SearchManager:
                 'num': max_results
             }
             
+            rate_limiter.wait(url)
             response = requests.post(url, json=payload, headers=headers, timeout=15)
             
             if response.status_code == 200:
@@ -212,11 +218,13 @@ class SearchManager:
                 self.providers['serper']['rate_limit_reset'] = time.time() + 3600
             raise e
     
+    @cached_search('bing')
     def _search_bing(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando Bing (scraping)"""
         try:
             search_url = f"https://www.bing.com/search?q={quote_plus(query)}&cc=br&setlang=pt-br&count={max_results}"
             
+            rate_limiter.wait(search_url)
             response = requests.get(search_url, headers=self.headers, timeout=15)
             
             if response.status_code == 200:
@@ -252,11 +260,13 @@ class SearchManager:
         except Exception as e:
             raise e
     
+    @cached_search('duckduckgo')
     def _search_duckduckgo(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando DuckDuckGo (scraping)"""
         try:
             search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
             
+            rate_limiter.wait(search_url)
             response = requests.get(search_url, headers=self.headers, timeout=15)
             
             if response.status_code == 200:
@@ -353,7 +363,6 @@ class SearchManager:
                     continue
                 
                 all_results.extend(results)
-                time.sleep(1)  # Rate limiting
                 
             except Exception as e:
                 logger.warning(f"⚠️ Erro em {provider_name}: {str(e)}")
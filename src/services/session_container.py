@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Session Container
+Contêiner append-only por sessão para as etapas do auto save (registros com tamanho prefixado e comprimidos)
+
+Formato de cada registro:
+    b'AR' | codec (1 byte) | tamanho do cabeçalho (4 bytes) | tamanho do conteúdo (4 bytes) | cabeçalho JSON | conteúdo
+O cabeçalho (etapa, categoria, status, timestamp...) fica sem compressão para o índice ler só os cabeçalhos;
+o conteúdo comprimido é o TXT renderizado seguido do JSON da etapa (quando houver).
+Registros com 'record_id' no cabeçalho são gravados uma única vez (replay do journal após queda é idempotente).
+
+Uso (a partir de src/):
+    python -m services.session_container relatorios_intermediarios/sessoes/<session_id>.arqv --list
+    python -m services.session_container relatorios_intermediarios/sessoes/<session_id>.arqv --render saida/
+"""
+
+import os
+import json
+import zlib
+import struct
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from services.file_lock import lock_file, unlock_file
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+RECORD_MARK = b'AR'
+RECORD_HEADER = struct.Struct('>2sBII')
+CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD = 0, 1, 2
+CONTAINER_SUFFIX = '.arqv'
+
+def _compress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 6)
+    return data
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not HAS_ZSTD:
+            raise RuntimeError("Registro comprimido com zstd, mas o pacote zstandard não está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+class SessionContainer:
+    """Um arquivo por sessão; o índice (cabeçalhos + posição) é mantido em memória e lido incrementalmente"""
+
+    def __init__(self, path: Path, codec: Optional[int] = None):
+        self.path = Path(path)
+        if codec is None:
+            preferred = os.getenv('AUTOSAVE_CONTAINER_CODEC', 'zstd').lower()
+            codec = CODEC_ZSTD if preferred == 'zstd' and HAS_ZSTD else CODEC_ZLIB
+        self.codec = codec
+        self.lock = threading.Lock()
+        self.index: List[Dict[str, Any]] = []
+        self.by_offset: Dict[int, Dict[str, Any]] = {}
+        self.record_ids = set()
+        self.indexed_size = 0
+
+    @property
+    def session_id(self) -> str:
+        return self.path.name[:-len(CONTAINER_SUFFIX)] if self.path.name.endswith(CONTAINER_SUFFIX) else self.path.stem
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def append(self, meta: Dict[str, Any], txt: str, json_text: Optional[str] = None) -> bool:
+        """Acrescenta um registro com uma única escrita (O_APPEND); False se o record_id já está no contêiner"""
+        txt_bytes = txt.encode('utf-8')
+        meta = dict(meta, txt_len=len(txt_bytes), json=json_text is not None)
+        meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        payload = _compress(txt_bytes + (json_text or '').encode('utf-8'), self.codec)
+        record = RECORD_HEADER.pack(RECORD_MARK, self.codec, len(meta_bytes), len(payload)) + meta_bytes + payload
+
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(self.path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                # Trava exclusiva entre instâncias e processos: com todo escritor gravando sob ela,
+                # uma cauda incompleta vista aqui só pode ser de uma queda e pode ser cortada
+                lock_file(fd)
+                try:
+                    self._refresh_index(repair=True)
+                    if meta.get('record_id') is not None and meta['record_id'] in self.record_ids:
+                        return False
+                    os.write(fd, record)
+                finally:
+                    unlock_file(fd)
+            finally:
+                os.close(fd)
+        return True
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Cabeçalhos de todos os registros, em ordem de gravação (com 'offset')"""
+        with self.lock:
+            self._refresh_index()
+            return list(self.index)
+
+    def _refresh_index(self, repair: bool = False):
+        """Lê os cabeçalhos acrescentados desde a última leitura; cauda truncada (queda) é ignorada ou,
+        com repair (apenas sob a trava de escrita do append), cortada"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if size < self.indexed_size:  # Arquivo substituído
+            self._reset_index()
+        if size == self.indexed_size:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            while offset + RECORD_HEADER.size <= size:
+                mark, codec, meta_len, payload_len = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                end = offset + RECORD_HEADER.size + meta_len + payload_len
+                if mark != RECORD_MARK or end > size:
+                    break
+                try:
+                    meta = json.loads(f.read(meta_len).decode('utf-8'))
+                except ValueError:
+                    break
+                meta.update(offset=offset, codec=codec, meta_len=meta_len, payload_len=payload_len)
+                self.index.append(meta)
+                self.by_offset[offset] = meta
+                if meta.get('record_id') is not None:
+                    self.record_ids.add(meta['record_id'])
+                f.seek(payload_len, os.SEEK_CUR)
+                offset = end
+            self.indexed_size = offset
+
+        if offset < size:
+            logger.warning(f"⚠️ Contêiner {self.path.name}: {size - offset} bytes finais incompletos")
+            if repair:
+                os.truncate(str(self.path), offset)
+
+    def _reset_index(self):
+        self.index, self.by_offset, self.record_ids, self.indexed_size = [], {}, set(), 0
+
+    def read(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Conteúdo de um registro do índice: txt e, se houver, os dados JSON da etapa"""
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'] + RECORD_HEADER.size + entry['meta_len'])
+            data = _decompress(f.read(entry['payload_len']), entry['codec'])
+
+        result = {key: value for key, value in entry.items() if key not in ('codec', 'meta_len', 'payload_len')}
+        result['txt'] = data[:entry['txt_len']].decode('utf-8')
+        result['dados'] = json.loads(data[entry['txt_len']:].decode('utf-8')) if entry.get('json') else None
+        return result
+
+    def read_at(self, offset: int) -> Optional[Dict[str, Any]]:
+        """Conteúdo do registro que começa em offset"""
+        with self.lock:
+            self._refresh_index()
+            entry = self.by_offset.get(offset)
+        return self.read(entry) if entry is not None else None
+
+    def find(self, etapa: Optional[str] = None, categoria: Optional[str] = None,
+             prefixo: Optional[str] = None, com_json: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Filtra o índice por etapa exata, prefixo da etapa, categoria e presença de JSON"""
+        return [
+            entry for entry in self.records()
+            if (etapa is None or entry['etapa'] == etapa)
+            and (prefixo is None or entry['etapa'].startswith(prefixo))
+            and (categoria is None or entry['categoria'] == categoria)
+            and (com_json is None or entry.get('json') == com_json)
+        ]
+
+    def render(self, out_dir: Path, **filters) -> List[str]:
+        """Gera as visões legíveis (.txt, e .json indentado quando houver) no layout antigo categoria/sessão/"""
+        written = []
+        for entry in self.find(**filters):
+            record = self.read(entry)
+            # 'pasta' é o subdiretório da categoria no layout antigo ('' para categorias sem pasta própria)
+            target_dir = Path(out_dir) / record.get('pasta', record['categoria']) / self.session_id
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+            txt_path = target_dir / f"{record['nome']}.txt"
+            txt_path.write_text(record['txt'], encoding='utf-8')
+            written.append(str(txt_path))
+
+            if record['dados'] is not None:
+                json_path = target_dir / f"{record['nome']}.json"
+                json_path.write_text(json.dumps(record['dados'], ensure_ascii=False, indent=2), encoding='utf-8')
+                written.append(str(json_path))
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        records = self.records()
+        return {
+            'session_id': self.session_id,
+            'path': str(self.path),
+            'records': len(records),
+            'size_bytes': self.indexed_size,
+            'with_json': sum(1 for entry in records if entry.get('json')),
+            'categories': sorted({entry['categoria'] for entry in records})
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Leitor de contêineres de sessão do auto save')
+    parser.add_argument('container', help='Arquivo .arqv da sessão')
+    parser.add_argument('--list', action='store_true', help='Lista os registros')
+    parser.add_argument('--render', metavar='DIR', help='Gera os arquivos .txt/.json legíveis em DIR')
+    parser.add_argument('--etapa', help='Apenas registros desta etapa')
+    parser.add_argument('--categoria', help='Apenas registros desta categoria')
+    args = parser.parse_args()
+
+    container = SessionContainer(Path(args.container))
+    if not container.exists():
+        parser.error(f"Contêiner não encontrado: {args.container}")
+
+    filters = {'etapa': args.etapa, 'categoria': args.categoria}
+    if args.render:
+        written = container.render(Path(args.render), **filters)
+        print(f"📝 {len(written)} arquivos gerados em {args.render}")
+    if args.list or not args.render:
+        for entry in container.find(**filters):
+            print(f"{entry['offset']:>10}  {entry['categoria']:<18} {entry['status']:<10} {entry['nome']}" + ("  [json]" if entry.get('json') else ""))
+        print(json.dumps(container.get_stats(), ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
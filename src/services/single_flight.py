@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Single Flight
+Deduplicação de chamadas idênticas em andamento
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class _InFlightCall:
+    """Chamada em andamento compartilhada entre líder e seguidores"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Garante que chamadas concorrentes com a mesma chave executem uma única vez"""
+
+    def __init__(self, name: str, wait_timeout: Optional[float] = None):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.stats = {'executed': 0, 'coalesced': 0, 'wait_timeouts': 0}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """Executa func para a chave; chamadores concorrentes recebem o mesmo resultado"""
+
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self.calls[key] = call
+                self.stats['executed'] += 1
+                leader = True
+
+        if not leader:
+            logger.info(f"🔗 {self.name}: chamada idêntica em andamento, aguardando resultado compartilhado")
+            if not call.done.wait(self.wait_timeout):
+                with self.lock:
+                    self.stats['wait_timeouts'] += 1
+                logger.warning(f"⚠️ {self.name}: tempo de espera esgotado, executando chamada própria")
+                return func()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de execução e coalescência"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.calls)
+        total = stats['executed'] + stats['coalesced']
+        stats['coalesced_rate'] = round(stats['coalesced'] / total * 100, 2) if total else 0.0
+        return stats
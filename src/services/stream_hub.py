@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Stream Hub
+Canais de eventos por sessão (progresso e, em canal separado, tokens de IA) para Server-Sent Events
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List, Tuple, Callable
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+class _Channel:
+    """Buffer circular de eventos de uma sessão"""
+
+    def __init__(self, maxlen: int):
+        self.events = deque(maxlen=maxlen)
+        self.next_id = 1
+        self.closed = False
+        self.last_activity = time.time()
+
+class MemoryStreamBackend:
+    """Backend em memória (apenas o processo atual)"""
+
+    def __init__(self, buffer_size: int, channel_ttl: int):
+        self.buffer_size = buffer_size
+        self.channel_ttl = channel_ttl
+        self.channels = {}
+        self.condition = threading.Condition()
+
+    def append(self, channel: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self.condition:
+            ch = self._get_channel(channel)
+            event = {'id': ch.next_id, 'event': event_type, 'data': data, 'timestamp': time.time()}
+            ch.next_id += 1
+            ch.events.append(event)
+            ch.closed = False
+            ch.last_activity = time.time()
+            self.condition.notify_all()
+        return event
+
+    def close(self, channel: str):
+        with self.condition:
+            if channel in self.channels:
+                self.channels[channel].closed = True
+                self.channels[channel].last_activity = time.time()
+            self.condition.notify_all()
+
+    def read(self, channel: str, after_id: int) -> Tuple[List[Dict[str, Any]], bool]:
+        with self.condition:
+            ch = self.channels.get(channel)
+            if not ch:
+                return [], False
+            return [e for e in ch.events if e['id'] > after_id], ch.closed
+
+    def wait(self, channel: str, after_id: int, timeout: float, listener=None):
+        def ready():
+            ch = self.channels.get(channel)
+            return ch is not None and (ch.next_id - 1 > after_id or ch.closed)
+
+        with self.condition:
+            self.condition.wait_for(ready, timeout=timeout)
+
+    def exists(self, channel: str) -> bool:
+        with self.condition:
+            return channel in self.channels
+
+    def listen(self, channel: str):
+        return None
+
+    def unlisten(self, listener):
+        pass
+
+    def _get_channel(self, channel: str) -> _Channel:
+        """Obtém ou cria canal (chamar com lock) e remove canais expirados"""
+        ch = self.channels.get(channel)
+        if ch is None:
+            self._cleanup_expired()
+            ch = _Channel(self.buffer_size)
+            self.channels[channel] = ch
+        return ch
+
+    def _cleanup_expired(self):
+        """Remove canais sem atividade recente, encerrados ou abandonados abertos (chamar com lock)"""
+        cutoff = time.time() - self.channel_ttl
+        expired = [name for name, ch in self.channels.items() if ch.last_activity < cutoff]
+        for name in expired:
+            del self.channels[name]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.condition:
+            return {
+                'backend': 'memory',
+                'channels': len(self.channels),
+                'open_channels': sum(1 for ch in self.channels.values() if not ch.closed),
+                'buffered_events': sum(len(ch.events) for ch in self.channels.values())
+            }
+
+class RedisStreamBackend:
+    """Backend Redis: buffer em sorted set por canal e notificação via pub/sub (multi-processo)"""
+
+    # Atribui id, grava evento, apara o buffer e notifica assinantes atomicamente
+    APPEND_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], id, id .. '|' .. ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+redis.call('DEL', KEYS[3])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('PUBLISH', KEYS[4], id)
+return id
+"""
+
+    def __init__(self, url: str, buffer_size: int, channel_ttl: int, namespace: str = 'stream'):
+        self.client = redis.Redis.from_url(url, socket_timeout=5)
+        self.client.ping()
+        self.buffer_size = buffer_size
+        self.channel_ttl = channel_ttl
+        self.namespace = namespace
+        self.append_script = self.client.register_script(self.APPEND_SCRIPT)
+
+    def _keys(self, channel: str) -> Tuple[str, str, str, str]:
+        base = f"{self.namespace}:{channel}"
+        return f"{base}:seq", f"{base}:events", f"{base}:closed", f"{base}:notify"
+
+    def append(self, channel: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = time.time()
+        payload = json.dumps({'event': event_type, 'data': data, 'timestamp': timestamp}, ensure_ascii=False, default=str)
+        event_id = int(self.append_script(keys=list(self._keys(channel)), args=[payload, self.buffer_size, self.channel_ttl]))
+        return {'id': event_id, 'event': event_type, 'data': data, 'timestamp': timestamp}
+
+    def close(self, channel: str):
+        _, _, closed_key, notify_key = self._keys(channel)
+        pipe = self.client.pipeline()
+        pipe.set(closed_key, 1, ex=self.channel_ttl)
+        pipe.publish(notify_key, 'closed')
+        pipe.execute()
+
+    def read(self, channel: str, after_id: int) -> Tuple[List[Dict[str, Any]], bool]:
+        _, events_key, closed_key, _ = self._keys(channel)
+        pipe = self.client.pipeline()
+        pipe.zrangebyscore(events_key, f"({after_id}", '+inf')
+        pipe.exists(closed_key)
+        raw_events, closed = pipe.execute()
+
+        events = []
+        for raw in raw_events:
+            raw = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            event_id, _, payload = raw.partition('|')
+            event = json.loads(payload)
+            event['id'] = int(event_id)
+            events.append(event)
+        return events, bool(closed)
+
+    def exists(self, channel: str) -> bool:
+        seq_key, _, closed_key, _ = self._keys(channel)
+        return bool(self.client.exists(seq_key, closed_key))
+
+    def listen(self, channel: str):
+        """Assina a notificação antes da primeira leitura para não perder eventos"""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._keys(channel)[3])
+        return pubsub
+
+    def wait(self, channel: str, after_id: int, timeout: float, listener=None):
+        if listener is None:
+            time.sleep(min(timeout, 1.0))
+            return
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if listener.get_message(timeout=max(0.0, deadline - time.time())):
+                return
+
+    def unlisten(self, listener):
+        if listener is not None:
+            try:
+                listener.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'namespace': self.namespace}
+
+class SQLiteStreamBackend:
+    """Backend SQLite compartilhado entre workers do mesmo host"""
+
+    def __init__(self, path: Path, buffer_size: int, channel_ttl: int, poll_interval: float = 0.25):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = buffer_size
+        self.channel_ttl = channel_ttl
+        self.poll_interval = poll_interval
+        self.local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                channel TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                PRIMARY KEY (channel, id)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS channels (
+                channel TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                closed INTEGER NOT NULL DEFAULT 0,
+                last_activity REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            self.local.conn = conn
+        return conn
+
+    def append(self, channel: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = time.time()
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO channels (channel, last_id, closed, last_activity) VALUES (?, 1, 0, ?) "
+                "ON CONFLICT(channel) DO UPDATE SET last_id = last_id + 1, closed = 0, last_activity = excluded.last_activity",
+                (channel, timestamp)
+            )
+            event_id = conn.execute("SELECT last_id FROM channels WHERE channel = ?", (channel,)).fetchone()[0]
+            conn.execute(
+                "INSERT INTO events (channel, id, event, data, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (channel, event_id, event_type, payload, timestamp)
+            )
+            conn.execute("DELETE FROM events WHERE channel = ? AND id <= ?", (channel, event_id - self.buffer_size))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if event_id == 1:
+            self._cleanup_expired()
+        return {'id': event_id, 'event': event_type, 'data': data, 'timestamp': timestamp}
+
+    def close(self, channel: str):
+        self._conn().execute(
+            "UPDATE channels SET closed = 1, last_activity = ? WHERE channel = ?", (time.time(), channel)
+        )
+
+    def read(self, channel: str, after_id: int) -> Tuple[List[Dict[str, Any]], bool]:
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT id, event, data, timestamp FROM events WHERE channel = ? AND id > ? ORDER BY id",
+            (channel, after_id)
+        ).fetchall()
+        row = conn.execute("SELECT closed FROM channels WHERE channel = ?", (channel,)).fetchone()
+        events = [{'id': r[0], 'event': r[1], 'data': json.loads(r[2]), 'timestamp': r[3]} for r in rows]
+        return events, bool(row and row[0])
+
+    def wait(self, channel: str, after_id: int, timeout: float, listener=None):
+        conn = self._conn()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            row = conn.execute("SELECT last_id, closed FROM channels WHERE channel = ?", (channel,)).fetchone()
+            if row and (row[0] > after_id or row[1]):
+                return
+            time.sleep(self.poll_interval)
+
+    def exists(self, channel: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM channels WHERE channel = ?", (channel,)).fetchone() is not None
+
+    def listen(self, channel: str):
+        return None
+
+    def unlisten(self, listener):
+        pass
+
+    def _cleanup_expired(self):
+        cutoff = time.time() - self.channel_ttl
+        conn = self._conn()
+        expired = [r[0] for r in conn.execute(
+            "SELECT channel FROM channels WHERE last_activity < ?", (cutoff,)
+        ).fetchall()]
+        for name in expired:
+            conn.execute("DELETE FROM events WHERE channel = ?", (name,))
+            conn.execute("DELETE FROM channels WHERE channel = ?", (name,))
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        channels, open_channels = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(1 - closed), 0) FROM channels"
+        ).fetchone()
+        buffered = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {
+            'backend': 'disk',
+            'path': str(self.path),
+            'channels': channels,
+            'open_channels': open_channels,
+            'buffered_events': buffered
+        }
+
+class StreamHub:
+    """Publica eventos por sessão e permite assinatura com replay a partir de Last-Event-ID"""
+
+    def __init__(self):
+        """Inicializa o hub de streaming"""
+        self.buffer_size = int(os.getenv('STREAM_BUFFER_SIZE', '2000'))
+        self.channel_ttl = int(os.getenv('STREAM_CHANNEL_TTL', '3600'))
+        # Conexões SSE são encerradas após este tempo; o EventSource reconecta com Last-Event-ID
+        self.max_duration = float(os.getenv('STREAM_MAX_DURATION', '1800'))
+        self.backend = self._create_backend(os.getenv('STREAM_BACKEND', 'memory').lower())
+        self.stats = {'published': 0, 'publish_errors': 0, 'subscribers': 0}
+        self.stats_lock = threading.Lock()
+
+        logger.info(f"📡 Stream Hub inicializado ({self.backend.stats()['backend']}, buffer de {self.buffer_size} eventos por sessão)")
+
+    def _create_backend(self, backend_name: str):
+        """Cria backend configurado; Redis e disco permitem publicar e assinar em processos diferentes"""
+        if backend_name == 'redis':
+            if HAS_REDIS:
+                try:
+                    return RedisStreamBackend(os.getenv('REDIS_URL', 'redis://localhost:6379/0'), self.buffer_size, self.channel_ttl)
+                except Exception as e:
+                    logger.warning(f"⚠️ Redis indisponível para streaming, usando disco: {e}")
+            else:
+                logger.warning("⚠️ Biblioteca 'redis' não instalada, streaming usando disco")
+            backend_name = 'disk'
+
+        if backend_name == 'disk':
+            cache_dir = Path(os.getenv('CACHE_DIR', 'cache'))
+            try:
+                return SQLiteStreamBackend(cache_dir / 'streams.sqlite3', self.buffer_size, self.channel_ttl)
+            except Exception as e:
+                logger.error(f"❌ Falha ao abrir streaming em disco, usando memória: {e}")
+
+        return MemoryStreamBackend(self.buffer_size, self.channel_ttl)
+
+    @staticmethod
+    def token_channel(session_id: str) -> str:
+        """Canal dos tokens de IA da sessão: separado para não expulsar o progresso do buffer"""
+        return f"{session_id}:tokens"
+
+    def publish(self, channel: str, event_type: str, data: Dict[str, Any]) -> int:
+        """Publica evento em um canal e acorda os assinantes; retorna o id do evento (0 em falha)"""
+        try:
+            event = self.backend.append(channel, event_type, data)
+        except Exception as e:
+            with self.stats_lock:
+                self.stats['publish_errors'] += 1
+            logger.error(f"❌ Erro ao publicar evento {event_type} em {channel}: {e}")
+            return 0
+
+        with self.stats_lock:
+            self.stats['published'] += 1
+        return event['id']
+
+    def close(self, channel: str):
+        """Marca o canal como encerrado; assinantes terminam após consumir o buffer"""
+        try:
+            self.backend.close(channel)
+        except Exception as e:
+            logger.error(f"❌ Erro ao encerrar canal {channel}: {e}")
+
+    def subscribe(
+        self,
+        channel: str,
+        last_event_id: int = 0,
+        heartbeat: float = 15.0,
+        max_duration: Optional[float] = None,
+        is_active: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Optional[Dict[str, Any]]]:
+        """Gera eventos com id > last_event_id; None indica heartbeat
+
+        Se o canal não existe e is_active (ex.: job da sessão na fila ou em execução) não indica
+        que ele ainda será criado, emite 'stream_not_found' e encerra.
+        """
+        started = time.time()
+        listener = self.backend.listen(channel)
+        with self.stats_lock:
+            self.stats['subscribers'] += 1
+
+        try:
+            while True:
+                pending, closed = self.backend.read(channel, last_event_id)
+                if not pending and not closed:
+                    if not self.backend.exists(channel) and not (is_active and is_active()):
+                        yield {'id': last_event_id, 'event': 'stream_not_found', 'data': {'channel': channel}}
+                        return
+                    self.backend.wait(channel, last_event_id, heartbeat, listener)
+                    pending, closed = self.backend.read(channel, last_event_id)
+
+                for event in pending:
+                    last_event_id = event['id']
+                    yield event
+
+                if closed and not pending:
+                    return
+
+                if not pending:
+                    yield None
+
+                if max_duration and time.time() - started > max_duration:
+                    return
+        finally:
+            self.backend.unlisten(listener)
+            with self.stats_lock:
+                self.stats['subscribers'] -= 1
+
+    def get_events(self, channel: str, last_event_id: int = 0) -> list:
+        """Retorna eventos do buffer posteriores a last_event_id"""
+        try:
+            return self.backend.read(channel, last_event_id)[0]
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler eventos de {channel}: {e}")
+            return []
+
+    def get_last_event(self, channel: str, event_type: str) -> Optional[Dict[str, Any]]:
+        """Último evento de um tipo presente no buffer"""
+        for event in reversed(self.get_events(channel)):
+            if event['event'] == event_type:
+                return event
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do hub"""
+        stats = self.backend.stats()
+        with self.stats_lock:
+            stats.update(self.stats)
+        stats['buffer_size'] = self.buffer_size
+        return stats
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Serializa evento no formato text/event-stream (None vira comentário de keepalive)"""
+    if event is None:
+        return ": keepalive\n\n"
+    payload = json.dumps(event['data'], ensure_ascii=False, default=str)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {payload}\n\n"
+
+# Instância global
+stream_hub = StreamHub()
@@ -28,7 +28,7 @@ from services.anti_objection_system import anti_objection_system
 from services.pre_pitch_architect import pre_pitch_architect
 from services.future_prediction_engine import future_prediction_engine
 from services.mcp_supadata_manager import mcp_supadata_manager
-from services.auto_save_manager import salvar_etapa, salvar_erro
+from services.auto_save_manager import auto_save_manager, salvar_etapa, salvar_erro
 from services.alibaba_websailor import AlibabaWebSailorAgent
 
 logger = logging.getLogger(__name__)
@@ -141,7 +141,21 @@ class SuperOrchestrator:
         self,
         data: Dict[str, Any],
         session_id: str,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        continue_from_saved: bool = False
+    ) -> Dict[str, Any]:
+        """Executa análise completamente sincronizada"""
+
+        # Escopo de salvamento da sessão: análises concorrentes não se misturam
+        with auto_save_manager.usar_sessao(session_id):
+            return self._execute_synchronized_analysis(data, session_id, progress_callback, continue_from_saved)
+
+    def _execute_synchronized_analysis(
+        self,
+        data: Dict[str, Any],
+        session_id: str,
+        progress_callback: Optional[Callable] = None,
+        continue_from_saved: bool = False
     ) -> Dict[str, Any]:
         """Executa análise completamente sincronizada"""
 
@@ -161,6 +175,7 @@ class SuperOrchestrator:
             salvar_etapa("super_orchestrator_iniciado", {
                 'data': data,
                 'session_id': session_id,
+                'continue_from_saved': continue_from_saved,
                 'orchestrators': list(self.orchestrators.keys()),
                 'services': list(self.services.keys())
             }, categoria="analise_completa")
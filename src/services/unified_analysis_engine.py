@@ -5,14 +5,17 @@ ARQV30 Enhanced v2.0 - Unified Analysis Engine
 Motor de análise unificado que combina todas as capacidades
 """
 
+import os
 import logging
 import time
 import json
-from typing import Dict, List, Any, Optional
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from services.ai_manager import ai_manager
 from services.unified_search_manager import unified_search_manager
 from services.robust_content_extractor import robust_content_extractor
+from services.url_resolver import url_resolver
 from services.pymupdf_client import pymupdf_client
 from services.exa_client import exa_client
 from services.mental_drivers_architect import mental_drivers_architect
@@ -26,6 +29,7 @@ from services.forensic_cpl_analyzer import forensic_cpl_analyzer
 from services.visceral_leads_engineer import visceral_leads_engineer
 from services.pre_pitch_architect_advanced import pre_pitch_architect_advanced
 from services.auto_save_manager import auto_save_manager, salvar_etapa, salvar_erro
+from services.context_executor import ContextThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +51,25 @@ class UnifiedAnalysisEngine:
             'arqueologist': archaeological_master,
             'visceral_master': visceral_master,
             'visual_director': visual_proofs_director,
+            'drivers_architect': mental_drivers_architect,
+            'anti_objection': anti_objection_system,
+            'pre_pitch_architect': pre_pitch_architect,
+            'forensic_cpl': forensic_cpl_analyzer,
+            'visceral_leads': visceral_leads_engineer,
+            'pre_pitch_advanced': pre_pitch_architect_advanced
+        }
 
+        # Extração concorrente: candidatos extraídos em paralelo com prazo global
+        self.extraction_candidates = int(os.getenv('EXTRACTION_CANDIDATES', '15'))
+        self.extraction_max_pages = int(os.getenv('EXTRACTION_MAX_PAGES', '15'))
+        self.extraction_deadline = float(os.getenv('EXTRACTION_DEADLINE', '90'))
+        self.extraction_executor = ContextThreadPoolExecutor(
+            max_workers=int(os.getenv('EXTRACTION_MAX_WORKERS', '8')),
+            thread_name_prefix='unified_extraction'
+        )
+        
+        logger.info("🚀 Unified Analysis Engine inicializado")
+    
     def _validate_required_apis(self):
         """Valida se as APIs obrigatórias estão disponíveis"""
         
@@ -82,16 +104,6 @@ class UnifiedAnalysisEngine:
             )
         
         logger.info("✅ APIs obrigatórias validadas com sucesso")
-
-            'drivers_architect': mental_drivers_architect,
-            'anti_objection': anti_objection_system,
-            'pre_pitch_architect': pre_pitch_architect,
-            'forensic_cpl': forensic_cpl_analyzer,
-            'visceral_leads': visceral_leads_engineer,
-            'pre_pitch_advanced': pre_pitch_architect_advanced
-        }
-        
-        logger.info("🚀 Unified Analysis Engine inicializado")
     
     def execute_unified_analysis(
         self,
@@ -289,52 +301,83 @@ class UnifiedAnalysisEngine:
         logger.info(f"✅ Análise unificada concluída em {processing_time:.2f}s")
         return unified_analysis
     
-    def _extract_unified_content(self, search_results: Dict[str, Any], session_id: str) -> Dict[str, Any]:
-        """Extrai conteúdo usando todos os extratores disponíveis"""
+    def _extract_unified_content(
+        self,
+        search_results: Dict[str, Any],
+        session_id: str,
+        deadline: Optional[float] = None,
+        max_pages: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Extrai conteúdo usando todos os extratores disponíveis (em paralelo, com prazo global)"""
         
         results = search_results.get('results', [])
-        extracted_content = []
-        pdf_content = []
+        candidates = results[:self.extraction_candidates]
+        deadline = deadline or self.extraction_deadline
+        max_pages = max_pages or self.extraction_max_pages
+        start_time = time.time()
         
-        for i, result in enumerate(results[:15]):  # Top 15 resultados
-            url = result.get('url', '')
+        # 0. Resolve redirecionamentos da página de resultados em lote antes de extrair
+        resolved_urls = url_resolver.resolve_many(result.get('url', '') for result in candidates)
+        candidates = [
+            {**result, 'url': resolved_urls.get(result.get('url', ''), result.get('url', ''))}
+            for result in candidates
+        ]
+        
+        # 1. Dispara todas as extrações; o rate limiter cuida da cortesia por host
+        futures = {
+            self.extraction_executor.submit(self._extract_single_result, result): rank
+            for rank, result in enumerate(candidates)
+        }
+        
+        # 2. Salva cada documento assim que fica pronto, até o prazo global
+        extracted = {}  # rank -> (tipo, item)
+        pending = set(futures)
+        stopped_early = False
+        while pending:
+            remaining = deadline - (time.time() - start_time)
+            if remaining <= 0:
+                break
             
-            try:
-                # Verifica se é PDF
-                if url.lower().endswith('.pdf') or 'pdf' in url.lower():
-                    # Usa PyMuPDF Pro para PDFs
-                    if pymupdf_client.is_available():
-                        pdf_result = pymupdf_client.extract_from_url(url)
-                        if pdf_result['success']:
-                            pdf_content.append({
-                                'url': url,
-                                'title': result.get('title', ''),
-                                'content': pdf_result['text'],
-                                'metadata': pdf_result['metadata'],
-                                'statistics': pdf_result['statistics'],
-                                'extraction_method': 'PyMuPDF_Pro'
-                            })
-                            continue
-                
-                # Usa extrator robusto para páginas web
-                content = robust_content_extractor.extract_content(url)
-                if content and len(content) > 200:
-                    extracted_content.append({
-                        'url': url,
-                        'title': result.get('title', ''),
-                        'content': content,
-                        'source': result.get('source', 'unknown'),
-                        'is_brazilian': result.get('is_brazilian', False),
-                        'is_preferred': result.get('is_preferred', False),
-                        'extraction_method': 'robust_extractor'
-                    })
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Erro ao extrair {candidates[rank].get('url', '')}: {e}")
+                    continue
+                if not outcome:
+                    continue
                 
-                # Delay para rate limiting
-                time.sleep(0.3)
-                
-            except Exception as e:
-                logger.error(f"❌ Erro ao extrair {url}: {e}")
-                continue
+                extracted[rank] = outcome
+                kind, item = outcome
+                salvar_etapa(f"conteudo_extraido_{rank + 1:02d}", {
+                    **item,
+                    'rank': rank + 1,
+                    'content_type': kind,
+                    'elapsed': round(time.time() - start_time, 2)
+                }, categoria="pesquisa_web")
+            
+            # Já há max_pages documentos e nenhum pendente poderia ficar à frente deles
+            if len(extracted) >= max_pages:
+                cutoff = sorted(extracted)[max_pages - 1]
+                if all(futures[f] > cutoff for f in pending):
+                    stopped_early = True
+                    break
+        
+        # 3. Extrações que perderam o prazo (ou não são mais necessárias) são descartadas
+        for future in pending:
+            future.cancel()
+        timed_out = 0 if stopped_early else len(pending)
+        if timed_out:
+            logger.warning(f"⏱️ {timed_out} extrações excederam o prazo de {deadline:.0f}s e foram descartadas")
+        
+        # 4. Melhores max_pages documentos na ordem original do ranking
+        extracted_content = []
+        pdf_content = []
+        for rank in sorted(extracted)[:max_pages]:
+            kind, item = extracted[rank]
+            (pdf_content if kind == 'pdf' else extracted_content).append(item)
         
         # Combina conteúdo extraído
         combined_content = {
@@ -344,15 +387,58 @@ class UnifiedAnalysisEngine:
                 'total_web_pages': len(extracted_content),
                 'total_pdf_pages': len(pdf_content),
                 'total_content_length': sum(len(item['content']) for item in extracted_content + pdf_content),
-                'extraction_success_rate': (len(extracted_content) + len(pdf_content)) / len(results) * 100 if results else 0
+                'extraction_success_rate': len(extracted) / len(candidates) * 100 if candidates else 0,
+                'candidates': len(candidates),
+                'timeouts': timed_out,
+                'extraction_time': round(time.time() - start_time, 2),
+                'deadline': deadline
             }
         }
         
         # Salva conteúdo extraído
         salvar_etapa("conteudo_unificado_extraido", combined_content, categoria="pesquisa_web")
         
+        logger.info(
+            f"📄 Extração concluída: {len(extracted)}/{len(candidates)} documentos em "
+            f"{combined_content['statistics']['extraction_time']:.1f}s"
+        )
         return combined_content
     
+    def _extract_single_result(self, result: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Extrai um resultado de busca; retorna ('pdf' | 'web', item) ou None"""
+        
+        url = result.get('url', '')
+        
+        # Verifica se é PDF
+        if url.lower().endswith('.pdf') or 'pdf' in url.lower():
+            # Usa PyMuPDF Pro para PDFs
+            if pymupdf_client.is_available():
+                pdf_result = pymupdf_client.extract_from_url(url)
+                if pdf_result['success']:
+                    return 'pdf', {
+                        'url': url,
+                        'title': result.get('title', ''),
+                        'content': pdf_result['text'],
+                        'metadata': pdf_result['metadata'],
+                        'statistics': pdf_result['statistics'],
+                        'extraction_method': 'PyMuPDF_Pro'
+                    }
+        
+        # Usa extrator robusto para páginas web
+        content = robust_content_extractor.extract_content(url)
+        if content and len(content) > 200:
+            return 'web', {
+                'url': url,
+                'title': result.get('title', ''),
+                'content': content,
+                'source': result.get('source', 'unknown'),
+                'is_brazilian': result.get('is_brazilian', False),
+                'is_preferred': result.get('is_preferred', False),
+                'extraction_method': 'robust_extractor'
+            }
+        
+        return None
+    
     def _extract_concepts_for_proofs(
         self, 
         avatar_data: Dict[str, Any], 
@@ -14,9 +14,14 @@ from urllib.parse import quote_plus
 from bs4 import BeautifulSoup
 import json
 import random
+import threading
+from concurrent.futures import wait, FIRST_COMPLETED
 from datetime import datetime
 from services.exa_client import exa_client
 from services.auto_save_manager import salvar_etapa, salvar_erro
+from services.context_executor import ContextThreadPoolExecutor
+from services.search_cache import cached_search
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +81,20 @@ class UnifiedSearchManager:
             "revistapegn.globo.com", "epocanegocios.globo.com", "istoedinheiro.com.br"
         ]
 
+        # Fan-out concorrente: todos os provedores ao mesmo tempo com prazo global
+        self.search_deadline = float(os.getenv('SEARCH_DEADLINE', '30'))
+        # Cada busca ocupa um worker por provedor (5 com redes sociais) e uma chamada que perde o
+        # prazo segue rodando até o timeout do próprio provedor: o pool comporta o dobro disso
+        # para as buscas simultâneas (por padrão, uma por worker da fila de análises)
+        self.max_concurrent_searches = max(1, int(os.getenv('SEARCH_MAX_CONCURRENT', os.getenv('ANALYSIS_MAX_WORKERS', '2'))))
+        self.max_workers = int(os.getenv('SEARCH_MAX_WORKERS', str(self.max_concurrent_searches * 5 * 2)))
+        self.executor = ContextThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='unified_search'
+        )
+        self.provider_stats = {}
+        self.stats_lock = threading.Lock()
+
         enabled_count = sum(1 for p in self.providers.values() if p['enabled'])
         logger.info(f"🔍 Unified Search Manager inicializado com {enabled_count} provedores")
 
@@ -85,64 +104,110 @@ class UnifiedSearchManager:
         max_results: int = 25,
         context: Dict[str, Any] = None,
         session_id: str = None,
-        include_social: bool = True
+        include_social: bool = True,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Realiza busca unificada com todos os provedores disponíveis"""
+        """Realiza busca unificada com todos os provedores disponíveis em paralelo"""
         try:
             logger.info(f"🔍 Iniciando busca unificada: {query}")
 
+            deadline = deadline or self.search_deadline
             all_results = []
             social_results = []
             search_statistics = {
                 'providers_used': 0,
                 'total_results': 0,
                 'search_time': 0,
-                'social_platforms': 0
+                'social_platforms': 0,
+                'deadline': deadline,
+                'timeouts': 0,
+                'queue_starved': 0,
+                'providers': {}
             }
 
             start_time = time.time()
 
-            # 1. Busca prioritária: Exa > Alibaba WebSailor > Google > Serper
-            search_providers = ['exa', 'websailor', 'google', 'serper']
-
-            for provider in search_providers:
-                try:
-                    if provider == 'exa':
-                        results = self._search_with_exa(query, max_results // 4)
-                    elif provider == 'websailor':
-                        results = self._search_with_websailor(query, max_results // 4)
-                    elif provider == 'google':
-                        results = self._search_with_google(query, max_results // 4)
-                    elif provider == 'serper':
-                        results = self._search_with_serper(query, max_results // 4)
-                    else:
+            # 1. Dispara Exa, Alibaba WebSailor, Google, Serper (e redes sociais) ao mesmo tempo
+            per_provider = max_results // 4
+            tasks = {
+                'exa': (self._search_with_exa, (query, per_provider)),
+                'websailor': (self._search_with_websailor, (query, per_provider)),
+                'google': (self._search_with_google, (query, per_provider)),
+                'serper': (self._search_with_serper, (query, per_provider))
+            }
+            if include_social:
+                tasks['social'] = (self._search_social_media, (query, context))
+
+            futures = {}
+            for provider, (func, args) in tasks.items():
+                futures[self.executor.submit(self._timed_call, func, *args)] = provider
+
+            # 2. Mescla resultados parciais conforme chegam, até o prazo global
+            ranked_results = []
+            pending = set(futures)
+            while pending:
+                remaining = deadline - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = futures[future]
+                    results, latency, error = future.result()
+                    search_statistics['providers'][provider] = {
+                        'latency': round(latency, 3),
+                        'results': len(results),
+                        'status': 'error' if error else ('ok' if results else 'empty')
+                    }
+                    self._record_provider_stats(provider, latency, timed_out=False, failed=bool(error))
+
+                    if error:
+                        logger.warning(f"⚠️ Erro no provedor {provider}: {error}")
+                        continue
+                    if not results:
                         continue
 
-                    if results:
+                    if provider == 'social':
+                        social_results = results
+                        search_statistics['social_platforms'] = len(results)
+                    else:
                         all_results.extend(results)
                         search_statistics['providers_used'] += 1
-                        logger.info(f"✅ {provider}: {len(results)} resultados")
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro no provedor {provider}: {e}")
+                        logger.info(f"✅ {provider}: {len(results)} resultados em {latency:.2f}s")
+
+                    ranked_results = self._remove_duplicates_and_rank(ranked_results + results)
+
+            # 3. Provedores que perderam o prazo são descartados
+            for future in pending:
+                provider = futures[future]
+                if future.cancel():
+                    # Nem chegou a rodar: todos os workers do pool estavam ocupados
+                    search_statistics['queue_starved'] += 1
+                    search_statistics['providers'][provider] = {
+                        'latency': None,
+                        'results': 0,
+                        'status': 'queue_starved'
+                    }
+                    self._record_provider_stats(provider, deadline, timed_out=False, failed=False, starved=True)
+                    logger.warning(f"⏱️ Provedor {provider} não iniciou em {deadline:.0f}s: pool de busca ocupado ({self.max_workers} workers)")
                     continue
 
-            # 2. Busca em redes sociais (se habilitada)
-            if include_social:
-                social_results = self._search_social_media(query, context)
-                search_statistics['social_platforms'] = len(social_results)
-
-            # 3. Combina resultados web e social
-            combined_results = all_results + social_results
+                search_statistics['timeouts'] += 1
+                search_statistics['providers'][provider] = {
+                    'latency': None,
+                    'results': 0,
+                    'status': 'timeout'
+                }
+                self._record_provider_stats(provider, deadline, timed_out=True, failed=False)
+                logger.warning(f"⏱️ Provedor {provider} excedeu o prazo de {deadline:.0f}s, resultados descartados")
 
-            # Remove duplicatas e prioriza por qualidade
-            unique_results = self._remove_duplicates_and_rank(combined_results)
-            final_results = unique_results[:max_results]
+            final_results = ranked_results[:max_results]
 
             search_statistics['total_results'] = len(final_results)
             search_statistics['search_time'] = time.time() - start_time
+            search_statistics['provider_totals'] = self.get_provider_stats()
 
-            # Salva resultados se session_id fornecido
+            # Salva resultados se session_id fornecido (pasta da sessão vem do contexto do auto save)
             if session_id:
                 salvar_etapa(
                     "busca_unificada_completa", 
@@ -152,11 +217,10 @@ class UnifiedSearchManager:
                         'social_results': social_results,
                         'statistics': search_statistics
                     },
-                    categoria="pesquisa_web",
-                    session_id=session_id
+                    categoria="pesquisa_web"
                 )
 
-            logger.info(f"✅ Busca unificada concluída: {len(final_results)} resultados ({search_statistics['social_platforms']} redes sociais)")
+            logger.info(f"✅ Busca unificada concluída: {len(final_results)} resultados ({search_statistics['social_platforms']} redes sociais) em {search_statistics['search_time']:.2f}s")
 
             return {
                 'success': True,
@@ -176,6 +240,48 @@ class UnifiedSearchManager:
                 'statistics': {'providers_used': 0, 'total_results': 0, 'search_time': 0}
             }
 
+    def _timed_call(self, func, *args):
+        """Executa provedor medindo latência; retorna (resultados, latência, erro)"""
+        started = time.time()
+        try:
+            return func(*args) or [], time.time() - started, None
+        except Exception as e:
+            return [], time.time() - started, str(e)
+
+    def _record_provider_stats(self, provider: str, latency: float, timed_out: bool, failed: bool, starved: bool = False):
+        """Acumula latência, timeouts e erros por provedor; chamadas que não saíram da fila do pool contam à parte"""
+        with self.stats_lock:
+            stats = self.provider_stats.setdefault(provider, {
+                'calls': 0, 'timeouts': 0, 'errors': 0, 'queue_starved': 0, 'total_latency': 0.0, 'max_latency': 0.0
+            })
+            if starved:
+                stats['queue_starved'] += 1
+                return
+            stats['calls'] += 1
+            if timed_out:
+                stats['timeouts'] += 1
+                return
+            if failed:
+                stats['errors'] += 1
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+
+    def get_provider_stats(self) -> Dict[str, Any]:
+        """Estatísticas acumuladas de latência e timeouts por provedor"""
+        with self.stats_lock:
+            result = {}
+            for provider, stats in self.provider_stats.items():
+                completed = stats['calls'] - stats['timeouts']
+                result[provider] = {
+                    'calls': stats['calls'],
+                    'timeouts': stats['timeouts'],
+                    'errors': stats['errors'],
+                    'queue_starved': stats['queue_starved'],
+                    'avg_latency': round(stats['total_latency'] / completed, 3) if completed else None,
+                    'max_latency': round(stats['max_latency'], 3)
+                }
+            return result
+
     def _search_with_exa(self, query: str, max_results: int) -> List[Dict]:
         """Busca com Exa API (prioridade 1)"""
         try:
@@ -185,6 +291,7 @@ class UnifiedSearchManager:
             logger.warning(f"Exa não disponível: {e}")
             return []
 
+    @cached_search('websailor')
     def _search_with_websailor(self, query: str, max_results: int) -> List[Dict]:
         """Busca com Alibaba WebSailor (prioridade 2)"""
         try:
@@ -194,6 +301,7 @@ class UnifiedSearchManager:
             logger.warning(f"WebSailor não disponível: {e}")
             return []
 
+    @cached_search('google')
     def _search_with_google(self, query: str, max_results: int) -> List[Dict]:
         """Busca com Google API (prioridade 3)"""
         try:
@@ -202,6 +310,7 @@ class UnifiedSearchManager:
             logger.warning(f"Google API não disponível: {e}")
             return []
 
+    @cached_search('serper')
     def _search_with_serper(self, query: str, max_results: int) -> List[Dict]:
         """Busca com Serper API (prioridade 4)"""
         try:
@@ -261,6 +370,7 @@ class UnifiedSearchManager:
         """Remove URLs duplicadas mantendo a primeira ocorrência (método legacy)"""
         return self._remove_duplicates_and_rank(results)
 
+    @cached_search('exa')
     def _search_with_exa(self, query: str, max_results: int, context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Busca usando Exa API"""
 
@@ -323,6 +433,7 @@ class UnifiedSearchManager:
                 'dateRestrict': 'm12'  # Últimos 12 meses
             }
 
+            rate_limiter.wait(provider['base_url'])
             response = requests.get(
                 provider['base_url'],
                 params=params,
@@ -370,6 +481,7 @@ class UnifiedSearchManager:
                 'num': max_results
             }
 
+            rate_limiter.wait(provider['base_url'])
             response = requests.post(
                 provider['base_url'],
                 json=payload,
@@ -403,6 +515,7 @@ class UnifiedSearchManager:
             enhanced_query = self._enhance_query_for_brazil(query)
             search_url = f"{self.providers['bing']['base_url']}?q={quote_plus(enhanced_query)}&cc=br&setlang=pt-br&count={max_results}"
 
+            rate_limiter.wait(search_url)
             response = requests.get(search_url, headers=self.headers, timeout=15)
 
             if response.status_code == 200:
@@ -6,12 +6,19 @@ Resolve URLs de redirecionamento e encurtadores com decodificação robusta
 """
 
 import os
+import time
 import logging
 import base64
 import requests
 import json
+import threading
+from collections import OrderedDict
 from urllib.parse import parse_qs, urlparse, unquote
-from typing import Optional
+from typing import Optional, Dict, List, Any, Iterable
+from services.context_executor import ContextThreadPoolExecutor
+from services.rate_limiter import rate_limiter
+from services.response_cache import create_response_cache
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +30,125 @@ class URLResolver:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        rate_limiter.mount(self.session)
         self.timeout = 10
-        
+
+        # Memória LRU com TTL + tabela persistente de redirecionamentos já resolvidos
+        self.memo = OrderedDict()
+        self.memo_lock = threading.Lock()
+        self.memo_size = int(os.getenv('URL_RESOLVER_MEMO_SIZE', '5000'))
+        self.memo_ttl = float(os.getenv('URL_RESOLVER_TTL', str(7 * 86400)))
+        # Falhas de resolução são lembradas por pouco tempo para não repetir requisições na mesma análise
+        self.negative_ttl = float(os.getenv('URL_RESOLVER_NEGATIVE_TTL', '600'))
+        self.mappings = create_response_cache('url_resolver', default_ttl=30 * 86400, default_max_entries=100000,
+                                              default_max_mb=50)
+        self.single_flight = SingleFlight('URL Resolver', wait_timeout=60)
+        self.executor = ContextThreadPoolExecutor(
+            max_workers=int(os.getenv('URL_RESOLVER_MAX_WORKERS', '8')),
+            thread_name_prefix='url_resolver'
+        )
+        self.stats = {'memo_hits': 0, 'persisted_hits': 0, 'resolved': 0, 'unresolved': 0}
+
+    def needs_resolution(self, url: str) -> bool:
+        """URL de redirecionamento (Bing, Google) ou encurtada"""
+        if not url:
+            return False
+        return (
+            ("bing.com/ck/a" in url and "u=a1" in url) or
+            "/url?q=" in url or ("google." in url and "url?q=" in url) or
+            self._is_short_url(url)
+        )
+
     def resolve_redirect_url(self, url: str) -> str:
         """
-        Resolve URLs de redirecionamento do Bing, Google e encurtadores.
+        Resolve URLs de redirecionamento do Bing, Google e encurtadores (com memória e tabela persistente).
         """
+        if not self.needs_resolution(url):
+            return url
+
+        cached = self._memo_get(url)
+        if cached is not None:
+            return cached
+
+        persisted = self.mappings.get(self.mappings.make_key('url', url), group='redirects')
+        if persisted:
+            self._count('persisted_hits')
+            self._memo_set(url, persisted, self.memo_ttl)
+            return persisted
+
+        # Chamadas simultâneas para a mesma URL fazem uma única resolução
+        return self.single_flight.do(url, lambda: self._resolve_and_store(url))
+
+    def resolve_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Resolve uma página inteira de resultados em paralelo; retorna {original: resolvida}"""
+        unique = list(dict.fromkeys(u for u in urls if u))
+        pending = [u for u in unique if self.needs_resolution(u)]
+        resolved = {u: u for u in unique}
+
+        if len(pending) == 1:
+            resolved[pending[0]] = self.resolve_redirect_url(pending[0])
+        elif pending:
+            futures = {u: self.executor.submit(self.resolve_redirect_url, u) for u in pending}
+            for u, future in futures.items():
+                try:
+                    resolved[u] = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Falha ao resolver {u}: {e}")
+
+        changed = sum(1 for u in pending if resolved[u] != u)
+        if pending:
+            logger.info(f"🔄 {changed}/{len(pending)} URLs de redirecionamento resolvidas em lote")
+        return resolved
+
+    def _resolve_and_store(self, url: str) -> str:
+        started = time.time()
+        resolved = self._resolve_uncached(url)
+
+        if resolved != url:
+            self._count('resolved')
+            self._memo_set(url, resolved, self.memo_ttl)
+            self.mappings.set(self.mappings.make_key('url', url), resolved, group='redirects',
+                              latency=time.time() - started)
+        else:
+            self._count('unresolved')
+            self._memo_set(url, url, self.negative_ttl)
+        return resolved
+
+    def _memo_get(self, url: str) -> Optional[str]:
+        with self.memo_lock:
+            entry = self.memo.get(url)
+            if entry is None:
+                return None
+            resolved, expires_at = entry
+            if expires_at < time.time():
+                del self.memo[url]
+                return None
+            self.memo.move_to_end(url)
+            self.stats['memo_hits'] += 1
+            return resolved
+
+    def _memo_set(self, url: str, resolved: str, ttl: float):
+        with self.memo_lock:
+            self.memo[url] = (resolved, time.time() + ttl)
+            self.memo.move_to_end(url)
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+    def _count(self, name: str):
+        with self.memo_lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Acertos da memória e da tabela persistente, resoluções feitas"""
+        with self.memo_lock:
+            stats = dict(self.stats)
+            stats['memo_entries'] = len(self.memo)
+        stats['persisted'] = self.mappings.get_stats()
+        stats['single_flight'] = self.single_flight.get_stats()
+        return stats
+
+    def _resolve_uncached(self, url: str) -> str:
+        """Resolve sem consultar a memória (decodificação ou requisição)"""
         try:
             original_url = url
             
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Zip Stream
+ZIP gerado sob demanda em blocos, sem arquivo temporário, com suporte a Range
+"""
+
+import os
+import time
+import zlib
+import hashlib
+import logging
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Artefatos já comprimidos são armazenados sem recompressão
+PRECOMPRESSED_EXTENSIONS = {
+    '.gz', '.tgz', '.zip', '.zst', '.xz', '.bz2', '.7z', '.pdf',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp4', '.mp3',
+    '.docx', '.xlsx', '.pptx'
+}
+
+class _StreamSink:
+    """Destino não-posicionável do ZipFile: acumula bytes até serem drenados"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+class ZipStream:
+    """
+    Arquivo ZIP determinístico sobre uma lista de (nome no ZIP, caminho).
+    Mesmos arquivos (tamanho e mtime) geram os mesmos bytes, o que permite retomar com Range.
+    """
+
+    # Tamanho total por conteúdo (ETag), para Content-Length sem gerar o ZIP de novo
+    size_cache: 'OrderedDict[str, int]' = OrderedDict()
+    size_cache_lock = threading.Lock()
+    size_cache_max = int(os.getenv('ZIP_STREAM_SIZE_CACHE', '256'))
+
+    def __init__(self, entries: List[Tuple[str, str]], chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or int(os.getenv('ZIP_STREAM_CHUNK_SIZE', str(256 * 1024)))
+        self.entries = []
+        for arcname, path in sorted(entries):
+            stat = os.stat(path)
+            self.entries.append((arcname, path, stat.st_size, stat.st_mtime_ns))
+
+        digest = hashlib.sha1(zlib.ZLIB_VERSION.encode())  # Outra zlib pode comprimir diferente
+        for arcname, _, size, mtime_ns in self.entries:
+            digest.update(f"{arcname}\0{size}\0{mtime_ns}\n".encode('utf-8'))
+        self.etag = f'"{digest.hexdigest()}"'
+
+    def _zip_info(self, arcname: str, size: int, mtime_ns: int) -> zipfile.ZipInfo:
+        date_time = time.localtime(max(mtime_ns / 1e9, 315532800))[:6]  # ZIP não representa datas antes de 1980
+        info = zipfile.ZipInfo(arcname, date_time=date_time)
+        info.file_size = size  # Define ZIP64 antes de abrir a entrada
+        info.external_attr = 0o644 << 16
+        if os.path.splitext(arcname)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Gera o ZIP em blocos à medida que cada entrada é comprimida"""
+        sink = _StreamSink()
+        total = 0
+        with zipfile.ZipFile(sink, 'w') as zf:
+            for arcname, path, size, mtime_ns in self.entries:
+                with open(path, 'rb') as source, zf.open(self._zip_info(arcname, size, mtime_ns), 'w') as target:
+                    while True:
+                        block = source.read(self.chunk_size)
+                        if not block:
+                            break
+                        target.write(block)
+                        data = sink.drain()
+                        if data:
+                            total += len(data)
+                            yield data
+                data = sink.drain()
+                if data:
+                    total += len(data)
+                    yield data
+        data = sink.drain()  # Diretório central
+        total += len(data)
+        yield data
+        self._remember_size(total)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[bytes]:
+        """Bytes [start, stop) do ZIP; os blocos anteriores são gerados e descartados"""
+        position = 0
+        for data in self.iter_bytes():
+            data_end = position + len(data)
+            if data_end > start:
+                yield data[max(start - position, 0):stop - position]
+            position = data_end
+            if position >= stop:
+                return
+
+    def known_size(self) -> Optional[int]:
+        """Tamanho total se já foi calculado para este conteúdo"""
+        with self.size_cache_lock:
+            size = self.size_cache.get(self.etag)
+            if size is not None:
+                self.size_cache.move_to_end(self.etag)
+            return size
+
+    def total_size(self) -> int:
+        """Tamanho total (gera e descarta o ZIP uma vez se ainda não for conhecido)"""
+        size = self.known_size()
+        if size is None:
+            size = sum(len(data) for data in self.iter_bytes())
+        return size
+
+    def _remember_size(self, size: int):
+        with self.size_cache_lock:
+            self.size_cache[self.etag] = size
+            self.size_cache.move_to_end(self.etag)
+            while len(self.size_cache) > self.size_cache_max:
+                self.size_cache.popitem(last=False)
@@ -4,6 +4,7 @@ class ModernAnalysisSystem {
     constructor() {
         this.currentSessionId = null;
         this.progressInterval = null;
+        this.progressSource = null;
         this.sessions = new Map();
         this.isPaused = false;
         this.notifications = [];
@@ -612,6 +613,60 @@ class ModernAnalysisSystem {
     startProgressMonitoring() {
         if (!this.currentSessionId) return;
 
+        // Push via Server-Sent Events; polling apenas se o navegador não suportar
+        if (window.EventSource) {
+            this.startProgressStream();
+            return;
+        }
+
+        this.startProgressPolling();
+    }
+
+    startProgressStream() {
+        const source = new EventSource(`/api/progress/stream/${this.currentSessionId}`);
+        this.progressSource = source;
+
+        const handleProgress = (event) => {
+            const data = JSON.parse(event.data);
+            this.updateProgress(
+                data.percentage,
+                data.current_message,
+                data.total_steps,
+                data.estimated_remaining ? `${Math.round(data.estimated_remaining)}s` : ''
+            );
+        };
+
+        source.addEventListener('snapshot', handleProgress);
+        source.addEventListener('progress', handleProgress);
+
+        source.addEventListener('analysis_complete', async () => {
+            this.stopProgressMonitoring();
+            this.showNotification('Análise concluída com sucesso!', 'success');
+            this.showProgress(false);
+            this.updateSessionControls('completed');
+            localStorage.removeItem('currentSessionId');
+
+            // Recarrega sessões
+            await this.loadSavedSessions();
+        });
+
+        source.addEventListener('analysis_error', (event) => {
+            const data = JSON.parse(event.data);
+            this.stopProgressMonitoring();
+            this.showNotification(`Erro: ${data.error}`, 'error');
+            this.showProgress(false);
+        });
+
+        // EventSource reconecta sozinho enviando Last-Event-ID; os eventos perdidos são reenviados
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                this.progressSource = null;
+                this.startProgressPolling();
+            }
+        };
+    }
+
+    startProgressPolling() {
         this.progressInterval = setInterval(async () => {
             try {
                 const response = await fetch(`/api/progress/${this.currentSessionId}`);
@@ -648,6 +703,10 @@ class ModernAnalysisSystem {
     }
 
     stopProgressMonitoring() {
+        if (this.progressSource) {
+            this.progressSource.close();
+            this.progressSource = null;
+        }
         if (this.progressInterval) {
             clearInterval(this.progressInterval);
             this.progressInterval = null;